@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline do relatório Livelo
+Gera históricos sintéticos no mesmo esquema do livelo_parceiros.xlsx
+(Timestamp, Parceiro, Oferta, Moeda, Valor, Pontos) e cronometra cada etapa
+do LiveloAnalytics, registrando tempo e pico de memória em JSON
+
+Uso:
+    python livelo_benchmark.py gerar --dias 730 --parceiros 5000
+    python livelo_benchmark.py executar --comparar output/sintetico/benchmark_anterior.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from livelo_historico import HistoricoParquet, COLUNAS
+from livelo_metricas import rss_atual_mb, rss_pico_mb
+
+PASTA_SINTETICO = os.path.join("output", "sintetico")
+ARQUIVO_PARAMETROS = "sintetico.json"
+LIMITE_LINHAS_EXCEL = 1048575
+
+# Distribuição de pontos observada no histórico real (maioria 1-4, cauda até 100)
+PONTOS_BASE = [1, 1, 1, 2, 2, 2, 3, 3, 4, 4, 5, 6, 8, 10, 12, 15, 20, 30]
+CATEGORIAS_PADRAO = ['Moda e Vestuário', 'Seguros e Serviços Financeiros', 'Viagens e Turismo',
+                     'Beleza e Cosméticos', 'Casa e Decoração', 'Eletrônicos', 'Alimentação']
+
+ETAPAS = [
+    'carregar_dados',
+    'detectar_mudancas_ofertas',
+    'atualizar_estado_parceiros',
+    'atualizar_eventos_ofertas',
+    'analisar_historico_ofertas',
+    'calcular_metricas_dashboard',
+    'gerar_graficos_aprimorados',
+    'gerar_html_completo'
+]
+
+
+def gerar_dimensoes(parceiros, rng, arquivo_base="dimensoes.json"):
+    """Dimensões sintéticas: usa os parceiros reais primeiro e completa com nomes gerados"""
+    reais = []
+    if os.path.exists(arquivo_base):
+        with open(arquivo_base, 'r', encoding='utf-8') as f:
+            reais = json.load(f).get('parceiros', [])
+
+    categorias = sorted({p.get('categoria') for p in reais if p.get('categoria')}) or CATEGORIAS_PADRAO
+    dimensoes = []
+    for i in range(parceiros):
+        if i < len(reais):
+            dimensoes.append(dict(reais[i]))
+            continue
+        codigo = f"S{i:05d}"
+        dimensoes.append({
+            'id': i + 1,
+            'nome_aplicativo': f"Parceiro Sintético {i:05d}",
+            'url': f"https://www.livelo.com.br/juntar-pontos/parceiros/sintetico-{i:05d}/{codigo}",
+            'logo_link': f"https://exemplo.invalid/logos/{codigo}_192x120.jpg",
+            'slug': f"sintetico-{i:05d}",
+            'codigo': codigo,
+            'categoria': categorias[int(rng.integers(len(categorias)))],
+            'tier': int(rng.choice([1, 2, 3], p=[0.03, 0.10, 0.87])),
+            'descricao': '',
+            'observacoes': ''
+        })
+    return dimensoes
+
+
+def gerar_historico(pasta=PASTA_SINTETICO, dias=365, parceiros=300, churn=0.05,
+                    taxa_oferta=0.2, semente=42, excel=False):
+    """Grava um histórico sintético (partições Parquet e, opcionalmente, Excel) em uma pasta de trabalho"""
+    rng = np.random.default_rng(semente)
+    os.makedirs(pasta, exist_ok=True)
+    inicio = time.time()
+
+    dimensoes = gerar_dimensoes(parceiros, rng)
+    with open(os.path.join(pasta, "dimensoes.json"), 'w', encoding='utf-8') as f:
+        json.dump({'parceiros': dimensoes, 'metadata': {'total_parceiros': len(dimensoes), 'sintetico': True}},
+                  f, ensure_ascii=False, indent=2)
+
+    # Combinações Parceiro+Moeda (~3% também pontuam em U$)
+    nomes = np.array([d['nome_aplicativo'] for d in dimensoes], dtype=object)
+    dolar = rng.random(parceiros) < 0.03
+    parceiro_idx = np.concatenate([np.arange(parceiros), np.flatnonzero(dolar)])
+    moedas = np.array(['R$'] * parceiros + ['U$'] * int(dolar.sum()), dtype=object)
+    total = len(parceiro_idx)
+
+    # Entrada e saída do site: maioria desde o início, alguns chegam ou saem no meio
+    entrada = np.where(rng.random(total) < 0.8, 0, rng.integers(0, dias, total))
+    saida = np.where(rng.random(total) < 0.05, rng.integers(0, dias, total), dias)
+    saida = np.maximum(saida, entrada + 1)
+
+    valor = np.where(rng.random(total) < 0.002, 5, 1)
+    pontos_normal = rng.choice(PONTOS_BASE, total)
+    propensao = rng.beta(2, 6, total)
+    em_oferta = rng.random(total) < taxa_oferta
+    pontos_oferta = pontos_normal * rng.choice([2, 3, 4, 5], total)
+
+    historico = HistoricoParquet(os.path.join(pasta, "historico"))
+    data_base = pd.Timestamp('2024-01-01 10:00:00')
+    partes_excel = []
+    registros = 0
+
+    for dia in range(dias):
+        # Churn diário: ofertas entram/saem conforme a propensão, pontos mudam ocasionalmente
+        muda = rng.random(total) < churn
+        em_oferta = np.where(muda, rng.random(total) < np.clip(propensao + taxa_oferta, 0, 1), em_oferta)
+        reajuste = rng.random(total) < churn / 10
+        pontos_normal = np.where(reajuste, rng.choice(PONTOS_BASE, total), pontos_normal)
+        pontos_oferta = np.where(reajuste, pontos_normal * rng.choice([2, 3, 4, 5], total), pontos_oferta)
+
+        ativo = (entrada <= dia) & (saida > dia) & (rng.random(total) > 0.01)
+        timestamp = data_base + pd.Timedelta(days=dia, minutes=int(rng.integers(0, 180)), seconds=int(rng.integers(0, 60)))
+
+        df_dia = pd.DataFrame({
+            'Timestamp': timestamp,
+            'Parceiro': nomes[parceiro_idx[ativo]],
+            'Oferta': np.where(em_oferta[ativo], 'Sim', 'Não'),
+            'Moeda': moedas[ativo],
+            'Valor': valor[ativo],
+            'Pontos': np.where(em_oferta[ativo], pontos_oferta[ativo], pontos_normal[ativo])
+        })[COLUNAS]
+        df_dia = df_dia.sample(frac=1, random_state=int(rng.integers(1 << 31))).reset_index(drop=True)
+
+        historico.salvar_dia(df_dia)
+        registros += len(df_dia)
+        if excel:
+            partes_excel.append(df_dia)
+
+    if excel:
+        if registros > LIMITE_LINHAS_EXCEL:
+            print(f"⚠️ {registros} registros excedem o limite do Excel - apenas Parquet gravado")
+        else:
+            df = pd.concat(partes_excel, ignore_index=True)
+            df['Timestamp'] = df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            df.to_excel(os.path.join(pasta, "livelo_parceiros.xlsx"), index=False)
+
+    parametros = {
+        'dias': dias, 'parceiros': parceiros, 'combinacoes': total, 'churn': churn,
+        'taxa_oferta': taxa_oferta, 'semente': semente, 'registros': registros,
+        'gerado_em': datetime.now().isoformat(timespec='seconds')
+    }
+    with open(os.path.join(pasta, ARQUIVO_PARAMETROS), 'w', encoding='utf-8') as f:
+        json.dump(parametros, f, ensure_ascii=False, indent=2)
+
+    print(f"✓ Histórico sintético: {registros} registros, {dias} dias, {total} combinações ({time.time() - inicio:.1f}s)")
+    print(f"📂 {os.path.abspath(pasta)}")
+    return parametros
+
+
+def executar_benchmark(pasta=PASTA_SINTETICO, incremental=False, medir_alocacoes=False):
+    """Roda as etapas do LiveloAnalytics sobre a pasta sintética e mede cada uma"""
+    pasta = os.path.abspath(pasta)
+    if not os.path.isdir(os.path.join(pasta, "historico")):
+        print(f"❌ Histórico sintético não encontrado em {pasta} - rode 'gerar' antes")
+        return None
+
+    # O reporter ajusta o diretório para o do script ao ser importado
+    import livelo_reporter
+    from livelo_historico import EstadoParceiros, EventosOfertas
+    os.chdir(pasta)
+
+    if medir_alocacoes:
+        import tracemalloc
+        tracemalloc.start()
+
+    analytics = livelo_reporter.LiveloAnalytics("livelo_parceiros.xlsx", reconstruir_estado=not incremental)
+    resultados = []
+    html = ''
+
+    for etapa in ETAPAS:
+        if etapa == 'atualizar_estado_parceiros' and incremental:
+            # Prepara (fora da medição) o estado até o dia anterior, como numa execução diária
+            estado_parceiros = EstadoParceiros()
+            data_hoje = analytics.df_hoje['Timestamp'].max().normalize()
+            estado_parceiros.salvar(estado_parceiros.construir(
+                analytics.df_completo[analytics.df_completo['Timestamp'] < data_hoje]))
+        if etapa == 'atualizar_eventos_ofertas' and incremental:
+            eventos_ofertas = EventosOfertas()
+            data_hoje = analytics.df_hoje['Timestamp'].max().normalize()
+            eventos_ofertas.salvar(eventos_ofertas.construir(
+                analytics.df_completo[analytics.df_completo['Timestamp'] < data_hoje]),
+                analytics.df_ontem['Timestamp'].max().strftime('%Y-%m-%d'))
+        if medir_alocacoes:
+            tracemalloc.reset_peak()
+
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        retorno = getattr(analytics, etapa)()
+        segundos = time.perf_counter() - inicio
+        cpu = time.process_time() - inicio_cpu
+
+        if etapa == 'carregar_dados' and not retorno:
+            print("❌ Falha ao carregar o histórico sintético")
+            return None
+        if etapa == 'detectar_mudancas_ofertas':
+            analytics.analytics['mudancas_ofertas'] = retorno
+        if etapa == 'gerar_html_completo':
+            html = retorno
+
+        resultado = {'etapa': etapa, 'segundos': round(segundos, 3), 'cpu_segundos': round(cpu, 3),
+                     'rss_fim_mb': rss_atual_mb(), 'rss_pico_processo_mb': rss_pico_mb()}
+        if medir_alocacoes:
+            resultado['alocacao_pico_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        resultados.append(resultado)
+        print(f"⏱️ {etapa:<30} {segundos:8.2f}s  (RSS {resultado['rss_fim_mb']} MB, pico do processo "
+              f"{resultado['rss_pico_processo_mb']} MB)")
+
+    os.makedirs("public", exist_ok=True)
+    with open(os.path.join("public", "index.html"), 'w', encoding='utf-8') as f:
+        f.write(html)
+    analytics.salvar_arquivos_dados("public")
+
+    parametros = {}
+    if os.path.exists(ARQUIVO_PARAMETROS):
+        with open(ARQUIVO_PARAMETROS, 'r', encoding='utf-8') as f:
+            parametros = json.load(f)
+
+    relatorio = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'pasta': pasta,
+        'parametros': parametros,
+        'incremental': incremental,
+        'registros': len(analytics.df_completo),
+        'memoria_historico_mb': analytics.memoria_historico,
+        'combinacoes_hoje': len(analytics.analytics['dados_completos']),
+        'tamanho_html_bytes': len(html.encode('utf-8')),
+        'tamanho_dados_bytes': {nome: len(conteudo.encode('utf-8')) for nome, conteudo in analytics.arquivos_dados.items()},
+        'total_segundos': round(sum(r['segundos'] for r in resultados), 3),
+        'etapas': resultados
+    }
+    arquivo = os.path.join(pasta, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    print(f"📊 Total: {relatorio['total_segundos']:.2f}s | {relatorio['registros']} registros | "
+          f"HTML {relatorio['tamanho_html_bytes'] / 1024 / 1024:.1f} MB")
+    print(f"💾 Resultado: {arquivo}")
+    return relatorio
+
+
+def comparar_resultados(atual, arquivo_anterior, limite=0.2):
+    """Mostra a variação por etapa contra um benchmark anterior e destaca regressões"""
+    with open(arquivo_anterior, 'r', encoding='utf-8') as f:
+        anterior = json.load(f)
+
+    tempos_anteriores = {r['etapa']: r['segundos'] for r in anterior.get('etapas', [])}
+    regressoes = 0
+    print(f"📈 Comparação com {arquivo_anterior}:")
+    for resultado in atual['etapas']:
+        antes = tempos_anteriores.get(resultado['etapa'])
+        if not antes:
+            continue
+        variacao = (resultado['segundos'] - antes) / antes
+        # Etapas muito curtas oscilam demais para contar como regressão
+        regrediu = variacao > limite and resultado['segundos'] - antes > 0.05
+        marcador = "🔴" if regrediu else "🟢"
+        regressoes += regrediu
+        print(f"   {marcador} {resultado['etapa']:<30} {antes:8.2f}s → {resultado['segundos']:8.2f}s ({variacao:+.0%})")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Livelo - benchmark do relatório')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    gerar = subparsers.add_parser('gerar', help='Gera um histórico sintético')
+    gerar.add_argument('--pasta', default=PASTA_SINTETICO)
+    gerar.add_argument('--dias', type=int, default=365)
+    gerar.add_argument('--parceiros', type=int, default=300)
+    gerar.add_argument('--churn', type=float, default=0.05,
+                       help='Probabilidade diária de uma combinação mudar de estado de oferta')
+    gerar.add_argument('--taxa-oferta', type=float, default=0.2)
+    gerar.add_argument('--semente', type=int, default=42)
+    gerar.add_argument('--excel', action='store_true', help='Também grava livelo_parceiros.xlsx (se couber)')
+
+    executar = subparsers.add_parser('executar', help='Cronometra as etapas do relatório')
+    executar.add_argument('--pasta', default=PASTA_SINTETICO)
+    executar.add_argument('--incremental', action='store_true',
+                          help='Mede o estado incremental (estado do dia anterior já salvo)')
+    executar.add_argument('--tracemalloc', action='store_true',
+                          help='Mede o pico de alocações por etapa (mais lento)')
+    executar.add_argument('--comparar', metavar='ARQUIVO', help='Benchmark anterior (JSON) para comparação')
+    executar.add_argument('--limite', type=float, default=0.2, help='Regressão tolerada por etapa (0.2 = 20%%)')
+
+    args = parser.parse_args()
+
+    if args.comando == 'gerar':
+        if not HistoricoParquet().disponivel():
+            print("❌ pyarrow não instalado - necessário para o histórico sintético")
+            print("Para instalar: pip install pyarrow")
+            sys.exit(1)
+        gerar_historico(args.pasta, args.dias, args.parceiros, args.churn, args.taxa_oferta,
+                        args.semente, args.excel)
+    else:
+        comparar = os.path.abspath(args.comparar) if args.comparar else None
+        relatorio = executar_benchmark(args.pasta, args.incremental, args.tracemalloc)
+        if relatorio is None:
+            sys.exit(1)
+        if comparar and comparar_resultados(relatorio, comparar, args.limite):
+            sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Cache das etapas do pipeline (main.py)
+Cada etapa tem uma chave = hash do conteúdo das suas entradas; se a chave não
+mudou e as saídas registradas continuam intactas, a etapa reaproveita as saídas
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+ARQUIVO_CACHE = "cache_etapas.json"
+# Variantes pré-comprimidas não vão para o repositório - não contam como saída
+EXTENSOES_IGNORADAS = ('.gz', '.br', '.tmp')
+
+
+def hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def expandir_caminhos(caminhos):
+    """Arquivos (e arquivos dentro das pastas) em ordem estável"""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, nomes in os.walk(caminho):
+                arquivos += [os.path.join(raiz, n).replace(os.sep, '/') for n in nomes
+                             if not n.endswith(EXTENSOES_IGNORADAS)]
+        else:
+            arquivos.append(caminho)
+    return sorted(arquivos)
+
+
+class CacheEtapas:
+    def __init__(self, arquivo=ARQUIVO_CACHE, habilitado=True):
+        self.arquivo = arquivo
+        self.habilitado = habilitado
+        self.status = {}
+        self.registros = {}
+        if os.path.exists(arquivo):
+            try:
+                with open(arquivo, 'r', encoding='utf-8') as f:
+                    self.registros = json.load(f)
+            except Exception:
+                self.registros = {}
+
+    def calcular_chave(self, etapa, entradas):
+        """Hash das entradas: arquivos pelo conteúdo, demais valores pelo texto"""
+        sha = hashlib.sha256(etapa.encode('utf-8'))
+        for entrada in entradas:
+            if isinstance(entrada, str) and os.path.isfile(entrada):
+                sha.update(f"{entrada}:{hash_arquivo(entrada)}".encode('utf-8'))
+            else:
+                sha.update(str(entrada).encode('utf-8'))
+        return sha.hexdigest()
+
+    def _hash_saidas(self, saidas):
+        return {c: hash_arquivo(c) for c in expandir_caminhos(saidas) if os.path.isfile(c)}
+
+    def consultar(self, etapa, chave):
+        """True se a etapa pode reaproveitar as saídas da execução anterior"""
+        if not self.habilitado:
+            self.status[etapa] = 'desabilitado'
+            return False
+
+        registro = self.registros.get(etapa)
+        if not registro:
+            self.status[etapa] = 'miss (sem execução anterior)'
+            return False
+        if registro.get('chave') != chave:
+            self.status[etapa] = 'miss (entradas mudaram)'
+            return False
+
+        saidas = registro.get('saidas', {})
+        atuais = {c: hash_arquivo(c) for c in saidas if os.path.isfile(c)}
+        if not saidas or atuais != saidas:
+            self.status[etapa] = 'miss (saídas alteradas ou ausentes)'
+            return False
+
+        self.status[etapa] = 'hit'
+        return True
+
+    def registrar(self, etapa, chave, saidas):
+        """Guarda a chave e o hash das saídas produzidas pela etapa"""
+        self.registros[etapa] = {
+            'chave': chave,
+            'saidas': self._hash_saidas(saidas),
+            'registrado_em': datetime.now().isoformat(timespec='seconds')
+        }
+        temporario = self.arquivo + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.registros, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.arquivo)
@@ -0,0 +1,87 @@
+"""
+Formato colunar compacto para os dados publicados em public/data
+Textos viram códigos numa tabela única de strings, timestamps viram códigos numa
+tabela de (dia desde a data base, segundos do dia) e números ficam em arrays.
+Colunas derivadas (Pontos_por_Moeda) são recalculadas no decodificador.
+O decodificador JavaScript equivalente fica no HTML gerado pelo livelo_reporter.py
+"""
+
+import json
+import pandas as pd
+
+FORMATO = "colunar-v1"
+
+# Colunas recalculadas a partir de outras: nome -> (numerador, denominador)
+COLUNAS_RAZAO = {'Pontos_por_Moeda': ('Pontos', 'Valor')}
+
+
+def _lista_numerica(serie):
+    """Números como lista JSON (NaN vira null, inteiros continuam inteiros)"""
+    if serie.isna().any():
+        return serie.astype(object).where(serie.notna(), None).tolist()
+    return serie.tolist()
+
+
+def codificar(df):
+    """Converte um DataFrame em dicionário colunar pronto para json.dumps"""
+    strings = {}
+    colunas = {}
+
+    def codigo(texto):
+        if texto not in strings:
+            strings[texto] = len(strings)
+        return strings[texto]
+
+    for nome in df.columns:
+        serie = df[nome]
+        if nome in COLUNAS_RAZAO and all(c in df.columns for c in COLUNAS_RAZAO[nome]):
+            numerador, denominador = COLUNAS_RAZAO[nome]
+            colunas[nome] = {'tipo': 'razao', 'numerador': numerador, 'denominador': denominador}
+        elif pd.api.types.is_datetime64_any_dtype(serie):
+            # factorize dá -1 ao NaT; no pacote, ausente é null (como nos textos), nunca um índice
+            data_base = serie.min().normalize() if serie.notna().any() else pd.Timestamp('1970-01-01')
+            codigos, unicos = pd.factorize(serie)
+            tabela = [[int((ts.normalize() - data_base).days), int((ts - ts.normalize()).total_seconds())]
+                      for ts in unicos]
+            colunas[nome] = {'tipo': 'tempo', 'base': data_base.strftime('%Y-%m-%d'),
+                             'tabela': tabela, 'codigos': [None if c < 0 else c for c in codigos.tolist()]}
+        elif pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+            colunas[nome] = {'tipo': 'numero', 'valores': _lista_numerica(serie)}
+        else:
+            colunas[nome] = {'tipo': 'texto',
+                             'codigos': [None if pd.isna(v) else codigo(str(v)) for v in serie]}
+
+    return {
+        'formato': FORMATO,
+        'linhas': len(df),
+        'strings': list(strings),
+        'colunas': colunas
+    }
+
+
+def codificar_json(df):
+    return json.dumps(codificar(df), ensure_ascii=False, separators=(',', ':'))
+
+
+def decodificar(pacote):
+    """Reconstrói o DataFrame (mesma lógica do decodificador JavaScript)"""
+    strings = pacote['strings']
+    dados = {}
+    for nome, coluna in pacote['colunas'].items():
+        if coluna['tipo'] == 'texto':
+            dados[nome] = [None if c is None else strings[c] for c in coluna['codigos']]
+        elif coluna['tipo'] == 'numero':
+            dados[nome] = coluna['valores']
+        elif coluna['tipo'] == 'tempo':
+            base = pd.Timestamp(coluna['base'])
+            tempos = [base + pd.Timedelta(days=dia, seconds=segundos) for dia, segundos in coluna['tabela']]
+            dados[nome] = pd.to_datetime([pd.NaT if c is None else tempos[c] for c in coluna['codigos']])
+        else:
+            dados[nome] = None
+
+    df = pd.DataFrame(dados, columns=list(pacote['colunas']))
+    for nome, coluna in pacote['colunas'].items():
+        if coluna['tipo'] == 'razao':
+            numerador, denominador = df[coluna['numerador']], df[coluna['denominador']]
+            df[nome] = (numerador / denominador.where(denominador > 0, 1)).where(denominador > 0, 0)
+    return df
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Coleta de detalhes por parceiro da Livelo
+Visita as páginas individuais (url do dimensoes.json) com HTTP simples e,
+quando a página depende de JavaScript, com um pool limitado de Chrome headless
+Coleta faixas de paridade, data de fim da promoção e regras
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import queue
+import random
+import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+ARQUIVO_DIMENSOES = "dimensoes.json"
+ARQUIVO_SAIDA = os.path.join("output", "detalhes_parceiros.json")
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+]
+
+PADRAO_PARIDADE = re.compile(r'(\d+(?:[.,]\d+)?)\s*pontos?\s*(?:por|a cada)\s*(R\$|U\$|US\$)\s*(\d+(?:[.,]\d+)?)', re.IGNORECASE)
+PADRAO_PARIDADE_ATE = re.compile(r'(R\$|U\$|US\$)\s*(\d+(?:[.,]\d+)?)\s*até\s*(\d+)', re.IGNORECASE)
+PADRAO_FIM_PROMOCAO = re.compile(r'(?:válid[oa]|promoção|oferta)[^\n]{0,40}?até\s*(?:o dia\s*)?(\d{1,2}/\d{1,2}(?:/\d{2,4})?)', re.IGNORECASE)
+PALAVRAS_REGRAS = ['regulamento', 'regra', 'válido', 'valido', 'exceto', 'não acumula', 'limite', 'elegíve', 'prazo']
+
+
+def _numero(texto):
+    return float(texto.replace(',', '.'))
+
+
+def _moeda(texto):
+    return 'U$' if texto.upper() in ('U$', 'US$') else 'R$'
+
+
+def extrair_detalhes_texto(texto):
+    """Extrai faixas de paridade, fim da promoção e regras do texto da página"""
+    paridades = []
+    vistos = set()
+
+    for match in PADRAO_PARIDADE.finditer(texto):
+        faixa = (_moeda(match.group(2)), _numero(match.group(3)), _numero(match.group(1)))
+        if faixa not in vistos:
+            vistos.add(faixa)
+            paridades.append({'moeda': faixa[0], 'valor': faixa[1], 'pontos': faixa[2]})
+
+    for match in PADRAO_PARIDADE_ATE.finditer(texto):
+        faixa = (_moeda(match.group(1)), _numero(match.group(2)), _numero(match.group(3)))
+        if faixa not in vistos:
+            vistos.add(faixa)
+            paridades.append({'moeda': faixa[0], 'valor': faixa[1], 'pontos': faixa[2]})
+
+    fim_promocao = PADRAO_FIM_PROMOCAO.search(texto)
+
+    regras = []
+    for linha in texto.splitlines():
+        linha = linha.strip()
+        if 20 <= len(linha) <= 400 and any(p in linha.lower() for p in PALAVRAS_REGRAS) and linha not in regras:
+            regras.append(linha)
+
+    return {
+        'paridades': paridades,
+        'fim_promocao': fim_promocao.group(1) if fim_promocao else None,
+        'regras': regras[:20]
+    }
+
+
+def texto_de_html(html):
+    """Texto visível do HTML (sem script/style), uma linha por nó de texto"""
+    from lxml import html as lxml_html, etree
+
+    arvore = lxml_html.fromstring(html)
+    etree.strip_elements(arvore, 'script', 'style', 'noscript', with_tail=False)
+    return '\n'.join(t.strip() for t in arvore.itertext() if t.strip())
+
+
+def segundos_retry_after(valor):
+    """Segundos pedidos no Retry-After (número ou data HTTP); None se ausente ou inválido"""
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0)
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data is None:
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max((data - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class LimitadorHost:
+    """Politeness por host: concorrência máxima e intervalo mínimo entre requisições"""
+
+    def __init__(self, max_por_host=2, intervalo_minimo=1.0):
+        self.max_por_host = max_por_host
+        self.intervalo_minimo = intervalo_minimo
+        self._lock = threading.Lock()
+        self._semaforos = {}
+        self._proxima_liberacao = {}
+
+    def penalizar(self, url, segundos):
+        """Adia as próximas requisições ao host (ex.: após 429/403)"""
+        host = urlparse(url).netloc
+        with self._lock:
+            self._proxima_liberacao[host] = max(self._proxima_liberacao.get(host, 0), time.monotonic() + segundos)
+
+    @contextmanager
+    def reservar(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaforo = self._semaforos.setdefault(host, threading.Semaphore(self.max_por_host))
+
+        semaforo.acquire()
+        try:
+            with self._lock:
+                agora = time.monotonic()
+                liberacao = max(agora, self._proxima_liberacao.get(host, 0))
+                self._proxima_liberacao[host] = liberacao + self.intervalo_minimo
+            if liberacao > agora:
+                time.sleep(liberacao - agora)
+            yield
+        finally:
+            semaforo.release()
+
+
+class LiveloDetalhesScraper:
+    def __init__(self, modo="auto", concorrencia=4, max_por_host=2, intervalo_host=1.0,
+                 max_navegadores=2, timeout=30, tentativas=3):
+        # "http": apenas requests | "navegador": apenas Chrome | "auto": HTTP com fallback para Chrome
+        self.modo = modo
+        self.concorrencia = concorrencia
+        self.max_navegadores = max_navegadores
+        self.timeout = timeout
+        self.tentativas = tentativas
+        self.limitador = LimitadorHost(max_por_host, intervalo_host)
+
+        self._sessoes = threading.local()
+        self._pool_navegadores = queue.Queue()
+        self._navegadores_criados = 0
+        self._lock_navegadores = threading.Lock()
+
+        self.stats = {
+            'paginas': 0,
+            'http_ok': 0,
+            'navegador_ok': 0,
+            'sem_dados': 0,
+            'falhas': 0,
+            'http_falhas': 0,
+            'bloqueios': 0,
+            'tempo_total': 0.0,
+            'latencias': []
+        }
+        self._lock_stats = threading.Lock()
+
+    def carregar_parceiros(self, arquivo=ARQUIVO_DIMENSOES):
+        """Carrega os parceiros com url do dimensoes.json"""
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        parceiros = [p for p in data.get('parceiros', []) if p.get('url')]
+        print(f"✓ {len(parceiros)} parceiros com URL carregados")
+        return parceiros
+
+    def _registrar(self, chave, latencia=None):
+        with self._lock_stats:
+            self.stats[chave] += 1
+            if latencia is not None:
+                self.stats['latencias'].append(latencia)
+
+    # ========== HTTP ==========
+    def _sessao(self):
+        sessao = getattr(self._sessoes, 'sessao', None)
+        if sessao is None:
+            import requests
+            sessao = requests.Session()
+            sessao.headers.update({
+                'User-Agent': random.choice(USER_AGENTS),
+                'Accept-Language': 'pt-BR,pt;q=0.9'
+            })
+            self._sessoes.sessao = sessao
+        return sessao
+
+    def buscar_http(self, url):
+        """Baixa a página via HTTP respeitando o limite por host, com backoff em bloqueios"""
+        for tentativa in range(self.tentativas):
+            with self.limitador.reservar(url):
+                inicio = time.time()
+                resposta = self._sessao().get(url, timeout=self.timeout)
+                latencia = time.time() - inicio
+
+            if resposta.status_code in (403, 429, 503):
+                self._registrar('bloqueios')
+                espera = segundos_retry_after(resposta.headers.get('Retry-After')) or (2 ** tentativa) * 5
+                print(f"⚠ {resposta.status_code} em {url} - aguardando {espera:.0f}s")
+                self.limitador.penalizar(url, espera)
+                continue
+
+            resposta.raise_for_status()
+            if 'charset' not in resposta.headers.get('Content-Type', '').lower():
+                resposta.encoding = 'utf-8'
+            return resposta.text, latencia
+
+        raise RuntimeError(f"bloqueado após {self.tentativas} tentativas")
+
+    # ========== NAVEGADOR ==========
+    def _obter_navegador(self):
+        """Empresta um Chrome do pool, criando até max_navegadores instâncias"""
+        try:
+            return self._pool_navegadores.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock_navegadores:
+            criar = self._navegadores_criados < self.max_navegadores
+            if criar:
+                self._navegadores_criados += 1
+
+        if not criar:
+            return self._pool_navegadores.get()
+
+        from livelo_scraper import LiveloScraper
+        scraper = LiveloScraper()
+        if not scraper.iniciar_navegador():
+            with self._lock_navegadores:
+                self._navegadores_criados -= 1
+            raise RuntimeError("não foi possível iniciar o Chrome")
+        return scraper.driver
+
+    def buscar_navegador(self, url):
+        """Renderiza a página em um Chrome do pool e retorna o texto visível"""
+        from selenium.webdriver.common.by import By
+
+        driver = self._obter_navegador()
+        try:
+            with self.limitador.reservar(url):
+                inicio = time.time()
+                driver.get(url)
+                time.sleep(2)
+                texto = driver.find_element(By.TAG_NAME, 'body').text
+                latencia = time.time() - inicio
+            return texto, latencia
+        finally:
+            self._pool_navegadores.put(driver)
+
+    def encerrar_navegadores(self):
+        while not self._pool_navegadores.empty():
+            try:
+                self._pool_navegadores.get_nowait().quit()
+            except Exception:
+                pass
+
+    # ========== COLETA ==========
+    def coletar_parceiro(self, parceiro):
+        """Coleta os detalhes de um parceiro (HTTP primeiro, Chrome se necessário)"""
+        url = parceiro['url']
+        resultado = {
+            'nome_aplicativo': parceiro.get('nome_aplicativo'),
+            'codigo': parceiro.get('codigo'),
+            'url': url,
+            'coletado_em': datetime.now().isoformat(),
+            'fonte': None,
+            'erro': None
+        }
+
+        try:
+            detalhes = None
+            if self.modo == 'http':
+                html, latencia = self.buscar_http(url)
+                detalhes = extrair_detalhes_texto(texto_de_html(html))
+                resultado['fonte'] = 'http'
+                self._registrar('http_ok', latencia)
+            elif self.modo == 'auto':
+                # Bloqueio, timeout ou erro de conexão no HTTP: a página ainda vai para o Chrome
+                try:
+                    html, latencia = self.buscar_http(url)
+                    detalhes = extrair_detalhes_texto(texto_de_html(html))
+                    if detalhes['paridades']:
+                        resultado['fonte'] = 'http'
+                        self._registrar('http_ok', latencia)
+                except Exception as e:
+                    print(f"⚠ HTTP falhou em {url} ({e}) - tentando Chrome")
+                    self._registrar('http_falhas')
+
+            if resultado['fonte'] is None:
+                texto, latencia = self.buscar_navegador(url)
+                detalhes = extrair_detalhes_texto(texto)
+                resultado['fonte'] = 'navegador'
+                self._registrar('navegador_ok', latencia)
+
+            resultado.update(detalhes)
+            if not detalhes['paridades']:
+                self._registrar('sem_dados')
+
+        except Exception as e:
+            resultado['erro'] = str(e)
+            self._registrar('falhas')
+
+        self._registrar('paginas')
+        return resultado
+
+    def executar(self, limite=None, arquivo_saida=ARQUIVO_SAIDA):
+        """Coleta todos os parceiros com o pool limitado e salva o resultado"""
+        print("=== LIVELO DETALHES POR PARCEIRO ===")
+        print(f"⚙️ Modo: {self.modo} | concorrência: {self.concorrencia} | "
+              f"por host: {self.limitador.max_por_host} | intervalo host: {self.limitador.intervalo_minimo}s")
+
+        parceiros = self.carregar_parceiros()
+        if limite:
+            parceiros = parceiros[:limite]
+
+        resultados = []
+        inicio = time.time()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concorrencia) as executor:
+                futuros = [executor.submit(self.coletar_parceiro, p) for p in parceiros]
+                for i, futuro in enumerate(as_completed(futuros), 1):
+                    resultado = futuro.result()
+                    resultados.append(resultado)
+                    if i <= 10 or i % 25 == 0 or i == len(futuros):
+                        status = "✓" if resultado.get('paridades') else ("✗" if resultado['erro'] else "○")
+                        print(f"{status} {i}/{len(futuros)}: {resultado['nome_aplicativo']} ({resultado['fonte']})")
+        finally:
+            self.encerrar_navegadores()
+
+        self.stats['tempo_total'] = time.time() - inicio
+
+        os.makedirs(os.path.dirname(arquivo_saida), exist_ok=True)
+        with open(arquivo_saida, 'w', encoding='utf-8') as f:
+            json.dump({
+                'metadata': {
+                    'gerado_em': datetime.now().isoformat(),
+                    'modo': self.modo,
+                    'concorrencia': self.concorrencia,
+                    'relatorio': self.relatorio_vazao()
+                },
+                'parceiros': sorted(resultados, key=lambda r: r['nome_aplicativo'] or '')
+            }, f, indent=2, ensure_ascii=False)
+        print(f"✓ Detalhes salvos: {arquivo_saida}")
+
+        self.imprimir_relatorio()
+        return resultados
+
+    def relatorio_vazao(self):
+        """Resumo de vazão (páginas/min) e status da coleta"""
+        tempo = self.stats['tempo_total']
+        latencias = sorted(self.stats['latencias'])
+        return {
+            'paginas': self.stats['paginas'],
+            'tempo_total_s': round(tempo, 2),
+            'paginas_por_minuto': round(self.stats['paginas'] / tempo * 60, 1) if tempo > 0 else 0,
+            'latencia_media_s': round(sum(latencias) / len(latencias), 2) if latencias else 0,
+            'latencia_p90_s': round(latencias[int(len(latencias) * 0.9) - 1], 2) if latencias else 0,
+            'http_ok': self.stats['http_ok'],
+            'navegador_ok': self.stats['navegador_ok'],
+            'sem_dados': self.stats['sem_dados'],
+            'falhas': self.stats['falhas'],
+            'http_falhas': self.stats['http_falhas'],
+            'bloqueios': self.stats['bloqueios']
+        }
+
+    def imprimir_relatorio(self):
+        r = self.relatorio_vazao()
+        print("\n" + "=" * 60)
+        print("📊 RELATÓRIO DE VAZÃO")
+        print("=" * 60)
+        print(f"📄 Páginas: {r['paginas']} em {r['tempo_total_s']:.1f}s")
+        print(f"⚡ Vazão: {r['paginas_por_minuto']} páginas/min")
+        print(f"⏱ Latência média: {r['latencia_media_s']}s | p90: {r['latencia_p90_s']}s")
+        print(f"🌐 HTTP: {r['http_ok']} (falhas: {r['http_falhas']}) | 🧭 Chrome: {r['navegador_ok']}")
+        print(f"○ Sem dados: {r['sem_dados']} | ✗ Falhas: {r['falhas']} | 🚫 Bloqueios: {r['bloqueios']}")
+        print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Livelo - detalhes por parceiro')
+    parser.add_argument('--modo', choices=['auto', 'http', 'navegador'], default='auto',
+                       help='auto: HTTP com fallback para Chrome')
+    parser.add_argument('--concorrencia', type=int, default=4,
+                       help='Número de workers simultâneos')
+    parser.add_argument('--por-host', type=int, default=2,
+                       help='Máximo de requisições simultâneas por host')
+    parser.add_argument('--intervalo-host', type=float, default=1.0,
+                       help='Intervalo mínimo (s) entre requisições ao mesmo host')
+    parser.add_argument('--navegadores', type=int, default=2,
+                       help='Máximo de instâncias de Chrome no pool')
+    parser.add_argument('--limite', type=int, default=None,
+                       help='Processar apenas os N primeiros parceiros')
+    args = parser.parse_args()
+
+    scraper = LiveloDetalhesScraper(
+        modo=args.modo,
+        concorrencia=args.concorrencia,
+        max_por_host=args.por_host,
+        intervalo_host=args.intervalo_host,
+        max_navegadores=args.navegadores
+    )
+    resultados = scraper.executar(limite=args.limite)
+    sys.exit(0 if resultados else 1)
+
+
+if __name__ == "__main__":
+    main()
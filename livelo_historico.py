@@ -0,0 +1,934 @@
+#!/usr/bin/env python3
+"""
+Armazenamento do histórico Livelo
+Partições diárias em Parquet (historico/data=AAAA-MM-DD/parte.parquet):
+cada coleta grava apenas a partição do dia, sem reescrever o histórico inteiro
+Alternativa compacta (historico_intervalos/): cada Parceiro+Moeda vira intervalos
+de validade [início, fim] enquanto Oferta, Valor e Pontos não mudam; os registros
+diários são materializados só na leitura
+Banco SQLite (WAL) com dimensão de parceiros e snapshots diários indexados,
+para consultas pontuais (último snapshot, anterior, histórico de um parceiro)
+Estado acumulado por Parceiro+Moeda (primeiro registro, última mudança, ofertas),
+atualizado só com o dia novo a cada execução do relatório
+Log de eventos por Parceiro+Moeda (ganhou/perdeu oferta, pontos subiram/caíram,
+apareceu/sumiu) derivado das coletas, gerado sob demanda (livelo_historico.py eventos)
+e estendido só com os dias novos
+O livelo_parceiros.xlsx passa a ser uma exportação sob demanda
+"""
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import numpy as np
+import pandas as pd
+
+PASTA_HISTORICO = "historico"
+PASTA_INTERVALOS = "historico_intervalos"
+ARQUIVO_BANCO = "livelo_historico.db"
+ARQUIVO_DIMENSOES = "dimensoes.json"
+ARQUIVO_EXCEL = "livelo_parceiros.xlsx"
+ARQUIVO_ESTADO = "estado_parceiros.parquet"
+ARQUIVO_EVENTOS = "eventos_ofertas.parquet"
+COLUNAS = ['Timestamp', 'Parceiro', 'Oferta', 'Moeda', 'Valor', 'Pontos']
+CHAVES = ['Parceiro', 'Moeda']
+
+
+def _normalizar_compacto(df):
+    """Histórico compacto do reporter (categorias, Oferta booleana, 32 bits) no formato gravado em disco"""
+    colunas = {}
+    for coluna in CHAVES:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            colunas[coluna] = df[coluna].astype(df[coluna].cat.categories.dtype)
+    if pd.api.types.is_bool_dtype(df['Oferta']):
+        colunas['Oferta'] = df['Oferta'].map({True: 'Sim', False: 'Não'}).astype(str)
+    for coluna in ['Valor', 'Pontos']:
+        if pd.api.types.is_integer_dtype(df[coluna]):
+            colunas[coluna] = df[coluna].astype('int64')
+        elif pd.api.types.is_float_dtype(df[coluna]):
+            colunas[coluna] = df[coluna].astype('float64')
+    return df.assign(**colunas) if colunas else df
+
+
+class HistoricoParquet:
+    def __init__(self, pasta=PASTA_HISTORICO):
+        self.pasta = pasta
+
+    def disponivel(self):
+        """Parquet requer pyarrow"""
+        try:
+            import pyarrow  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _pasta_dia(self, data):
+        return os.path.join(self.pasta, f"data={data}")
+
+    def _arquivo_dia(self, data):
+        return os.path.join(self._pasta_dia(data), "parte.parquet")
+
+    def datas(self):
+        """Datas (AAAA-MM-DD) com partição gravada, em ordem crescente"""
+        if not os.path.isdir(self.pasta):
+            return []
+        datas = []
+        for nome in os.listdir(self.pasta):
+            if nome.startswith("data=") and os.path.exists(os.path.join(self.pasta, nome, "parte.parquet")):
+                datas.append(nome[len("data="):])
+        return sorted(datas)
+
+    def vazio(self):
+        return not self.datas()
+
+    def _normalizar(self, df):
+        """Mantém o esquema do histórico com tipos colunares"""
+        df = df[COLUNAS].copy()
+        df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+        for coluna in ['Valor', 'Pontos']:
+            df[coluna] = _numero_canonico(df[coluna])
+        return df
+
+    def salvar_dia(self, df):
+        """Grava (ou substitui) as partições das datas presentes no DataFrame"""
+        df = self._normalizar(df)
+        datas_gravadas = []
+
+        for data, df_dia in df.groupby(df['Timestamp'].dt.strftime('%Y-%m-%d')):
+            os.makedirs(self._pasta_dia(data), exist_ok=True)
+            destino = self._arquivo_dia(data)
+            temporario = destino + ".tmp"
+            df_dia.reset_index(drop=True).to_parquet(temporario, index=False, compression='zstd')
+            os.replace(temporario, destino)
+            datas_gravadas.append(data)
+
+        return datas_gravadas
+
+    def carregar(self, data_inicio=None, data_fim=None):
+        """Lê as partições no intervalo [data_inicio, data_fim] (AAAA-MM-DD, inclusivo)"""
+        datas = [d for d in self.datas()
+                 if (data_inicio is None or d >= str(data_inicio)) and (data_fim is None or d <= str(data_fim))]
+        if not datas:
+            return pd.DataFrame(columns=COLUNAS)
+
+        partes = [pd.read_parquet(self._arquivo_dia(d)) for d in datas]
+        return pd.concat(partes, ignore_index=True)
+
+    def migrar_de_excel(self, arquivo=ARQUIVO_EXCEL):
+        """Importa um livelo_parceiros.xlsx existente para as partições diárias"""
+        if not os.path.exists(arquivo):
+            return 0
+
+        df = pd.read_excel(arquivo)
+        datas = self.salvar_dia(df)
+        print(f"✓ Histórico migrado para Parquet: {len(df)} registros em {len(datas)} partições")
+        return len(datas)
+
+    def arquivos_do_dia(self, data):
+        """Arquivos que guardam os registros de uma data (AAAA-MM-DD)"""
+        return [self._arquivo_dia(data)]
+
+    def garantir_migracao(self, arquivo=ARQUIVO_EXCEL):
+        """Na primeira execução, traz o histórico do Excel para o armazenamento"""
+        if self.vazio() and os.path.exists(arquivo):
+            self.migrar_de_excel(arquivo)
+
+    def excel_atualizado(self, arquivo=ARQUIVO_EXCEL):
+        """True se o Excel é mais recente que todos os arquivos do histórico"""
+        if not os.path.exists(arquivo):
+            return False
+        mtime_excel = os.path.getmtime(arquivo)
+        for raiz, _, nomes in os.walk(self.pasta):
+            if any(os.path.getmtime(os.path.join(raiz, n)) > mtime_excel for n in nomes):
+                return False
+        return True
+
+    def exportar_excel(self, arquivo=ARQUIVO_EXCEL, df=None):
+        """Exporta o histórico completo para Excel (download do dashboard)"""
+        df = self.carregar() if df is None else df.copy()
+        df['Timestamp'] = df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+        temporario = arquivo + ".tmp.xlsx"
+        df.to_excel(temporario, index=False)
+        shutil.move(temporario, arquivo)
+        return len(df)
+
+
+def _numero_canonico(serie):
+    """Valor/Pontos em float64; int64 se todos forem inteiros e não nulos (como no round-trip pelo Excel)"""
+    valores = pd.to_numeric(serie, errors='coerce').astype('float64')
+    if valores.notna().all() and (valores % 1 == 0).all():
+        valores = valores.astype('int64')
+    return valores
+
+
+def _texto_canonico(serie):
+    """Texto no tipo padrão de strings do pandas, preservando os nulos"""
+    return serie.astype(str).where(serie.notna())
+
+
+def _um_registro_por_dia(df):
+    """Primeira coleta de cada Parceiro+Moeda em cada dia (a mesma regra no estado e nos eventos)"""
+    ordenado = df.sort_values('Timestamp', kind='stable')
+    return ordenado[~ordenado[CHAVES].assign(Data=ordenado['Timestamp'].dt.normalize()).duplicated(keep='first')]
+
+
+def _iguais(a, b):
+    """Igualdade elemento a elemento em que dois nulos contam como iguais"""
+    return (a == b) | (a.isna() & b.isna())
+
+
+class HistoricoIntervalos(HistoricoParquet):
+    """Histórico em intervalos de validade por Parceiro+Moeda, com a mesma interface das partições"""
+
+    COLUNAS_INTERVALOS = CHAVES + ['Ocorrencia', 'Data_Inicio', 'Data_Fim', 'Oferta', 'Valor', 'Pontos', 'Coletas']
+    # Ocorrencia separa registros repetidos de um Parceiro+Moeda no mesmo dia
+    CHAVES_INTERVALO = CHAVES + ['Ocorrencia']
+
+    def __init__(self, pasta=PASTA_INTERVALOS):
+        super().__init__(pasta)
+        self.arquivo_intervalos = os.path.join(pasta, "intervalos.parquet")
+        self.arquivo_coletas = os.path.join(pasta, "coletas.parquet")
+
+    def existe(self):
+        return os.path.exists(self.arquivo_intervalos) and os.path.exists(self.arquivo_coletas)
+
+    def datas(self):
+        """Datas (AAAA-MM-DD) de coleta, em ordem crescente"""
+        if not self.existe():
+            return []
+        return pd.read_parquet(self.arquivo_coletas)['Data'].dt.strftime('%Y-%m-%d').tolist()
+
+    def arquivos_do_dia(self, data):
+        return [self.arquivo_intervalos, self.arquivo_coletas]
+
+    def carregar_intervalos(self):
+        """(intervalos, coletas) - coletas tem uma linha por dia: Data e Timestamp da coleta"""
+        if not self.existe():
+            return self._finalizar(pd.DataFrame()), pd.DataFrame({'Data': pd.to_datetime([]), 'Timestamp': pd.to_datetime([])})
+        return pd.read_parquet(self.arquivo_intervalos), pd.read_parquet(self.arquivo_coletas)
+
+    def gravar_intervalos(self, intervalos, coletas):
+        os.makedirs(self.pasta, exist_ok=True)
+        for df, destino in [(intervalos, self.arquivo_intervalos), (coletas, self.arquivo_coletas)]:
+            temporario = destino + ".tmp"
+            df.to_parquet(temporario, index=False, compression='zstd')
+            os.replace(temporario, destino)
+
+    def construir(self, df):
+        """Intervalos a partir de registros diários: um novo intervalo quando o valor muda ou há um dia ausente"""
+        df = self._normalizar(df)
+        df = df.assign(Data=df['Timestamp'].dt.normalize())
+        coletas = df.groupby('Data', as_index=False)['Timestamp'].min()
+        posicao = pd.Series(np.arange(len(coletas)), index=coletas['Data'])
+
+        df['Ocorrencia'] = df.groupby(CHAVES + ['Data'], sort=False).cumcount()
+        df['_posicao'] = df['Data'].map(posicao)
+        df = df.sort_values(self.CHAVES_INTERVALO + ['_posicao'], kind='stable').reset_index(drop=True)
+
+        anterior = df.groupby(self.CHAVES_INTERVALO, sort=False)[['Oferta', 'Valor', 'Pontos', '_posicao']].shift(1)
+        continua = (anterior['_posicao'] == df['_posicao'] - 1) & _iguais(df['Oferta'], anterior['Oferta']) & \
+            _iguais(df['Valor'], anterior['Valor']) & _iguais(df['Pontos'], anterior['Pontos'])
+        df['_intervalo'] = (~continua).cumsum()
+
+        intervalos = df.groupby('_intervalo', sort=False).agg(
+            Parceiro=('Parceiro', 'first'),
+            Moeda=('Moeda', 'first'),
+            Ocorrencia=('Ocorrencia', 'first'),
+            Data_Inicio=('Data', 'first'),
+            Data_Fim=('Data', 'last'),
+            Oferta=('Oferta', 'first'),
+            Valor=('Valor', 'first'),
+            Pontos=('Pontos', 'first'),
+            Coletas=('Data', 'size')
+        )
+        return self._finalizar(intervalos), coletas
+
+    def expandir(self, intervalos, coletas, data_inicio=None, data_fim=None):
+        """Registros diários (colunas do histórico) dos intervalos no período [data_inicio, data_fim]"""
+        datas = coletas['Data']
+        selecionadas = np.ones(len(datas), dtype=bool)
+        if data_inicio is not None:
+            selecionadas &= (datas >= pd.Timestamp(data_inicio)).to_numpy()
+        if data_fim is not None:
+            selecionadas &= (datas <= pd.Timestamp(data_fim)).to_numpy()
+        if not selecionadas.any() or intervalos.empty:
+            return pd.DataFrame(columns=COLUNAS)
+        primeira, ultima = np.flatnonzero(selecionadas)[[0, -1]]
+
+        posicao = pd.Series(np.arange(len(datas)), index=datas)
+        inicio = np.maximum(intervalos['Data_Inicio'].map(posicao).to_numpy(), primeira)
+        fim = np.minimum(intervalos['Data_Fim'].map(posicao).to_numpy(), ultima)
+        repeticoes = np.clip(fim - inicio + 1, 0, None)
+
+        # Cada intervalo se repete uma vez por coleta; a posição avança de 1 em 1 dentro dele
+        linhas = np.repeat(np.arange(len(intervalos)), repeticoes)
+        deslocamento = np.arange(len(linhas)) - np.repeat(np.cumsum(repeticoes) - repeticoes, repeticoes)
+        posicoes = inicio[linhas] + deslocamento
+
+        # Intervalos já vêm ordenados por Parceiro+Moeda: basta ordenar (estável) pela coleta
+        ordem = np.argsort(posicoes, kind='stable')
+        df = intervalos.take(linhas[ordem])[['Parceiro', 'Oferta', 'Moeda', 'Valor', 'Pontos']].reset_index(drop=True)
+        df.insert(0, 'Timestamp', coletas['Timestamp'].to_numpy()[posicoes[ordem]])
+        return df
+
+    def carregar(self, data_inicio=None, data_fim=None):
+        """Materializa os registros diários no intervalo [data_inicio, data_fim] (AAAA-MM-DD, inclusivo)"""
+        intervalos, coletas = self.carregar_intervalos()
+        return self.expandir(intervalos, coletas, data_inicio, data_fim)
+
+    def _remover_ultimo_dia(self, intervalos, coletas):
+        """Desfaz a última coleta (para regravar o dia)"""
+        ultima = coletas['Data'].iloc[-1]
+        intervalos = intervalos[intervalos['Data_Inicio'] != ultima].copy()
+        encerrados = intervalos['Data_Fim'] == ultima
+        if len(coletas) > 1:
+            intervalos.loc[encerrados, 'Data_Fim'] = coletas['Data'].iloc[-2]
+        intervalos.loc[encerrados, 'Coletas'] -= 1
+        return intervalos, coletas.iloc[:-1]
+
+    def _acrescentar_dia(self, intervalos, coletas, df_dia):
+        """Estende os intervalos abertos que não mudaram e abre novos para o restante"""
+        data = df_dia['Timestamp'].min().normalize()
+        dia = df_dia.assign(Ocorrencia=df_dia.groupby(CHAVES, sort=False).cumcount())
+
+        abertos = intervalos[intervalos['Data_Fim'] == coletas['Data'].iloc[-1]] if len(coletas) else intervalos.iloc[0:0]
+        dia = dia.merge(
+            abertos[self.CHAVES_INTERVALO + ['Oferta', 'Valor', 'Pontos']].rename_axis('_indice').reset_index(),
+            on=self.CHAVES_INTERVALO, how='left', suffixes=('', '_aberto')
+        )
+        continua = dia['_indice'].notna() & _iguais(dia['Oferta'], dia['Oferta_aberto']) & \
+            _iguais(dia['Valor'], dia['Valor_aberto']) & _iguais(dia['Pontos'], dia['Pontos_aberto'])
+
+        estendidos = dia.loc[continua, '_indice'].astype('int64')
+        intervalos = intervalos.copy()
+        intervalos.loc[estendidos, 'Data_Fim'] = data
+        intervalos.loc[estendidos, 'Coletas'] += 1
+
+        novos = dia[~continua].assign(Data_Inicio=data, Data_Fim=data, Coletas=1)
+        coletas = pd.concat([coletas, pd.DataFrame({'Data': [data], 'Timestamp': [df_dia['Timestamp'].min()]})],
+                            ignore_index=True)
+        return self._finalizar(pd.concat([intervalos, novos], ignore_index=True)), coletas
+
+    def salvar_dia(self, df):
+        """Incorpora (ou substitui) as datas presentes no DataFrame"""
+        df = self._normalizar(df)
+        intervalos, coletas = self.carregar_intervalos()
+        datas_gravadas = []
+
+        for data, df_dia in df.groupby(df['Timestamp'].dt.normalize()):
+            ultima = coletas['Data'].iloc[-1] if len(coletas) else None
+            if ultima is not None and data < ultima:
+                # Reprocessamento de um dia antigo: reconstrói a partir dos registros diários
+                historico = self.expandir(intervalos, coletas)
+                historico = historico[historico['Timestamp'].dt.normalize() != data]
+                intervalos, coletas = self.construir(pd.concat([historico, df_dia], ignore_index=True))
+            else:
+                if ultima is not None and data == ultima:
+                    intervalos, coletas = self._remover_ultimo_dia(intervalos, coletas)
+                intervalos, coletas = self._acrescentar_dia(intervalos, coletas, df_dia)
+            datas_gravadas.append(data.strftime('%Y-%m-%d'))
+
+        self.gravar_intervalos(intervalos, coletas)
+        return datas_gravadas
+
+    def garantir_migracao(self, arquivo=ARQUIVO_EXCEL):
+        """Na primeira execução, traz o histórico das partições diárias (ou do Excel)"""
+        if not self.vazio():
+            return
+        particoes = HistoricoParquet()
+        if not particoes.vazio():
+            self.migrar_de_particoes(particoes)
+        elif os.path.exists(arquivo):
+            self.migrar_de_excel(arquivo)
+
+    def migrar_de_particoes(self, historico_parquet):
+        """Converte as partições diárias em intervalos"""
+        intervalos, coletas = self.construir(historico_parquet.carregar())
+        self.gravar_intervalos(intervalos, coletas)
+        print(f"✓ Histórico convertido em intervalos: {len(intervalos)} intervalos, {len(coletas)} coletas")
+        return intervalos, coletas
+
+    def _finalizar(self, intervalos):
+        """Esquema canônico: o mesmo tipo por coluna seja a tabela construída de uma vez ou dia a dia"""
+        intervalos = intervalos.reindex(columns=self.COLUNAS_INTERVALOS)
+        intervalos = intervalos.astype({'Ocorrencia': 'int64', 'Coletas': 'int64'})
+        for coluna in ['Parceiro', 'Moeda', 'Oferta']:
+            intervalos[coluna] = _texto_canonico(intervalos[coluna])
+        for coluna in ['Valor', 'Pontos']:
+            intervalos[coluna] = _numero_canonico(intervalos[coluna])
+        intervalos['Data_Inicio'] = pd.to_datetime(intervalos['Data_Inicio'])
+        intervalos['Data_Fim'] = pd.to_datetime(intervalos['Data_Fim'])
+        return intervalos.sort_values(self.CHAVES_INTERVALO + ['Data_Inicio'], kind='stable').reset_index(drop=True)
+
+
+def abrir_historico():
+    """Armazenamento em uso: intervalos (depois de 'livelo_historico.py intervalos') ou partições diárias"""
+    intervalos = HistoricoIntervalos()
+    return intervalos if intervalos.existe() else HistoricoParquet()
+
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS parceiros (
+    nome_aplicativo TEXT PRIMARY KEY,
+    codigo TEXT,
+    slug TEXT,
+    categoria TEXT,
+    tier TEXT,
+    url TEXT,
+    logo_link TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    data TEXT NOT NULL,
+    Timestamp TEXT NOT NULL,
+    Parceiro TEXT NOT NULL,
+    Oferta TEXT,
+    Moeda TEXT NOT NULL,
+    Valor NUMERIC,
+    Pontos NUMERIC
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_parceiro_moeda_ts ON snapshots (Parceiro, Moeda, Timestamp);
+CREATE INDEX IF NOT EXISTS idx_snapshots_data ON snapshots (data);
+"""
+
+
+class HistoricoSQLite:
+    def __init__(self, arquivo=ARQUIVO_BANCO):
+        self.arquivo = arquivo
+        self._conexao = None
+
+    def conectar(self):
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.arquivo)
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            self._conexao.executescript(ESQUEMA_SQLITE)
+        return self._conexao
+
+    def fechar(self):
+        """Fecha a conexão (o checkpoint do WAL deixa tudo no .db para o commit)"""
+        if self._conexao is not None:
+            self._conexao.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conexao.close()
+            self._conexao = None
+
+    def _consultar(self, sql, parametros=()):
+        df = pd.read_sql_query(sql, self.conectar(), params=parametros)
+        if 'Timestamp' in df.columns:
+            df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+        return df
+
+    # ========== CARGA ==========
+    def carregar_dimensoes(self, arquivo=ARQUIVO_DIMENSOES):
+        """Atualiza a tabela de parceiros a partir do dimensoes.json"""
+        if not os.path.exists(arquivo):
+            return 0
+
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            parceiros = json.load(f).get('parceiros', [])
+
+        conexao = self.conectar()
+        with conexao:
+            conexao.executemany(
+                "INSERT OR REPLACE INTO parceiros (nome_aplicativo, codigo, slug, categoria, tier, url, logo_link) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(p.get('nome_aplicativo'), p.get('codigo'), p.get('slug'), p.get('categoria'),
+                  str(p.get('tier', '')), p.get('url'), p.get('logo_link')) for p in parceiros]
+            )
+        return len(parceiros)
+
+    def salvar_dia(self, df):
+        """Grava (ou substitui) os snapshots das datas presentes no DataFrame"""
+        df = df[COLUNAS].copy()
+        timestamps = pd.to_datetime(df['Timestamp'])
+        df['Timestamp'] = timestamps.dt.strftime('%Y-%m-%d %H:%M:%S')
+        df.insert(0, 'data', timestamps.dt.strftime('%Y-%m-%d'))
+        datas = sorted(df['data'].unique())
+
+        conexao = self.conectar()
+        with conexao:
+            conexao.executemany("DELETE FROM snapshots WHERE data = ?", [(d,) for d in datas])
+            conexao.executemany(
+                "INSERT INTO snapshots (data, Timestamp, Parceiro, Oferta, Moeda, Valor, Pontos) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+            )
+        return datas
+
+    def sincronizar(self, historico_parquet):
+        """Copia do Parquet as datas que ainda não estão no banco; retorna as datas copiadas"""
+        no_banco = set(self.datas())
+        faltantes = [d for d in historico_parquet.datas() if d not in no_banco]
+        if not faltantes:
+            return []
+
+        # Uma leitura só do intervalo; datas que já estão no banco são descartadas
+        df = historico_parquet.carregar(faltantes[0], faltantes[-1])
+        df = df[pd.to_datetime(df['Timestamp']).dt.strftime('%Y-%m-%d').isin(faltantes)]
+        self.salvar_dia(df)
+        print(f"✓ Banco SQLite sincronizado: {len(faltantes)} dias adicionados")
+        return faltantes
+
+    # ========== CONSULTAS ==========
+    def datas(self):
+        """Datas com snapshot, em ordem crescente"""
+        linhas = self.conectar().execute("SELECT DISTINCT data FROM snapshots ORDER BY data").fetchall()
+        return [linha[0] for linha in linhas]
+
+    def snapshot(self, data):
+        """Todos os registros coletados em uma data (AAAA-MM-DD)"""
+        return self._consultar(
+            "SELECT Timestamp, Parceiro, Oferta, Moeda, Valor, Pontos FROM snapshots WHERE data = ?", (str(data),)
+        )
+
+    def _data_por_posicao(self, posicao):
+        linha = self.conectar().execute(
+            "SELECT DISTINCT data FROM snapshots ORDER BY data DESC LIMIT 1 OFFSET ?", (posicao,)
+        ).fetchone()
+        return linha[0] if linha else None
+
+    def snapshot_mais_recente(self):
+        data = self._data_por_posicao(0)
+        return self.snapshot(data) if data else pd.DataFrame(columns=COLUNAS)
+
+    def snapshot_anterior(self):
+        data = self._data_por_posicao(1)
+        return self.snapshot(data) if data else pd.DataFrame(columns=COLUNAS)
+
+    def historico_parceiro(self, parceiro, moeda=None):
+        """Histórico de um parceiro (opcionalmente de uma moeda) em ordem cronológica"""
+        if moeda is None:
+            return self._consultar(
+                "SELECT Timestamp, Parceiro, Oferta, Moeda, Valor, Pontos FROM snapshots "
+                "WHERE Parceiro = ? ORDER BY Moeda, Timestamp", (parceiro,)
+            )
+        return self._consultar(
+            "SELECT Timestamp, Parceiro, Oferta, Moeda, Valor, Pontos FROM snapshots "
+            "WHERE Parceiro = ? AND Moeda = ? ORDER BY Timestamp", (parceiro, moeda)
+        )
+
+    def intervalo(self, data_inicio=None, data_fim=None):
+        """Registros entre duas datas (AAAA-MM-DD, inclusivo)"""
+        return self._consultar(
+            "SELECT Timestamp, Parceiro, Oferta, Moeda, Valor, Pontos FROM snapshots "
+            "WHERE data >= ? AND data <= ? ORDER BY Timestamp",
+            (str(data_inicio or '0000-00-00'), str(data_fim or '9999-99-99'))
+        )
+
+    def dimensao_parceiro(self, nome_aplicativo):
+        linha = self.conectar().execute(
+            "SELECT nome_aplicativo, codigo, slug, categoria, tier, url, logo_link FROM parceiros WHERE nome_aplicativo = ?",
+            (nome_aplicativo,)
+        ).fetchone()
+        if not linha:
+            return None
+        return dict(zip(['nome_aplicativo', 'codigo', 'slug', 'categoria', 'tier', 'url', 'logo_link'], linha))
+
+
+class EstadoParceiros:
+    """Estado por Parceiro+Moeda: primeiro e último registro e contagens de ofertas
+    (as transições - última mudança, última oferta - ficam no log de EventosOfertas)"""
+
+    COLUNAS_ESTADO = CHAVES + [
+        'Primeiro_Timestamp', 'Total_Registros',
+        'Timestamp', 'Oferta', 'Valor', 'Pontos',
+        'Total_Ofertas', 'Soma_Pontos_Ofertas'
+    ]
+
+    def __init__(self, arquivo=ARQUIVO_ESTADO):
+        self.arquivo = arquivo
+
+    def disponivel(self):
+        return HistoricoParquet().disponivel()
+
+    def carregar(self):
+        """Estado salvo (ou None se não existir / estiver ilegível)"""
+        if not os.path.exists(self.arquivo):
+            return None
+        try:
+            estado = pd.read_parquet(self.arquivo)
+        except Exception as e:
+            print(f"⚠️ Estado ilegível ({e}) - será reconstruído")
+            return None
+        if list(estado.columns) != self.COLUNAS_ESTADO:
+            print("⚠️ Estado em formato antigo - será reconstruído")
+            return None
+        return estado
+
+    def salvar(self, estado):
+        temporario = self.arquivo + ".tmp"
+        estado.to_parquet(temporario, index=False, compression='zstd')
+        os.replace(temporario, self.arquivo)
+
+    def data_referencia(self, estado):
+        """Último dia (AAAA-MM-DD) já incorporado ao estado"""
+        if estado is None or estado.empty:
+            return None
+        return estado['Timestamp'].max().strftime('%Y-%m-%d')
+
+    def construir(self, df):
+        """Reconstrói o estado a partir do histórico completo (já limpo)"""
+        df = _um_registro_por_dia(_normalizar_compacto(df))
+        historico = df.sort_values(CHAVES + ['Timestamp'], kind='stable').reset_index(drop=True)
+        grupos = historico.groupby(CHAVES, sort=False)
+
+        ultimo = grupos.tail(1).set_index(CHAVES)[['Timestamp', 'Oferta', 'Valor', 'Pontos']]
+        resumo = grupos.agg(
+            Primeiro_Timestamp=('Timestamp', 'min'),
+            Total_Registros=('Timestamp', 'size')
+        )
+
+        ofertas = historico[historico['Oferta'] == 'Sim']
+        resumo_ofertas = ofertas.groupby(CHAVES, sort=False).agg(
+            Total_Ofertas=('Pontos', 'size'),
+            Soma_Pontos_Ofertas=('Pontos', 'sum')
+        )
+
+        estado = resumo.join(ultimo).join(resumo_ofertas).reset_index()
+        return self._finalizar(estado)
+
+    def incorporar_dia(self, estado, df_dia):
+        """Aplica um novo dia (um registro por Parceiro+Moeda) ao estado - custo proporcional aos parceiros"""
+        dia = _um_registro_por_dia(_normalizar_compacto(df_dia[COLUNAS]))
+        df = estado.merge(dia, on=CHAVES, how='outer', suffixes=('', '_novo'), indicator=True)
+
+        visto = df['_merge'] != 'left_only'
+        novo = df['_merge'] == 'right_only'
+
+        for coluna in ['Timestamp', 'Oferta', 'Valor', 'Pontos']:
+            df[coluna] = df[f'{coluna}_novo'].where(visto, df[coluna])
+
+        df['Primeiro_Timestamp'] = df['Primeiro_Timestamp'].where(~novo, df['Timestamp'])
+        df['Total_Registros'] = df['Total_Registros'].fillna(0) + visto
+
+        oferta_hoje = visto & (df['Oferta'] == 'Sim')
+        df['Total_Ofertas'] = df['Total_Ofertas'].fillna(0) + oferta_hoje
+        df['Soma_Pontos_Ofertas'] = df['Soma_Pontos_Ofertas'].fillna(0) + df['Pontos'].where(oferta_hoje, 0)
+
+        return self._finalizar(df)
+
+    def _finalizar(self, estado):
+        """Mesmo esquema na reconstrução e no incremental (o merge externo deixa inteiros em float64)"""
+        estado = estado[self.COLUNAS_ESTADO].copy()
+        estado['Soma_Pontos_Ofertas'] = estado['Soma_Pontos_Ofertas'].fillna(0)
+        for coluna in ['Valor', 'Pontos', 'Soma_Pontos_Ofertas']:
+            estado[coluna] = _numero_canonico(estado[coluna])
+        for coluna in CHAVES + ['Oferta']:
+            estado[coluna] = _texto_canonico(estado[coluna])
+        for coluna in ['Primeiro_Timestamp', 'Timestamp']:
+            estado[coluna] = pd.to_datetime(estado[coluna]).astype('datetime64[ns]')
+        estado['Total_Registros'] = estado['Total_Registros'].astype('int64')
+        estado['Total_Ofertas'] = estado['Total_Ofertas'].fillna(0).astype('int64')
+        return estado.sort_values(CHAVES).reset_index(drop=True)
+
+
+class EventosOfertas:
+    """Uma linha por transição de estado de Parceiro+Moeda entre coletas consecutivas"""
+
+    COLUNAS_EVENTOS = CHAVES + [
+        'Timestamp', 'Evento', 'Oferta', 'Valor', 'Pontos',
+        'Timestamp_Anterior', 'Oferta_Anterior', 'Valor_Anterior', 'Pontos_Anterior'
+    ]
+    # Uma transição pode mudar oferta, pontos e valor ao mesmo tempo; vale o primeiro da lista
+    EVENTOS = ['apareceu', 'sumiu', 'ganhou_oferta', 'perdeu_oferta', 'pontos_subiram', 'pontos_cairam', 'valor_mudou']
+
+    def __init__(self, arquivo=ARQUIVO_EVENTOS):
+        self.arquivo = arquivo
+
+    def disponivel(self):
+        return HistoricoParquet().disponivel()
+
+    def carregar(self):
+        """(eventos, último dia incorporado) - (None, None) se não existir / estiver ilegível"""
+        if not os.path.exists(self.arquivo):
+            return None, None
+        try:
+            import pyarrow.parquet as pq
+            tabela = pq.read_table(self.arquivo)
+        except Exception as e:
+            print(f"⚠️ Log de eventos ilegível ({e}) - será reconstruído")
+            return None, None
+        eventos = tabela.to_pandas()
+        if list(eventos.columns) != self.COLUNAS_EVENTOS:
+            print("⚠️ Log de eventos em formato antigo - será reconstruído")
+            return None, None
+        referencia = (tabela.schema.metadata or {}).get(b'data_referencia')
+        return self._finalizar(eventos), referencia.decode() if referencia else None
+
+    def salvar(self, eventos, data_referencia):
+        """Grava o log com o último dia incorporado nos metadados do Parquet"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        tabela = pa.Table.from_pandas(eventos, preserve_index=False)
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[b'data_referencia'] = str(data_referencia).encode()
+        temporario = self.arquivo + ".tmp"
+        pq.write_table(tabela.replace_schema_metadata(metadados), temporario, compression='zstd')
+        os.replace(temporario, self.arquivo)
+
+    def _detectar(self, df):
+        """Eventos de um trecho do histórico (um registro por Parceiro+Moeda e dia)"""
+        df = _normalizar_compacto(df)
+        df = df.assign(Data=df['Timestamp'].dt.normalize())
+        df = df.sort_values(['Timestamp'], kind='stable').drop_duplicates(subset=CHAVES + ['Data'], keep='first')
+        df = df.sort_values(CHAVES + ['Timestamp'], kind='stable').reset_index(drop=True)
+
+        # Posição de cada dia entre as coletas: dias consecutivos de coleta diferem em 1
+        inicio_dias = df.groupby('Data')['Timestamp'].min().sort_index()
+        posicao = pd.Series(np.arange(len(inicio_dias)), index=inicio_dias.index)
+        df['_posicao'] = df['Data'].map(posicao)
+
+        grupos = df.groupby(CHAVES, sort=False)
+        anterior = grupos[['Timestamp', 'Oferta', 'Valor', 'Pontos', '_posicao']].shift(1)
+        proxima = grupos['_posicao'].shift(-1)
+        consecutivo = anterior['_posicao'] == df['_posicao'] - 1
+
+        oferta = df['Oferta'] == 'Sim'
+        oferta_anterior = anterior['Oferta'] == 'Sim'
+        condicoes = [
+            ~consecutivo,
+            consecutivo & oferta & ~oferta_anterior,
+            consecutivo & ~oferta & oferta_anterior,
+            consecutivo & (df['Pontos'] > anterior['Pontos']),
+            consecutivo & (df['Pontos'] < anterior['Pontos']),
+            consecutivo & (df['Valor'] != anterior['Valor'])
+        ]
+        evento = pd.Series(
+            np.select(condicoes, ['apareceu', 'ganhou_oferta', 'perdeu_oferta', 'pontos_subiram',
+                                  'pontos_cairam', 'valor_mudou'], default=''),
+            index=df.index
+        )
+        transicoes = df[evento != ''].assign(
+            Evento=evento,
+            Timestamp_Anterior=anterior['Timestamp'],
+            Oferta_Anterior=anterior['Oferta'],
+            Valor_Anterior=anterior['Valor'],
+            Pontos_Anterior=anterior['Pontos']
+        )
+        # "apareceu" depois de um intervalo guarda o último registro antes dele (vazio na primeira aparição)
+        # Sumiu: não está na coleta seguinte (exceto na última coleta do trecho)
+        ultima_posicao = len(inicio_dias) - 1
+        saidas = df[(proxima != df['_posicao'] + 1) & (df['_posicao'] < ultima_posicao)]
+        sumidos = pd.DataFrame({
+            'Parceiro': saidas['Parceiro'],
+            'Moeda': saidas['Moeda'],
+            'Timestamp': (saidas['_posicao'] + 1).map(pd.Series(inicio_dias.values, index=posicao.values)),
+            'Evento': 'sumiu',
+            'Timestamp_Anterior': saidas['Timestamp'],
+            'Oferta_Anterior': saidas['Oferta'],
+            'Valor_Anterior': saidas['Valor'],
+            'Pontos_Anterior': saidas['Pontos']
+        })
+
+        eventos = pd.concat([transicoes, sumidos], ignore_index=True)
+        return self._finalizar(eventos)
+
+    def construir(self, df):
+        """Reconstrói o log a partir do histórico completo (já limpo)"""
+        return self._detectar(df)
+
+    def atualizar(self, historico):
+        """Deixa o log em dia com o histórico: estende com o último dia ou reconstrói"""
+        datas = historico.datas()
+        if not datas:
+            return None
+        eventos, referencia = self.carregar()
+        if eventos is not None and referencia == datas[-1]:
+            return eventos
+
+        if eventos is not None and len(datas) > 1 and referencia == datas[-2]:
+            novos = self.incorporar_dia(eventos, historico.carregar(datas[-2], datas[-2]),
+                                        historico.carregar(datas[-1], datas[-1]))
+            print(f"✓ Log de eventos: {len(novos) - len(eventos)} eventos em {datas[-1]}")
+            eventos = novos
+        else:
+            eventos = self.construir(historico.carregar())
+            print(f"✓ Log de eventos reconstruído: {len(eventos)} eventos")
+        self.salvar(eventos, datas[-1])
+        return eventos
+
+    def incorporar_dia(self, eventos, df_ontem, df_dia):
+        """Acrescenta os eventos do novo dia comparando-o só com a coleta anterior"""
+        novos = self._detectar(pd.concat([df_ontem[COLUNAS], df_dia[COLUNAS]], ignore_index=True))
+        inicio_dia = df_dia['Timestamp'].min()
+        novos = novos[novos['Timestamp'] >= inicio_dia].copy()
+
+        # Quem volta depois de um intervalo: o estado anterior é o que o último "sumiu" guardou
+        anteriores = ['Timestamp_Anterior', 'Oferta_Anterior', 'Valor_Anterior', 'Pontos_Anterior']
+        saidas = eventos[eventos['Evento'] == 'sumiu'].groupby(CHAVES, sort=False, observed=True).tail(1)
+        retornos = novos['Evento'] == 'apareceu'
+        if retornos.any() and not saidas.empty:
+            ultimo_estado = novos.loc[retornos, CHAVES].join(saidas.set_index(CHAVES)[anteriores], on=CHAVES)
+            novos.loc[retornos, anteriores] = ultimo_estado[anteriores]
+        return self._finalizar(pd.concat([eventos, novos], ignore_index=True))
+
+    def _finalizar(self, eventos):
+        eventos = eventos.reindex(columns=self.COLUNAS_EVENTOS).copy()
+        for coluna in ['Valor', 'Pontos', 'Valor_Anterior', 'Pontos_Anterior']:
+            eventos[coluna] = eventos[coluna].astype('float64')
+        for coluna in ['Oferta', 'Oferta_Anterior']:
+            eventos[coluna] = eventos[coluna].astype(object).where(eventos[coluna].notna(), None)
+        for coluna in ['Timestamp', 'Timestamp_Anterior']:
+            eventos[coluna] = pd.to_datetime(eventos[coluna])
+        eventos['Evento'] = pd.Categorical(eventos['Evento'], categories=self.EVENTOS)
+        return eventos.sort_values(CHAVES + ['Timestamp'], kind='stable').reset_index(drop=True)
+
+    def ultimas_mudancas(self, eventos):
+        """Última mudança de oferta, pontos ou valor de cada Parceiro+Moeda; os campos *_Anterior
+        são o registro mais recente diferente do estado atual (a volta após um intervalo só conta
+        se voltou diferente)"""
+        voltou_diferente = (eventos['Evento'] == 'apareceu') & eventos['Timestamp_Anterior'].notna() & (
+            (eventos['Pontos'] != eventos['Pontos_Anterior']) |
+            (eventos['Valor'] != eventos['Valor_Anterior']) |
+            (eventos['Oferta'] != eventos['Oferta_Anterior'])
+        )
+        mudancas = eventos[~eventos['Evento'].isin(['apareceu', 'sumiu']) | voltou_diferente]
+        return mudancas.groupby(CHAVES, sort=False, observed=True).tail(1).set_index(CHAVES)
+
+    def resumo_ofertas(self, eventos, data_referencia=None):
+        """Períodos em oferta, último registro em oferta (data e pontos) e dias desde então, por Parceiro+Moeda"""
+        inicio_oferta = (eventos['Evento'] == 'ganhou_oferta') | \
+            ((eventos['Evento'] == 'apareceu') & (eventos['Oferta'] == 'Sim'))
+        fim_oferta = eventos['Evento'].isin(['perdeu_oferta', 'sumiu']) & (eventos['Oferta_Anterior'] == 'Sim')
+
+        ultimo = eventos.groupby(CHAVES, sort=False, observed=True).tail(1).set_index(CHAVES)
+        em_oferta = (ultimo['Oferta'] == 'Sim') & (ultimo['Evento'] != 'sumiu')
+
+        # Fim do período mais recente: o registro anterior ao evento é o último em oferta
+        fim = eventos[fim_oferta].groupby(CHAVES, sort=False, observed=True).tail(1).set_index(CHAVES)
+        resumo = pd.DataFrame({
+            'Periodos_Oferta': eventos[inicio_oferta].groupby(CHAVES, observed=True).size(),
+            'Timestamp_Ultima_Oferta': fim['Timestamp_Anterior'],
+            'Pontos_Ultima_Oferta': fim['Pontos_Anterior']
+        }).reindex(ultimo.index)
+        resumo['Periodos_Oferta'] = resumo['Periodos_Oferta'].fillna(0).astype('int64')
+        resumo['Em_Oferta'] = em_oferta
+
+        referencia = pd.Timestamp(data_referencia) if data_referencia else eventos['Timestamp'].max()
+        resumo.loc[em_oferta, 'Timestamp_Ultima_Oferta'] = referencia
+        resumo.loc[em_oferta, 'Pontos_Ultima_Oferta'] = ultimo.loc[em_oferta, 'Pontos']
+        resumo['Dias_Desde_Ultima_Oferta'] = (referencia.normalize() - resumo['Timestamp_Ultima_Oferta'].dt.normalize()).dt.days
+        return resumo
+
+
+def _snapshot_comparavel(df):
+    """Um registro por Parceiro+Moeda (o último do dia), na ordem da primeira aparição"""
+    df = df.reset_index(drop=True)
+    chaves = {coluna: df[coluna].astype(object) for coluna in CHAVES}
+    oferta = df['Oferta'] if pd.api.types.is_bool_dtype(df['Oferta']) else df['Oferta'] == 'Sim'
+    df = df.assign(Oferta=oferta.astype(bool), **chaves)
+    ordem = df.drop_duplicates(subset=CHAVES, keep='first').reset_index().set_index(CHAVES)['index']
+    snapshot = df.drop_duplicates(subset=CHAVES, keep='last').set_index(CHAVES)[['Oferta', 'Valor', 'Pontos']]
+    return snapshot.join(ordem.rename('_ordem'))
+
+
+def comparar_snapshots(hoje, ontem, limite_variacao=20):
+    """Mudanças entre dois snapshots (Parceiro+Moeda) num único merge; cada tabela vem
+    indexada pela posição no snapshot de hoje (no de ontem para os sumidos)"""
+    vazio = pd.DataFrame(columns=COLUNAS)
+    atual = _snapshot_comparavel(hoje if not hoje.empty else vazio)
+    anterior = _snapshot_comparavel(ontem if not ontem.empty else vazio)
+
+    df = atual.add_suffix('_Hoje').join(anterior.add_suffix('_Ontem'), how='outer').reset_index()
+    em_hoje = df['_ordem_Hoje'].notna()
+    em_ontem = df['_ordem_Ontem'].notna()
+    ambos = em_hoje & em_ontem
+    oferta_hoje = df['Oferta_Hoje'].fillna(False).astype(bool)
+    oferta_ontem = df['Oferta_Ontem'].fillna(False).astype(bool)
+
+    df['Variacao'] = np.nan
+    com_base = ambos & (df['Pontos_Ontem'] > 0)
+    df.loc[com_base, 'Variacao'] = (
+        (df.loc[com_base, 'Pontos_Hoje'] - df.loc[com_base, 'Pontos_Ontem']) / df.loc[com_base, 'Pontos_Ontem']
+    ) * 100
+
+    # O outer join deixa Valor/Pontos como float; volta ao tipo original onde não há lacunas
+    tipos = {**atual.add_suffix('_Hoje').dtypes.to_dict(), **anterior.add_suffix('_Ontem').dtypes.to_dict()}
+
+    def _tabela(mascara, ordem='_ordem_Hoje'):
+        tabela = df[mascara].copy()
+        for coluna in ['Valor_Hoje', 'Pontos_Hoje', 'Valor_Ontem', 'Pontos_Ontem']:
+            if pd.api.types.is_integer_dtype(tipos[coluna]) and tabela[coluna].notna().all():
+                tabela[coluna] = tabela[coluna].astype(tipos[coluna])
+        tabela.index = tabela[ordem].astype('int64').rename(None)
+        return tabela.drop(columns=['_ordem_Hoje', '_ordem_Ontem']).sort_index()
+
+    return {
+        'ganharam_oferta': _tabela(ambos & oferta_hoje & ~oferta_ontem),
+        'perderam_oferta': _tabela(ambos & ~oferta_hoje & oferta_ontem),
+        'novos_parceiros': _tabela(em_hoje & ~em_ontem),
+        'parceiros_sumidos': _tabela(em_ontem & ~em_hoje, '_ordem_Ontem'),
+        'grandes_mudancas_pontos': _tabela(df['Variacao'].abs() >= limite_variacao),
+        'mudancas_pontos': _tabela(ambos & (df['Pontos_Hoje'] != df['Pontos_Ontem']))
+    }
+
+
+def _tamanho_pasta(pasta):
+    return sum(os.path.getsize(os.path.join(raiz, nome)) for raiz, _, nomes in os.walk(pasta) for nome in nomes)
+
+
+def main():
+    comando = sys.argv[1] if len(sys.argv) > 1 else "info"
+    historico = abrir_historico()
+
+    if not historico.disponivel():
+        print("❌ pyarrow não instalado - necessário para o histórico Parquet")
+        print("Para instalar: pip install pyarrow")
+        sys.exit(1)
+
+    if comando == "migrar":
+        arquivo = sys.argv[2] if len(sys.argv) > 2 else ARQUIVO_EXCEL
+        historico.migrar_de_excel(arquivo)
+    elif comando == "sincronizar":
+        banco = HistoricoSQLite()
+        banco.carregar_dimensoes()
+        banco.sincronizar(historico)
+        print(f"📂 {banco.arquivo}: {len(banco.datas())} dias")
+        banco.fechar()
+    elif comando == "intervalos":
+        # intervalos [--remover-particoes]: passa a gravar o histórico em intervalos de validade
+        intervalos = HistoricoIntervalos()
+        particoes = HistoricoParquet()
+        if particoes.vazio():
+            print(f"❌ {particoes.pasta}/ sem partições - nada a converter")
+            sys.exit(1)
+        diario = particoes.carregar()
+        tabela, coletas = intervalos.migrar_de_particoes(particoes)
+        reconstruido = intervalos.expandir(tabela, coletas)
+
+        ordem = ['Timestamp', 'Parceiro', 'Moeda', 'Oferta', 'Valor', 'Pontos']
+        iguais = diario[COLUNAS].sort_values(ordem).reset_index(drop=True).equals(
+            reconstruido.sort_values(ordem).reset_index(drop=True))
+        print(f"📊 {len(diario)} registros → {len(tabela)} intervalos "
+              f"(média de {len(diario) / max(len(tabela), 1):.1f} coletas por intervalo)")
+        print(f"💾 {particoes.pasta}/: {_tamanho_pasta(particoes.pasta):,} bytes | "
+              f"{intervalos.pasta}/: {_tamanho_pasta(intervalos.pasta):,} bytes")
+        print("✓ Expansão confere com as partições" if iguais else "⚠️ Expansão difere das partições - mantenha as partições")
+
+        if iguais and "--remover-particoes" in sys.argv:
+            shutil.rmtree(particoes.pasta)
+            print(f"🗑️ {particoes.pasta}/ removido")
+    elif comando == "eventos":
+        # eventos [parceiro]: atualiza o log e mostra o resumo ou as transições de um parceiro
+        eventos = EventosOfertas().atualizar(historico)
+        if eventos is None:
+            print("❌ Histórico vazio - nada para gerar")
+            sys.exit(1)
+        if len(sys.argv) > 2:
+            print(eventos[eventos['Parceiro'] == sys.argv[2]].to_string(index=False))
+        else:
+            print(f"📂 {ARQUIVO_EVENTOS}: {len(eventos)} eventos até {historico.datas()[-1]}")
+            print(eventos['Evento'].value_counts().to_string())
+    elif comando == "exportar":
+        arquivo = sys.argv[2] if len(sys.argv) > 2 else ARQUIVO_EXCEL
+        total = historico.exportar_excel(arquivo)
+        print(f"✓ {total} registros exportados para {arquivo}")
+    else:
+        datas = historico.datas()
+        print(f"📂 {historico.pasta}: {len(datas)} dias")
+        if datas:
+            print(f"📅 {datas[0]} → {datas[-1]}")
+
+
+if __name__ == "__main__":
+    main()
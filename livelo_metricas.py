@@ -0,0 +1,299 @@
+"""
+Instrumentação das etapas do pipeline Livelo
+Cada etapa registra tempo real, tempo de CPU, memória residente (RSS) na entrada,
+na saída e o pico dentro dela, e linhas processadas; etapas abertas dentro de outra
+viram subetapas. Scraper e reporter usam o medidor global (MEDIDOR) e o main.py
+salva o registro da execução em JSON ao lado do main_livelo.log; no modo --isolado
+cada processo filho grava suas etapas num arquivo que o main.py incorpora.
+HistoricoExecucoes acumula as execuções num banco SQLite para acompanhar
+tendências e regressões (main.py --trend)
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+ARQUIVO_EXECUCAO = "execucao_livelo.json"
+ARQUIVO_METRICAS = "metricas_execucoes.db"
+# Definida pelo main.py (modo --isolado): arquivo onde o processo filho grava suas etapas
+VARIAVEL_ETAPAS_FILHO = "LIVELO_ETAPAS_FILHO"
+
+ESQUEMA_METRICAS = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inicio TEXT NOT NULL,
+    sucesso INTEGER,
+    modo TEXT,
+    total_segundos REAL,
+    rss_pico_mb REAL,
+    cards INTEGER,
+    registros_dia INTEGER,
+    registros_historico INTEGER,
+    tamanho_html INTEGER,
+    tamanho_dados INTEGER
+);
+CREATE TABLE IF NOT EXISTS etapas (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes (id),
+    etapa TEXT NOT NULL,
+    segundos REAL,
+    cpu_segundos REAL,
+    rss_pico_mb REAL,
+    linhas INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_etapas_execucao ON etapas (execucao_id);
+"""
+
+# Métricas da execução acompanhadas na tendência (além do tempo de cada etapa)
+METRICAS_EXECUCAO = ['total_segundos', 'rss_pico_mb', 'cards', 'registros_dia',
+                     'registros_historico', 'tamanho_html', 'tamanho_dados']
+
+
+def rss_pico_mb(filhos=False):
+    """Pico de memória residente do processo ou dos filhos já encerrados (Linux: KB, macOS: bytes)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def rss_atual_mb():
+    """Memória residente atual do processo (/proc/self/statm); None fora do Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+
+
+class MedidorEtapas:
+    def __init__(self):
+        self.inicio = datetime.now()
+        self.inicio_relogio = time.perf_counter()
+        self.etapas = []
+        self._abertas = []
+
+    @contextmanager
+    def etapa(self, nome, linhas=None):
+        """Mede o bloco; o registro devolvido aceita 'linhas' e outros campos extras"""
+        registro = {'etapa': nome, 'linhas': linhas}
+        destino = self._abertas[-1].setdefault('subetapas', []) if self._abertas else self.etapas
+        destino.append(registro)
+        self._abertas.append(registro)
+
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        registro['rss_inicio_mb'] = rss_atual_mb()
+        pico_antes = rss_pico_mb()
+        try:
+            yield registro
+        except BaseException:
+            registro['erro'] = True
+            raise
+        finally:
+            registro['segundos'] = round(time.perf_counter() - inicio, 3)
+            registro['cpu_segundos'] = round(time.process_time() - inicio_cpu, 3)
+            registro['rss_fim_mb'] = rss_atual_mb()
+            registro['rss_pico_mb'] = self._pico_na_etapa(pico_antes, registro)
+            self._abertas.pop()
+
+    @staticmethod
+    def _pico_na_etapa(pico_antes, registro):
+        """Pico dentro da etapa: o ru_maxrss se ele subiu durante ela; senão o maior RSS medido
+        na entrada/saída (o pico do processo foi atingido antes e não diz nada sobre esta etapa)"""
+        medidos = [v for v in (registro['rss_inicio_mb'], registro['rss_fim_mb']) if v is not None]
+        pico_depois = rss_pico_mb()
+        if pico_depois is not None and pico_antes is not None and pico_depois > pico_antes:
+            medidos.append(pico_depois)
+        return max(medidos) if medidos else None
+
+    def incorporar(self, arquivo):
+        """Anexa à etapa aberta as etapas gravadas por um processo filho (modo --isolado)"""
+        try:
+            with open(arquivo, encoding='utf-8') as f:
+                etapas = json.load(f).get('etapas', [])
+        except (OSError, ValueError):
+            return []
+        destino = self._abertas[-1].setdefault('subetapas', []) if self._abertas else self.etapas
+        destino.extend(etapas)
+        return etapas
+
+    @contextmanager
+    def processo_filho(self):
+        """Ambiente para um subprocesso gravar suas etapas; ao sair, elas viram subetapas da etapa aberta"""
+        descritor, arquivo = tempfile.mkstemp(prefix='etapas_', suffix='.json')
+        os.close(descritor)
+        os.remove(arquivo)
+        try:
+            yield dict(os.environ, **{VARIAVEL_ETAPAS_FILHO: arquivo})
+        finally:
+            self.incorporar(arquivo)
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+
+    def registro(self, **extras):
+        """Registro completo da execução (pronto para json.dump)"""
+        dados = {
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'total_segundos': round(time.perf_counter() - self.inicio_relogio, 3),
+            'cpu_segundos': round(time.process_time(), 3),
+            'rss_pico_mb': rss_pico_mb(),
+            'rss_pico_filhos_mb': rss_pico_mb(filhos=True),
+            'pid': os.getpid()
+        }
+        dados.update(extras)
+        dados['etapas'] = self.etapas
+        return dados
+
+    def salvar(self, arquivo=ARQUIVO_EXECUCAO, **extras):
+        dados = self.registro(**extras)
+        temporario = arquivo + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(temporario, arquivo)
+        return dados
+
+    def linhas_resumo(self, etapas=None, nivel=0):
+        """Linhas de texto (etapa, tempos, RSS) com subetapas indentadas"""
+        linhas = []
+        for registro in self.etapas if etapas is None else etapas:
+            if 'segundos' not in registro:
+                continue
+            texto = f"{'   ' * nivel}{registro['etapa']:<{34 - 3 * nivel}} {registro['segundos']:8.2f}s" \
+                    f"  cpu {registro['cpu_segundos']:7.2f}s"
+            if registro.get('rss_fim_mb') is not None:
+                texto += f"  rss {registro['rss_inicio_mb']:7.1f} → {registro['rss_fim_mb']:7.1f} MB"
+            if registro.get('rss_pico_mb') is not None:
+                texto += f"  pico {registro['rss_pico_mb']:7.1f} MB"
+            if registro.get('linhas') is not None:
+                texto += f"  {registro['linhas']:,} linhas"
+            linhas.append(texto)
+            linhas += self.linhas_resumo(registro.get('subetapas', []), nivel + 1)
+        return linhas
+
+
+def _achatar(etapas, prefixo=''):
+    """Etapas aninhadas como caminhos 'analise/carregar_dados'"""
+    linhas = []
+    for registro in etapas:
+        caminho = prefixo + registro['etapa']
+        linhas.append((caminho, registro))
+        linhas += _achatar(registro.get('subetapas', []), caminho + '/')
+    return linhas
+
+
+class HistoricoExecucoes:
+    def __init__(self, arquivo=ARQUIVO_METRICAS):
+        self.arquivo = arquivo
+        self._conexao = None
+
+    def conectar(self):
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.arquivo)
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.executescript(ESQUEMA_METRICAS)
+        return self._conexao
+
+    def fechar(self):
+        """Fecha a conexão (o checkpoint do WAL deixa tudo no .db para o commit)"""
+        if self._conexao is not None:
+            self._conexao.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conexao.close()
+            self._conexao = None
+
+    def registrar(self, registro, **metricas):
+        """Acrescenta uma execução (registro do MedidorEtapas + métricas extras); retorna o id"""
+        conexao = self.conectar()
+        with conexao:
+            cursor = conexao.execute(
+                "INSERT INTO execucoes (inicio, sucesso, modo, total_segundos, rss_pico_mb, cards, registros_dia, "
+                "registros_historico, tamanho_html, tamanho_dados) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (registro['inicio'], int(bool(registro.get('sucesso'))), registro.get('modo'),
+                 registro.get('total_segundos'), registro.get('rss_pico_mb'), metricas.get('cards'),
+                 metricas.get('registros_dia'), metricas.get('registros_historico'),
+                 metricas.get('tamanho_html'), metricas.get('tamanho_dados'))
+            )
+            execucao_id = cursor.lastrowid
+            conexao.executemany(
+                "INSERT INTO etapas (execucao_id, etapa, segundos, cpu_segundos, rss_pico_mb, linhas) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(execucao_id, caminho, r.get('segundos'), r.get('cpu_segundos'), r.get('rss_pico_mb'), r.get('linhas'))
+                 for caminho, r in _achatar(registro.get('etapas', []))]
+            )
+        return execucao_id
+
+    def series(self):
+        """Uma linha por execução bem-sucedida e uma coluna por métrica/etapa (segundos)"""
+        import pandas as pd
+        conexao = self.conectar()
+        execucoes = pd.read_sql_query(
+            f"SELECT id, inicio, {', '.join(METRICAS_EXECUCAO)} FROM execucoes WHERE sucesso = 1 ORDER BY id",
+            conexao
+        )
+        etapas = pd.read_sql_query(
+            "SELECT e.execucao_id AS id, e.etapa, e.segundos FROM etapas e "
+            "JOIN execucoes x ON x.id = e.execucao_id WHERE x.sucesso = 1", conexao
+        )
+        if not etapas.empty:
+            tempos = etapas.pivot_table(index='id', columns='etapa', values='segundos', aggfunc='sum')
+            execucoes = execucoes.merge(tempos.add_prefix('etapa:').reset_index(), on='id', how='left')
+        execucoes['inicio'] = pd.to_datetime(execucoes['inicio'])
+        return execucoes.set_index('id')
+
+    def tendencias(self, dias_base=14, limite=0.3, janela=7, minimo_segundos=1.0):
+        """Última execução contra a mediana móvel e a base dos dias anteriores"""
+        import pandas as pd
+        series = self.series()
+        if series.empty:
+            return pd.DataFrame()
+
+        atual = series.iloc[-1]
+        base = series.iloc[:-1]
+        base = base[base['inicio'] >= atual['inicio'] - pd.Timedelta(days=dias_base)]
+        recentes = series.iloc[-janela:]
+
+        linhas = []
+        for coluna in series.columns.drop('inicio'):
+            if pd.isna(atual[coluna]):
+                continue
+            mediana_base = base[coluna].median() if base[coluna].notna().sum() >= 3 else None
+            variacao = (atual[coluna] / mediana_base - 1) if mediana_base else None
+            # Etapas de poucos milissegundos oscilam muito em termos relativos
+            relevante = not (coluna.startswith('etapa:') or coluna == 'total_segundos') or \
+                (mediana_base is not None and atual[coluna] - mediana_base >= minimo_segundos)
+            linhas.append({
+                'serie': coluna,
+                'atual': atual[coluna],
+                'mediana_movel': recentes[coluna].median(),
+                'mediana_base': mediana_base,
+                'execucoes_base': int(base[coluna].notna().sum()),
+                'variacao': variacao,
+                'alerta': bool(variacao is not None and variacao > limite and relevante)
+            })
+        return pd.DataFrame(linhas)
+
+
+# Medidor compartilhado pelos módulos que rodam no mesmo processo do main.py
+MEDIDOR = MedidorEtapas()
+
+
+def etapa(nome, linhas=None):
+    return MEDIDOR.etapa(nome, linhas)
+
+
+def _salvar_etapas_filho():
+    """Processo filho do main.py --isolado: grava as etapas medidas ao terminar"""
+    if MEDIDOR.etapas:
+        MEDIDOR.salvar(os.environ[VARIAVEL_ETAPAS_FILHO])
+
+
+if os.environ.get(VARIAVEL_ETAPAS_FILHO):
+    atexit.register(_salvar_etapas_filho)
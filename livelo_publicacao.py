@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Publicação dos arquivos estáticos do public/
+- Arquivos de dados (public/data) ganham nomes com hash do conteúdo
+  (historico.<hash>.json), servidos com cache longo e imutável pelo firebase.json
+- O manifesto de parceiros e o index.html passam a apontar para os nomes com hash
+- HTML e dados ganham variantes .gz/.br pré-comprimidas (compressão máxima)
+  para servidores que entregam arquivos pré-comprimidos
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import hashlib
+
+PASTA_PUBLICA = "public"
+PADRAO_HASH = re.compile(r'\.[0-9a-f]{12}\.json$')
+PADRAO_MAPA_HTML = re.compile(r'const ARQUIVOS_PUBLICADOS = \{.*?\};')
+EXTENSOES_COMPRIMIDAS = ('.gz', '.br')
+MANIFESTO_PARCEIROS = "partners/manifest.json"
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def _hash_conteudo(caminho):
+    with open(caminho, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def _listar(pasta_dados):
+    """Caminhos relativos (com /) de todos os arquivos sob public/data"""
+    arquivos = []
+    for raiz, _, nomes in os.walk(pasta_dados):
+        for nome in nomes:
+            relativo = os.path.relpath(os.path.join(raiz, nome), pasta_dados)
+            arquivos.append(relativo.replace(os.sep, '/'))
+    return sorted(arquivos)
+
+
+def _renomear_com_hash(pasta_dados, relativo):
+    origem = os.path.join(pasta_dados, relativo)
+    base, extensao = os.path.splitext(relativo)
+    destino_relativo = f"{base}.{_hash_conteudo(origem)}{extensao}"
+    os.replace(origem, os.path.join(pasta_dados, destino_relativo))
+    return destino_relativo
+
+
+def aplicar_hash_dados(pasta=PASTA_PUBLICA):
+    """Renomeia os dados recém-gerados com hash e atualiza manifesto e index.html"""
+    pasta_dados = os.path.join(pasta, "data")
+    if not os.path.isdir(pasta_dados):
+        return {}
+
+    arquivos = _listar(pasta_dados)
+    originais = [a for a in arquivos
+                 if not PADRAO_HASH.search(a) and not a.endswith(EXTENSOES_COMPRIMIDAS + ('.tmp',))]
+    if not originais:
+        print("ℹ️ Dados já publicados com hash - nada a renomear")
+        return None
+
+    mapa = {}
+
+    # Arquivos de parceiros primeiro: o manifesto precisa dos nomes finais
+    for relativo in originais:
+        if relativo.startswith("partners/") and relativo != MANIFESTO_PARCEIROS:
+            mapa[relativo] = _renomear_com_hash(pasta_dados, relativo)
+
+    if MANIFESTO_PARCEIROS in originais:
+        caminho = os.path.join(pasta_dados, MANIFESTO_PARCEIROS)
+        with open(caminho, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+        for entrada in manifesto.get('parceiros', {}).values():
+            publicado = mapa.get(f"partners/{entrada['arquivo']}")
+            if publicado:
+                entrada['arquivo'] = publicado[len("partners/"):]
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False)
+
+    for relativo in originais:
+        if relativo not in mapa:
+            mapa[relativo] = _renomear_com_hash(pasta_dados, relativo)
+
+    # Remove versões com hash de execuções anteriores (e suas variantes comprimidas)
+    atuais = set(mapa.values())
+    removidos = 0
+    for relativo in _listar(pasta_dados):
+        base = relativo
+        for extensao in EXTENSOES_COMPRIMIDAS:
+            if base.endswith(extensao):
+                base = base[:-len(extensao)]
+        if PADRAO_HASH.search(base) and base not in atuais:
+            os.remove(os.path.join(pasta_dados, relativo))
+            removidos += 1
+
+    # A página recebe só os arquivos de entrada; os de parceiros vêm pelo manifesto
+    mapa_pagina = {original: publicado for original, publicado in mapa.items()
+                   if not original.startswith("partners/") or original == MANIFESTO_PARCEIROS}
+    arquivo_html = os.path.join(pasta, "index.html")
+    if os.path.exists(arquivo_html):
+        with open(arquivo_html, 'r', encoding='utf-8') as f:
+            html = f.read()
+        substituto = f"const ARQUIVOS_PUBLICADOS = {json.dumps(mapa_pagina, ensure_ascii=False)};"
+        html, substituicoes = PADRAO_MAPA_HTML.subn(lambda _: substituto, html, count=1)
+        if substituicoes:
+            with open(arquivo_html, 'w', encoding='utf-8') as f:
+                f.write(html)
+        else:
+            print("⚠️ index.html sem ARQUIVOS_PUBLICADOS - a página continuará usando os nomes originais")
+
+    print(f"✓ {len(mapa)} arquivos de dados com hash ({removidos} antigos removidos)")
+    return mapa
+
+
+def comprimir_arquivos(pasta=PASTA_PUBLICA):
+    """Gera .gz (nível 9) e .br (qualidade 11) do HTML e dos dados; retorna os tamanhos"""
+    brotli = _brotli()
+    if brotli is None:
+        print("⚠️ brotli não instalado - gerando apenas .gz (pip install brotli)")
+
+    alvos = []
+    if os.path.exists(os.path.join(pasta, "index.html")):
+        alvos.append(os.path.join(pasta, "index.html"))
+    pasta_dados = os.path.join(pasta, "data")
+    if os.path.isdir(pasta_dados):
+        alvos += [os.path.join(pasta_dados, a) for a in _listar(pasta_dados)
+                  if not a.endswith(EXTENSOES_COMPRIMIDAS + ('.tmp',))]
+
+    tamanhos = {'arquivos': len(alvos), 'original': 0, 'gzip': 0, 'brotli': 0 if brotli else None}
+    for caminho in alvos:
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+
+        comprimido_gz = gzip.compress(conteudo, compresslevel=9, mtime=0)
+        with open(caminho + '.gz', 'wb') as f:
+            f.write(comprimido_gz)
+        tamanhos['original'] += len(conteudo)
+        tamanhos['gzip'] += len(comprimido_gz)
+
+        if brotli:
+            comprimido_br = brotli.compress(conteudo, quality=11)
+            with open(caminho + '.br', 'wb') as f:
+                f.write(comprimido_br)
+            tamanhos['brotli'] += len(comprimido_br)
+
+    return tamanhos
+
+
+def publicar(pasta=PASTA_PUBLICA):
+    """Hash de conteúdo nos dados + variantes pré-comprimidas; retorna o resumo de tamanhos"""
+    mapa = aplicar_hash_dados(pasta)
+    tamanhos = comprimir_arquivos(pasta)
+    tamanhos['arquivos_com_hash'] = len(mapa) if mapa else 0
+
+    linha = f"📦 {tamanhos['arquivos']} arquivos: {tamanhos['original']:,} bytes → gzip {tamanhos['gzip']:,}"
+    if tamanhos['brotli'] is not None:
+        linha += f" | brotli {tamanhos['brotli']:,}"
+    print(linha)
+    return tamanhos
+
+
+if __name__ == "__main__":
+    publicar(sys.argv[1] if len(sys.argv) > 1 else PASTA_PUBLICA)
@@ -4,9 +4,15 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
 import sys
+import argparse
 from datetime import datetime, timedelta
 import numpy as np
 import json
+import re
+import unicodedata
+from livelo_historico import EstadoParceiros, EventosOfertas, abrir_historico, comparar_snapshots
+import livelo_colunar
+from livelo_metricas import etapa
 
 # DIRETÓRIOS BASE
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,14 +27,41 @@ LIVELO_AZUL = '#151f4f'
 LIVELO_AZUL_CLARO = '#6e77a8'
 LIVELO_AZUL_MUITO_CLARO = '#e8eaf2'
 
+ARQUIVO_ALIASES = "aliases_parceiros.json"
+
+# Campo do dimensoes.json -> (coluna, valor quando o campo falta)
+COLUNAS_DIMENSAO = {
+    'categoria': ('Categoria_Dimensao', 'Não definido'),
+    'tier': ('Tier', 'Não definido'),
+    'url': ('URL_Parceiro', ''),
+    'logo_link': ('Logo_Link', ''),
+    'codigo': ('Codigo_Parceiro', '')
+}
+# Copiadas em cada linha do histórico; URL e logo ficam só na tabela de dimensões
+COLUNAS_DIMENSAO_HISTORICO = ['Categoria_Dimensao', 'Tier', 'Codigo_Parceiro']
+# Textos repetidos em todas as linhas do histórico viram categorias
+COLUNAS_CATEGORICAS = ['Parceiro', 'Moeda'] + COLUNAS_DIMENSAO_HISTORICO
+
 class LiveloAnalytics:
-    def __init__(self, arquivo_entrada):
+    def __init__(self, arquivo_entrada, usar_historico=True, reconstruir_estado=False, df_entrada=None):
         self.arquivo_entrada = arquivo_entrada
+        # Histórico já carregado (pipeline em processo único do main.py)
+        self.df_entrada = df_entrada
+        self.usar_historico = usar_historico
+        self.reconstruir_estado = reconstruir_estado
+        self.estado_parceiros = None
+        self.eventos_ofertas = None
+        self.arquivos_dados = {}
         self.df_completo = None
         self.df_hoje = None
         self.df_ontem = None
         self.analytics = {}
         self.dimensoes = {}
+        self.df_dimensoes = pd.DataFrame()
+        self.aliases = {}
+        self.parceiros_nao_mapeados = []
+        self.nomes_dimensao = {}
+        self.memoria_historico = {}
         
 
     def carregar_dimensoes(self):
@@ -48,31 +81,129 @@ class LiveloAnalytics:
         except Exception as e:
             print(f"⚠️ Erro ao carregar dimensões: {e}")
             self.dimensoes = {}
+        
+        # Tabela indexada por nome_aplicativo, já com os textos finais das colunas
+        self.df_dimensoes = pd.DataFrame(
+            [[str(dim.get(chave, padrao)) for chave, (_, padrao) in COLUNAS_DIMENSAO.items()]
+             for dim in self.dimensoes.values()],
+            index=pd.Index(list(self.dimensoes), name='Nome_Dimensao'),
+            columns=[coluna for coluna, _ in COLUNAS_DIMENSAO.values()]
+        )
+        
+        # Aliases: nome coletado no site -> nome_aplicativo do dimensoes.json
+        self.aliases = {}
+        if os.path.exists(ARQUIVO_ALIASES):
+            try:
+                with open(ARQUIVO_ALIASES, 'r', encoding='utf-8') as f:
+                    self.aliases = json.load(f).get('aliases', {})
+            except Exception as e:
+                print(f"⚠️ Erro ao carregar aliases: {e}")
+    
+    def _chave_nome(self, nome):
+        """Nome sem acentos, caixa e pontuação (para casar variações do texto do site)"""
+        texto = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode()
+        return re.sub(r'[^a-z0-9]', '', texto.lower())
+    
+    def _resolver_nomes_dimensao(self, nomes):
+        """Nome coletado -> nome_aplicativo: exato, alias explícito ou nome normalizado único"""
+        por_chave = {}
+        for nome in self.df_dimensoes.index:
+            por_chave.setdefault(self._chave_nome(nome), []).append(nome)
+        
+        resolvidos = {}
+        por_alias = []
+        for nome in nomes:
+            if nome in self.df_dimensoes.index:
+                resolvidos[nome] = nome
+            elif self.aliases.get(nome) in self.df_dimensoes.index:
+                resolvidos[nome] = self.aliases[nome]
+                por_alias.append(nome)
+            elif len(por_chave.get(self._chave_nome(nome), [])) == 1:
+                resolvidos[nome] = por_chave[self._chave_nome(nome)][0]
+                por_alias.append(nome)
+        
+        if por_alias:
+            print(f"✓ {len(por_alias)} nomes associados às dimensões por alias: "
+                  + ", ".join(f"{n} → {resolvidos[n]}" for n in sorted(por_alias)))
+        return resolvidos
     
     def enriquecer_dados_com_dimensoes(self, df):
-        """Enriquece o DataFrame com dados das dimensões"""
-        df = df.copy()
+        """Enriquece o DataFrame com dados das dimensões (um merge pelos nomes resolvidos)"""
+        colunas = COLUNAS_DIMENSAO_HISTORICO
+        df = df.drop(columns=[coluna for coluna, _ in COLUNAS_DIMENSAO.values()], errors='ignore')
         
-        # Adicionar colunas das dimensões
-        df['Categoria_Dimensao'] = ''
-        df['Tier'] = ''
-        df['URL_Parceiro'] = ''
-        df['Logo_Link'] = ''
-        df['Codigo_Parceiro'] = ''
-        
-        for idx, row in df.iterrows():
-            parceiro = row['Parceiro']
-            if parceiro in self.dimensoes:
-                dim = self.dimensoes[parceiro]
-                df.at[idx, 'Categoria_Dimensao'] = str(dim.get('categoria', 'Não definido'))
-                df.at[idx, 'Tier'] = str(dim.get('tier', 'Não definido'))
-                df.at[idx, 'URL_Parceiro'] = str(dim.get('url', ''))
-                df.at[idx, 'Logo_Link'] = str(dim.get('logo_link', ''))
-                df.at[idx, 'Codigo_Parceiro'] = str(dim.get('codigo', ''))
-            else:
-                df.at[idx, 'Categoria_Dimensao'] = 'Não mapeado'
-                df.at[idx, 'Tier'] = 'Não mapeado'
+        nomes = df['Parceiro'].unique()
+        resolvidos = self._resolver_nomes_dimensao(nomes)
+        self.nomes_dimensao = resolvidos
+        
+        chaves = df['Parceiro'].map(resolvidos).rename('Nome_Dimensao')
+        enriquecido = df.join(chaves).merge(self.df_dimensoes[colunas], left_on='Nome_Dimensao', right_index=True, how='left')
+        enriquecido.index = df.index
+        enriquecido = enriquecido.drop(columns=['Nome_Dimensao'])
         
+        nao_mapeado = enriquecido['Categoria_Dimensao'].isna()
+        enriquecido.loc[nao_mapeado, ['Categoria_Dimensao', 'Tier']] = 'Não mapeado'
+        enriquecido[colunas] = enriquecido[colunas].fillna('')
+        
+        # Relatório único dos nomes sem dimensão (em vez de só marcar 'Não mapeado')
+        self.parceiros_nao_mapeados = sorted(set(nomes) - set(resolvidos))
+        if self.parceiros_nao_mapeados:
+            print(f"⚠️ {len(self.parceiros_nao_mapeados)} parceiros sem dimensão ({int(nao_mapeado.sum())} registros) "
+                  f"- adicione ao dimensoes.json ou ao {ARQUIVO_ALIASES}: {', '.join(self.parceiros_nao_mapeados)}")
+        
+        return enriquecido
+    
+    def atributo_dimensao(self, parceiros, coluna):
+        """Coluna da tabela de dimensões (ex.: URL_Parceiro) para uma série de parceiros"""
+        if coluna not in self.df_dimensoes.columns:
+            return pd.Series('', index=parceiros.index, dtype=object)
+        nomes = parceiros.astype(object).map(self.nomes_dimensao)
+        return nomes.map(self.df_dimensoes[coluna]).fillna('')
+    
+    def _numero_compacto(self, serie):
+        """int32/float32 quando a conversão não perde informação"""
+        if pd.api.types.is_integer_dtype(serie) or (serie.notna().all() and (serie % 1 == 0).all()):
+            if serie.notna().all() and serie.abs().max() < 2 ** 31:
+                return serie.astype('int32')
+        compacta = serie.astype('float32')
+        if compacta.astype('float64').equals(serie.astype('float64')):
+            return compacta
+        return serie
+    
+    def _compactar_historico(self, df):
+        """Layout compacto do histórico: categorias, Oferta booleana e números de 32 bits"""
+        antes = df.memory_usage(deep=True).sum()
+        
+        if not pd.api.types.is_bool_dtype(df['Oferta']):
+            df['Oferta'] = (df['Oferta'] == 'Sim').astype(bool)
+        for coluna in COLUNAS_CATEGORICAS:
+            if coluna in df.columns:
+                df[coluna] = df[coluna].astype('category')
+        for coluna in ['Valor', 'Pontos', 'Pontos_por_Moeda']:
+            if coluna in df.columns:
+                df[coluna] = self._numero_compacto(df[coluna])
+        
+        depois = df.memory_usage(deep=True).sum()
+        self.memoria_historico = {
+            'antes_mb': round(antes / 1024 / 1024, 2),
+            'depois_mb': round(depois / 1024 / 1024, 2)
+        }
+        print(f"🧮 Memória do histórico: {self.memoria_historico['antes_mb']:.1f} MB → "
+              f"{self.memoria_historico['depois_mb']:.1f} MB ({len(df)} registros)")
+        return df
+    
+    def _sem_categorias(self, df):
+        """Cópia com as colunas categóricas de volta a texto (tabelas pequenas de saída)"""
+        df = df.copy()
+        for coluna in df.select_dtypes('category').columns:
+            df[coluna] = df[coluna].astype(df[coluna].cat.categories.dtype)
+        return df
+    
+    def _oferta_como_texto(self, df):
+        """Oferta booleana volta a 'Sim'/'Não' (formato dos dados publicados e do Excel)"""
+        if pd.api.types.is_bool_dtype(df['Oferta']):
+            df = df.copy()
+            df['Oferta'] = np.where(df['Oferta'], 'Sim', 'Não')
         return df
         
     def carregar_dados(self):
@@ -82,14 +213,24 @@ class LiveloAnalytics:
         # Carregar dimensões primeiro
         self.carregar_dimensoes()
         
+        historico = abrir_historico()
+        usar_parquet = self.usar_historico and historico.disponivel() and not historico.vazio()
+        
         # Simples: apenas o nome do arquivo
-        if not os.path.exists(self.arquivo_entrada):
+        if self.df_entrada is None and not usar_parquet and not os.path.exists(self.arquivo_entrada):
             print(f"❌ Arquivo não encontrado: {self.arquivo_entrada}")
             return False
             
         try:
-            self.df_completo = pd.read_excel(self.arquivo_entrada)
-            print(f"✓ {len(self.df_completo)} registros carregados")
+            if self.df_entrada is not None:
+                self.df_completo = self.df_entrada.copy()
+                print(f"✓ {len(self.df_completo)} registros recebidos em memória")
+            elif usar_parquet:
+                self.df_completo = historico.carregar()
+                print(f"✓ {len(self.df_completo)} registros carregados do histórico Parquet ({len(historico.datas())} dias em {historico.pasta}/)")
+            else:
+                self.df_completo = pd.read_excel(self.arquivo_entrada)
+                print(f"✓ {len(self.df_completo)} registros carregados")
             
             # Converter timestamp para datetime
             self.df_completo['Timestamp'] = pd.to_datetime(self.df_completo['Timestamp'])
@@ -142,6 +283,8 @@ class LiveloAnalytics:
             lambda row: row['Pontos'] / row['Valor'] if row['Valor'] > 0 else 0, axis=1
         )
         
+        self.df_completo = self._compactar_historico(self.df_completo)
+        
         # Ordenar cronologicamente
         self.df_completo = self.df_completo.sort_values(['Timestamp', 'Parceiro', 'Moeda'])
         
@@ -194,8 +337,19 @@ class LiveloAnalytics:
         
         return f"{nivel} - AVG {media_pontos:.1f} pts"
     
-    def detectar_mudancas_ofertas(self):
-        """Detecta mudanças de status de ofertas entre ontem e hoje"""
+    def snapshot_do_dia(self, data):
+        """Registros de um dia do histórico (data: date, datetime ou 'AAAA-MM-DD')"""
+        data = pd.Timestamp(data).date()
+        return self.df_completo[self.df_completo['Timestamp'].dt.date == data]
+    
+    def tabelas_mudancas(self, data_hoje=None, data_ontem=None):
+        """Mudanças entre dois dias quaisquer como DataFrames (padrão: os dois mais recentes)"""
+        hoje = self.df_hoje if data_hoje is None else self.snapshot_do_dia(data_hoje)
+        ontem = self.df_ontem if data_ontem is None else self.snapshot_do_dia(data_ontem)
+        return comparar_snapshots(hoje, ontem)
+    
+    def detectar_mudancas_ofertas(self, data_hoje=None, data_ontem=None):
+        """Detecta mudanças de status de ofertas entre ontem e hoje (ou entre duas datas)"""
         mudancas = {
             'ganharam_oferta': [],
             'perderam_oferta': [],
@@ -204,85 +358,52 @@ class LiveloAnalytics:
             'grandes_mudancas_pontos': []
         }
         
-        if self.df_ontem.empty:
+        if data_ontem is None and self.df_ontem.empty:
             print("⚠️ Sem dados de ontem - não é possível detectar mudanças")
             return mudancas
         
-        print("🔍 Detectando mudanças entre ontem e hoje...")
+        if data_hoje is None and data_ontem is None:
+            print("🔍 Detectando mudanças entre ontem e hoje...")
+        else:
+            print(f"🔍 Detectando mudanças entre {data_ontem or 'ontem'} e {data_hoje or 'hoje'}...")
+        tabelas = self.tabelas_mudancas(data_hoje, data_ontem)
         
-        # Preparar dados considerando Parceiro + Moeda como chave única
-        hoje_dict = {}
-        for _, row in self.df_hoje.iterrows():
-            chave_unica = f"{row['Parceiro']}|{row['Moeda']}"
-            hoje_dict[chave_unica] = {
-                'parceiro': row['Parceiro'],
-                'moeda': row['Moeda'],
-                'oferta': row['Oferta'] == 'Sim',
-                'pontos': row['Pontos'],
-                'valor': row['Valor']
-            }
-        
-        ontem_dict = {}
-        for _, row in self.df_ontem.iterrows():
-            chave_unica = f"{row['Parceiro']}|{row['Moeda']}"
-            ontem_dict[chave_unica] = {
-                'parceiro': row['Parceiro'],
-                'moeda': row['Moeda'],
-                'oferta': row['Oferta'] == 'Sim',
-                'pontos': row['Pontos'],
-                'valor': row['Valor']
-            }
-        
-        # Detectar mudanças
-        for chave_unica in hoje_dict:
-            if chave_unica not in ontem_dict:
-                dados_hoje = hoje_dict[chave_unica]
-                mudancas['novos_parceiros'].append({
-                    'parceiro': f"{dados_hoje['parceiro']} ({dados_hoje['moeda']})",
-                    'pontos_hoje': dados_hoje['pontos'],
-                    'tem_oferta': dados_hoje['oferta']
-                })
-            else:
-                hoje_data = hoje_dict[chave_unica]
-                ontem_data = ontem_dict[chave_unica]
-                
-                # Ganhou oferta
-                if hoje_data['oferta'] and not ontem_data['oferta']:
-                    mudancas['ganharam_oferta'].append({
-                        'parceiro': f"{hoje_data['parceiro']} ({hoje_data['moeda']})",
-                        'pontos_hoje': hoje_data['pontos'],
-                        'pontos_ontem': ontem_data['pontos']
-                    })
-                
-                # Perdeu oferta
-                elif not hoje_data['oferta'] and ontem_data['oferta']:
-                    mudancas['perderam_oferta'].append({
-                        'parceiro': f"{hoje_data['parceiro']} ({hoje_data['moeda']})",
-                        'pontos_hoje': hoje_data['pontos'],
-                        'pontos_ontem': ontem_data['pontos']
-                    })
-                
-                # Grandes mudanças de pontos (>20%)
-                if ontem_data['pontos'] > 0:
-                    variacao = ((hoje_data['pontos'] - ontem_data['pontos']) / ontem_data['pontos']) * 100
-                    if abs(variacao) >= 20:
-                        mudancas['grandes_mudancas_pontos'].append({
-                            'parceiro': f"{hoje_data['parceiro']} ({hoje_data['moeda']})",
-                            'pontos_hoje': hoje_data['pontos'],
-                            'pontos_ontem': ontem_data['pontos'],
-                            'variacao': variacao,
-                            'tipo': 'Aumento' if variacao > 0 else 'Diminuição'
-                        })
-        
-        # Parceiros que sumiram
-        for chave_unica in ontem_dict:
-            if chave_unica not in hoje_dict:
-                dados_ontem = ontem_dict[chave_unica]
-                mudancas['parceiros_sumidos'].append({
-                    'parceiro': f"{dados_ontem['parceiro']} ({dados_ontem['moeda']})",
-                    'pontos_ontem': dados_ontem['pontos'],
-                    'tinha_oferta': dados_ontem['oferta']
-                })
+        def _nome(tabela):
+            return tabela['Parceiro'] + ' (' + tabela['Moeda'] + ')'
+        
+        def _registros(colunas):
+            return [dict(zip(colunas, valores)) for valores in zip(*colunas.values())]
+        
+        for tipo in ['ganharam_oferta', 'perderam_oferta']:
+            tabela = tabelas[tipo]
+            mudancas[tipo] = _registros({
+                'parceiro': _nome(tabela),
+                'pontos_hoje': tabela['Pontos_Hoje'].tolist(),
+                'pontos_ontem': tabela['Pontos_Ontem'].tolist()
+            })
+        
+        tabela = tabelas['novos_parceiros']
+        mudancas['novos_parceiros'] = _registros({
+            'parceiro': _nome(tabela),
+            'pontos_hoje': tabela['Pontos_Hoje'].tolist(),
+            'tem_oferta': tabela['Oferta_Hoje'].astype(bool).tolist()
+        })
+        
+        tabela = tabelas['parceiros_sumidos']
+        mudancas['parceiros_sumidos'] = _registros({
+            'parceiro': _nome(tabela),
+            'pontos_ontem': tabela['Pontos_Ontem'].tolist(),
+            'tinha_oferta': tabela['Oferta_Ontem'].astype(bool).tolist()
+        })
+        
+        tabela = tabelas['grandes_mudancas_pontos']
+        mudancas['grandes_mudancas_pontos'] = _registros({
+            'parceiro': _nome(tabela),
+            'pontos_hoje': tabela['Pontos_Hoje'].tolist(),
+            'pontos_ontem': tabela['Pontos_Ontem'].tolist(),
+            'variacao': tabela['Variacao'].tolist(),
+            'tipo': np.where(tabela['Variacao'] > 0, 'Aumento', 'Diminuição').tolist()
+        })
         
         # Estatísticas
         print(f"🎯 {len(mudancas['ganharam_oferta'])} combinações ganharam oferta hoje")
@@ -293,166 +414,228 @@ class LiveloAnalytics:
         
         return mudancas
     
-    def analisar_historico_ofertas(self):
-        """Análise completa do histórico"""
-        print("🔍 Analisando histórico completo...")
+    def atualizar_estado_parceiros(self):
+        """Incorpora o dia mais recente ao estado por Parceiro+Moeda (ou reconstrói a partir do histórico)"""
+        estado_parceiros = EstadoParceiros()
+        persistir = self.usar_historico and estado_parceiros.disponivel()
+        
+        data_hoje = self.df_hoje['Timestamp'].max().strftime('%Y-%m-%d')
+        data_ontem = self.df_ontem['Timestamp'].max().strftime('%Y-%m-%d') if not self.df_ontem.empty else None
         
-        resultados = []
-        linhas_hoje = self.df_hoje[['Parceiro', 'Moeda']].drop_duplicates()
-        print(f"📋 Processando {len(linhas_hoje)} combinações parceiro+moeda ativas hoje...")
+        estado = estado_parceiros.carregar() if persistir and not self.reconstruir_estado else None
+        referencia = estado_parceiros.data_referencia(estado)
         
-        for i, (_, linha_atual) in enumerate(linhas_hoje.iterrows()):
+        if estado is not None and data_ontem is not None and referencia == data_ontem:
+            self.estado_parceiros = estado_parceiros.incorporar_dia(estado, self.df_hoje)
+            print(f"✓ Estado incremental: {data_hoje} incorporado a {len(estado)} combinações")
+        else:
+            if self.reconstruir_estado:
+                print("🔄 Reconstrução do estado solicitada")
+            elif estado is not None and referencia == data_hoje:
+                print(f"🔄 Estado já inclui {data_hoje} (nova coleta do mesmo dia) - reconstruindo")
+            elif estado is not None:
+                print(f"🔄 Estado em {referencia} não segue o histórico (anterior: {data_ontem}) - reconstruindo")
+            self.estado_parceiros = estado_parceiros.construir(self.df_completo)
+            print(f"✓ Estado reconstruído a partir de {len(self.df_completo)} registros")
+        
+        if persistir:
             try:
-                parceiro = linha_atual['Parceiro']
-                moeda = linha_atual['Moeda']
-                
-                # Dados atuais (de hoje)
-                dados_atual = self.df_hoje[
-                    (self.df_hoje['Parceiro'] == parceiro) & 
-                    (self.df_hoje['Moeda'] == moeda)
-                ].iloc[0]
-                
-                # Histórico completo da combinação parceiro+moeda
-                historico = self.df_completo[
-                    (self.df_completo['Parceiro'] == parceiro) & 
-                    (self.df_completo['Moeda'] == moeda)
-                ].sort_values('Timestamp')
-                
-                # Dados básicos atuais
-                resultado = {
-                    'Parceiro': parceiro,
-                    'Pontos_Atual': dados_atual['Pontos'],
-                    'Valor_Atual': dados_atual['Valor'],
-                    'Moeda': dados_atual['Moeda'],
-                    'Tem_Oferta_Hoje': dados_atual['Oferta'] == 'Sim',
-                    'Pontos_por_Moeda_Atual': dados_atual['Pontos_por_Moeda'],
-                    'Data_Atual': dados_atual['Timestamp'].date(),
-                    # Novos campos das dimensões
-                    'Categoria_Dimensao': dados_atual['Categoria_Dimensao'],
-                    'Tier': dados_atual['Tier'],
-                    'URL_Parceiro': dados_atual['URL_Parceiro'],
-                    'Logo_Link': dados_atual['Logo_Link'],
-                    'Codigo_Parceiro': dados_atual['Codigo_Parceiro']
-                }
-                
-                # Calcular tempo de casa
-                primeiro_registro = historico.iloc[0]['Timestamp']
-                dias_casa = (dados_atual['Timestamp'] - primeiro_registro).days + 1
-                status_casa, cor_casa = self._calcular_tempo_casa(dias_casa)
-                
-                resultado['Dias_Casa'] = dias_casa
-                resultado['Status_Casa'] = status_casa
-                resultado['Cor_Status'] = cor_casa
-                
-                # Buscar última mudança real
-                if len(historico) > 1:
-                    dados_atuais_comparacao = {
-                        'Pontos': dados_atual['Pontos'],
-                        'Valor': dados_atual['Valor'],
-                        'Oferta': dados_atual['Oferta']
-                    }
-                    
-                    ultimo_diferente = None
-                    for idx in range(len(historico) - 2, -1, -1):
-                        registro = historico.iloc[idx]
-                        if (registro['Pontos'] != dados_atuais_comparacao['Pontos'] or 
-                            registro['Valor'] != dados_atuais_comparacao['Valor'] or 
-                            registro['Oferta'] != dados_atuais_comparacao['Oferta']):
-                            ultimo_diferente = registro
-                            break
-                    
-                    if ultimo_diferente is not None:
-                        resultado['Pontos_Anterior'] = ultimo_diferente['Pontos']
-                        resultado['Valor_Anterior'] = ultimo_diferente['Valor']
-                        resultado['Data_Anterior'] = ultimo_diferente['Timestamp'].date()
-                        resultado['Dias_Desde_Mudanca'] = (dados_atual['Timestamp'] - ultimo_diferente['Timestamp']).days
-                        
-                        if ultimo_diferente['Pontos'] > 0:
-                            resultado['Variacao_Pontos'] = ((dados_atual['Pontos'] - ultimo_diferente['Pontos']) / ultimo_diferente['Pontos']) * 100
-                        else:
-                            resultado['Variacao_Pontos'] = 0
-                        
-                        # Tipo de mudança
-                        if dados_atual['Oferta'] == 'Sim' and ultimo_diferente['Oferta'] != 'Sim':
-                            resultado['Tipo_Mudanca'] = 'Ganhou Oferta'
-                        elif dados_atual['Oferta'] != 'Sim' and ultimo_diferente['Oferta'] == 'Sim':
-                            resultado['Tipo_Mudanca'] = 'Perdeu Oferta'
-                        elif dados_atual['Pontos'] != ultimo_diferente['Pontos']:
-                            if dados_atual['Pontos'] > ultimo_diferente['Pontos']:
-                                resultado['Tipo_Mudanca'] = 'Aumentou Pontos'
-                            else:
-                                resultado['Tipo_Mudanca'] = 'Diminuiu Pontos'
-                        elif dados_atual['Valor'] != ultimo_diferente['Valor']:
-                            resultado['Tipo_Mudanca'] = 'Mudou Valor'
-                        else:
-                            resultado['Tipo_Mudanca'] = 'Sem Mudança'
-                    else:
-                        resultado.update({
-                            'Pontos_Anterior': dados_atual['Pontos'],
-                            'Valor_Anterior': dados_atual['Valor'],
-                            'Data_Anterior': primeiro_registro.date(),
-                            'Dias_Desde_Mudanca': dias_casa,
-                            'Variacao_Pontos': 0,
-                            'Tipo_Mudanca': 'Sempre Igual'
-                        })
-                else:
-                    resultado.update({
-                        'Pontos_Anterior': 0,
-                        'Valor_Anterior': 0,
-                        'Data_Anterior': None,
-                        'Dias_Desde_Mudanca': 0,
-                        'Variacao_Pontos': 0,
-                        'Tipo_Mudanca': 'Primeiro Registro'
-                    })
-                
-                # Análise de ofertas
-                ofertas_historicas = historico[historico['Oferta'] == 'Sim']
-                total_ofertas = len(ofertas_historicas)
-                total_dias = dias_casa
-                
-                freq_ofertas = (total_ofertas / total_dias * 100) if total_dias > 0 else 0
-                
-                if total_ofertas > 0:
-                    ultima_oferta = ofertas_historicas.iloc[-1]
-                    resultado['Data_Ultima_Oferta'] = ultima_oferta['Timestamp'].date()
-                    resultado['Pontos_Ultima_Oferta'] = ultima_oferta['Pontos']
-                    resultado['Dias_Desde_Ultima_Oferta'] = (dados_atual['Timestamp'] - ultima_oferta['Timestamp']).days
-                    media_pontos_ofertas = ofertas_historicas['Pontos'].mean()
-                else:
-                    resultado['Data_Ultima_Oferta'] = None
-                    resultado['Pontos_Ultima_Oferta'] = 0
-                    resultado['Dias_Desde_Ultima_Oferta'] = total_dias
-                    media_pontos_ofertas = 0
-                
-                resultado['Frequencia_Ofertas'] = freq_ofertas
-                resultado['Total_Ofertas_Historicas'] = total_ofertas
-                resultado['Media_Pontos_Ofertas'] = media_pontos_ofertas
-                resultado['Sazonalidade'] = self._calcular_sazonalidade(freq_ofertas, media_pontos_ofertas)
-                
-                # Classificação estratégica
-                if freq_ofertas >= 80:
-                    resultado['Categoria_Estrategica'] = 'Sempre em oferta'
-                elif freq_ofertas <= 20 and dados_atual['Pontos'] >= 5:
-                    resultado['Categoria_Estrategica'] = 'Oportunidade rara'
-                elif dados_atual['Oferta'] == 'Sim' and freq_ofertas <= 50:
-                    resultado['Categoria_Estrategica'] = 'Compre agora!'
-                else:
-                    resultado['Categoria_Estrategica'] = 'Normal'
-                
-                # Gasto formatado
-                if resultado['Moeda'] == 'R$':
-                    resultado['Gasto_Formatado'] = f"R$ {resultado['Valor_Atual']:.2f}".replace('.', ',')
-                else:
-                    resultado['Gasto_Formatado'] = f"$ {resultado['Valor_Atual']:.2f}".replace('.', ',')
-                
-                resultados.append(resultado)
-                
+                estado_parceiros.salvar(self.estado_parceiros)
             except Exception as e:
-                print(f"⚠️ Erro ao processar {parceiro} ({moeda}): {e}")
-                continue
+                print(f"⚠️ Erro ao salvar estado: {e}")
+        
+        return self.estado_parceiros
+    
+    def atualizar_eventos_ofertas(self):
+        """Estende o log de eventos com o dia mais recente (ou reconstrói a partir do histórico)"""
+        eventos_ofertas = EventosOfertas()
+        persistir = self.usar_historico and eventos_ofertas.disponivel()
+        
+        data_hoje = self.df_hoje['Timestamp'].max().strftime('%Y-%m-%d')
+        data_ontem = self.df_ontem['Timestamp'].max().strftime('%Y-%m-%d') if not self.df_ontem.empty else None
+        
+        eventos, referencia = eventos_ofertas.carregar() if persistir and not self.reconstruir_estado else (None, None)
+        
+        if eventos is not None and data_ontem is not None and referencia == data_ontem:
+            self.eventos_ofertas = eventos_ofertas.incorporar_dia(eventos, self.df_ontem, self.df_hoje)
+            print(f"✓ Log de eventos: {len(self.eventos_ofertas) - len(eventos)} eventos em {data_hoje}")
+        else:
+            self.eventos_ofertas = eventos_ofertas.construir(self.df_completo)
+            print(f"✓ Log de eventos reconstruído: {len(self.eventos_ofertas)} eventos")
+        
+        if persistir:
+            try:
+                eventos_ofertas.salvar(self.eventos_ofertas, data_hoje)
+            except Exception as e:
+                print(f"⚠️ Erro ao salvar log de eventos: {e}")
+        
+        return self.eventos_ofertas
+    
+    def analisar_historico_ofertas(self):
+        """Análise completa do histórico: contagens do estado por Parceiro+Moeda, transições do log de eventos"""
+        print("🔍 Analisando histórico completo...")
+        
+        chaves = ['Parceiro', 'Moeda']
+        
+        # Registro atual de cada combinação (primeira ocorrência de hoje)
+        atual = self._sem_categorias(self.df_hoje.drop_duplicates(subset=chaves, keep='first').reset_index(drop=True))
+        print(f"📋 Processando {len(atual)} combinações parceiro+moeda ativas hoje...")
+        
+        if self.estado_parceiros is None:
+            self.atualizar_estado_parceiros()
+        if self.eventos_ofertas is None:
+            self.atualizar_eventos_ofertas()
+        
+        if atual.empty:
+            self.analytics['dados_completos'] = pd.DataFrame()
+            return self.analytics['dados_completos']
+        
+        # Estado acumulado (primeiro registro, contagens de ofertas) de cada combinação ativa
+        estado = self.estado_parceiros.rename(columns={
+            'Primeiro_Timestamp': '_primeiro_ts',
+            'Total_Registros': '_total_registros',
+            'Total_Ofertas': '_total_ofertas'
+        }).set_index(chaves)
+        estado['_media_pontos_ofertas'] = (
+            estado['Soma_Pontos_Ofertas'] / estado['_total_ofertas'].where(estado['_total_ofertas'] > 0)
+        )
+        
+        # Log de eventos: última mudança (registro anterior a ela) e fim do último período em oferta
+        eventos_ofertas = EventosOfertas()
+        mudancas = eventos_ofertas.ultimas_mudancas(self.eventos_ofertas)[
+            ['Timestamp_Anterior', 'Oferta_Anterior', 'Valor_Anterior', 'Pontos_Anterior']
+        ].rename(columns=lambda coluna: coluna.replace('_Anterior', '_anterior'))
+        ofertas = eventos_ofertas.resumo_ofertas(self.eventos_ofertas)[
+            ['Timestamp_Ultima_Oferta', 'Pontos_Ultima_Oferta']
+        ].rename(columns={'Timestamp_Ultima_Oferta': 'Timestamp_ultima_oferta', 'Pontos_Ultima_Oferta': 'Pontos_ultima_oferta'})
+        
+        df = atual.join(
+            estado.drop(columns=['Timestamp', 'Oferta', 'Valor', 'Pontos', 'Soma_Pontos_Ofertas']), on=chaves
+        ).join(mudancas, on=chaves).join(ofertas, on=chaves)
+        
+        ts_atual = df['Timestamp']
+        tem_historico = df['_total_registros'] > 1
+        tem_diferente = df['Timestamp_anterior'].notna()
+        tem_oferta = df['Oferta'].astype(bool)
+        
+        # Em oferta hoje: o último registro em oferta é o atual
+        df['Timestamp_ultima_oferta'] = df['Timestamp_ultima_oferta'].where(~tem_oferta, ts_atual)
+        df['Pontos_ultima_oferta'] = df['Pontos_ultima_oferta'].where(~tem_oferta, df['Pontos'])
+        
+        def _datas(serie):
+            return pd.Series(
+                [ts.date() if pd.notna(ts) else None for ts in serie], index=serie.index, dtype=object
+            )
+        
+        resultado = pd.DataFrame({
+            'Parceiro': df['Parceiro'],
+            'Pontos_Atual': df['Pontos'],
+            'Valor_Atual': df['Valor'],
+            'Moeda': df['Moeda'],
+            'Tem_Oferta_Hoje': tem_oferta,
+            'Pontos_por_Moeda_Atual': df['Pontos_por_Moeda'],
+            'Data_Atual': _datas(ts_atual),
+            # Novos campos das dimensões
+            'Categoria_Dimensao': df['Categoria_Dimensao'],
+            'Tier': df['Tier'],
+            'URL_Parceiro': self.atributo_dimensao(df['Parceiro'], 'URL_Parceiro'),
+            'Logo_Link': self.atributo_dimensao(df['Parceiro'], 'Logo_Link'),
+            'Codigo_Parceiro': df['Codigo_Parceiro']
+        })
+        
+        # Tempo de casa
+        dias_casa = (ts_atual - df['_primeiro_ts']).dt.days + 1
+        status_cor = [self._calcular_tempo_casa(dias) for dias in dias_casa]
+        resultado['Dias_Casa'] = dias_casa
+        resultado['Status_Casa'] = [status for status, _ in status_cor]
+        resultado['Cor_Status'] = [cor for _, cor in status_cor]
+        
+        # Última mudança: 'Primeiro Registro' (1 registro), 'Sempre Igual' (nada diferente) ou a mudança encontrada
+        pontos_anterior = df['Pontos_anterior'].fillna(df['Pontos']).where(tem_historico, 0)
+        valor_anterior = df['Valor_anterior'].fillna(df['Valor']).where(tem_historico, 0)
+        resultado['Pontos_Anterior'] = pontos_anterior.astype(df['Pontos'].dtype)
+        resultado['Valor_Anterior'] = valor_anterior.astype(df['Valor'].dtype)
         
-        self.analytics['dados_completos'] = pd.DataFrame(resultados)
-        print(f"✓ Análise concluída para {len(resultados)} combinações parceiro+moeda ativas hoje")
+        data_anterior = _datas(df['Timestamp_anterior'])
+        data_anterior[tem_historico & ~tem_diferente] = _datas(df['_primeiro_ts'])[tem_historico & ~tem_diferente]
+        resultado['Data_Anterior'] = data_anterior
+        
+        resultado['Dias_Desde_Mudanca'] = np.select(
+            [tem_diferente, tem_historico],
+            [(ts_atual - df['Timestamp_anterior']).dt.days.fillna(0).astype(int), dias_casa],
+            default=0
+        )
+        
+        pontos_ref = df['Pontos_anterior']
+        com_variacao = tem_diferente & (pontos_ref > 0)
+        variacao = np.where(com_variacao, (df['Pontos'] - pontos_ref) / pontos_ref.where(pontos_ref > 0, 1) * 100, 0)
+        # Sem nenhuma variação calculada a coluna fica inteira (mesmos tipos da versão por linha)
+        resultado['Variacao_Pontos'] = variacao if com_variacao.any() else variacao.astype(int)
+        
+        oferta_anterior = df['Oferta_anterior'] == 'Sim'
+        resultado['Tipo_Mudanca'] = np.select(
+            [
+                ~tem_historico,
+                ~tem_diferente,
+                tem_oferta & ~oferta_anterior,
+                ~tem_oferta & oferta_anterior,
+                df['Pontos'] > pontos_ref,
+                df['Pontos'] < pontos_ref,
+                df['Valor'] != df['Valor_anterior']
+            ],
+            [
+                'Primeiro Registro',
+                'Sempre Igual',
+                'Ganhou Oferta',
+                'Perdeu Oferta',
+                'Aumentou Pontos',
+                'Diminuiu Pontos',
+                'Mudou Valor'
+            ],
+            default='Sem Mudança'
+        )
+        
+        # Análise de ofertas
+        total_ofertas = df['_total_ofertas'].fillna(0).astype(int)
+        tem_ofertas = total_ofertas > 0
+        freq_ofertas = total_ofertas / dias_casa * 100
+        media_pontos_ofertas = df['_media_pontos_ofertas'].fillna(0)
+        if not tem_ofertas.any():
+            media_pontos_ofertas = media_pontos_ofertas.astype(int)
+        
+        resultado['Data_Ultima_Oferta'] = _datas(df['Timestamp_ultima_oferta'])
+        resultado['Pontos_Ultima_Oferta'] = df['Pontos_ultima_oferta'].fillna(0).astype(df['Pontos'].dtype)
+        resultado['Dias_Desde_Ultima_Oferta'] = np.where(
+            tem_ofertas,
+            (ts_atual - df['Timestamp_ultima_oferta']).dt.days.fillna(0).astype(int),
+            dias_casa
+        )
+        resultado['Frequencia_Ofertas'] = freq_ofertas
+        resultado['Total_Ofertas_Historicas'] = total_ofertas
+        resultado['Media_Pontos_Ofertas'] = media_pontos_ofertas
+        resultado['Sazonalidade'] = [
+            self._calcular_sazonalidade(freq, media) for freq, media in zip(freq_ofertas, media_pontos_ofertas)
+        ]
+        
+        # Classificação estratégica
+        resultado['Categoria_Estrategica'] = np.select(
+            [
+                freq_ofertas >= 80,
+                (freq_ofertas <= 20) & (df['Pontos'] >= 5),
+                tem_oferta & (freq_ofertas <= 50)
+            ],
+            ['Sempre em oferta', 'Oportunidade rara', 'Compre agora!'],
+            default='Normal'
+        )
+        
+        # Gasto formatado
+        resultado['Gasto_Formatado'] = [
+            (f"R$ {valor:.2f}" if moeda == 'R$' else f"$ {valor:.2f}").replace('.', ',')
+            for valor, moeda in zip(resultado['Valor_Atual'], resultado['Moeda'])
+        ]
+        
+        self.analytics['dados_completos'] = resultado
+        print(f"✓ Análise concluída para {len(resultado)} combinações parceiro+moeda ativas hoje")
         return self.analytics['dados_completos']
     
     def _obter_top_10_hierarquico(self, dados):
@@ -495,7 +678,7 @@ class LiveloAnalytics:
         total_parceiros = len(dados)
         
         if not self.df_ontem.empty:
-            ofertas_ontem = len(self.df_ontem[self.df_ontem['Oferta'] == 'Sim'])
+            ofertas_ontem = int(self.df_ontem['Oferta'].sum())
             parceiros_ontem = len(self.df_ontem)
             variacao_ofertas = total_ofertas_hoje - ofertas_ontem
             variacao_parceiros = total_parceiros - parceiros_ontem
@@ -563,7 +746,7 @@ class LiveloAnalytics:
         
         evolucao_diaria = df_historico_diario.groupby('Data').agg({
             'Parceiro': 'nunique',
-            'Oferta': lambda x: (x == 'Sim').sum()
+            'Oferta': 'sum'
         }).reset_index()
         evolucao_diaria.columns = ['Data', 'Total_Parceiros', 'Total_Ofertas']
         
@@ -784,7 +967,7 @@ class LiveloAnalytics:
         
         if len(ultimas_2_semanas) > 0:
             ultimas_2_semanas['Data'] = ultimas_2_semanas['Timestamp'].dt.date
-            trend_diaria = ultimas_2_semanas[ultimas_2_semanas['Oferta'] == 'Sim'].groupby('Data').agg({
+            trend_diaria = ultimas_2_semanas[ultimas_2_semanas['Oferta']].groupby('Data').agg({
                 'Parceiro': 'count',
                 'Pontos': 'mean'
             }).reset_index()
@@ -1224,6 +1407,32 @@ class LiveloAnalytics:
         
         return html
     
+    def _nome_arquivo_parceiro(self, codigo, parceiro, moeda):
+        """Nome do arquivo de histórico de um Parceiro+Moeda (código da dimensão ou nome normalizado)"""
+        base = codigo if codigo else re.sub(r'[^a-z0-9]+', '-', parceiro.lower()).strip('-')
+        sufixo_moeda = re.sub(r'[^A-Za-z0-9]', '', moeda.replace('$', 'S'))
+        return f"{base}-{sufixo_moeda}.json"
+    
+    def _gerar_arquivos_parceiros(self, dados, historico_completo, versao_dados):
+        """Um arquivo de histórico por Parceiro+Moeda ativo hoje, mais o manifesto chave → arquivo"""
+        ativos = dados[['Parceiro', 'Moeda', 'Codigo_Parceiro']].drop_duplicates(subset=['Parceiro', 'Moeda'])
+        codigos = {(p, m): c for p, m, c in ativos.itertuples(index=False, name=None)}
+        
+        arquivos = {}
+        manifesto = {'versao': versao_dados, 'parceiros': {}}
+        for (parceiro, moeda), historico in historico_completo.groupby(['Parceiro', 'Moeda'], sort=True, observed=True):
+            if (parceiro, moeda) not in codigos:
+                continue
+            nome = self._nome_arquivo_parceiro(codigos[(parceiro, moeda)], parceiro, moeda)
+            # Códigos repetidos ou nomes que normalizam igual não podem sobrescrever outro parceiro
+            if f"partners/{nome}" in arquivos:
+                nome = nome.replace('.json', f"-{len(arquivos)}.json")
+            arquivos[f"partners/{nome}"] = livelo_colunar.codificar_json(historico)
+            manifesto['parceiros'][f"{parceiro}|{moeda}"] = {'arquivo': nome, 'registros': len(historico)}
+        
+        arquivos['partners/manifest.json'] = json.dumps(manifesto, ensure_ascii=False)
+        return arquivos
+    
     def _gerar_filtros_avancados(self, dados):
         """Gera filtros avançados ATUALIZADOS: Categoria, Tier, Oferta, Experiência, Frequência"""
         # Obter valores únicos e converter para string para evitar erros de ordenação
@@ -1292,12 +1501,13 @@ class LiveloAnalytics:
         for key, fig in graficos.items():
             graficos_html[key] = fig.to_html(full_html=False, include_plotlyjs='cdn')
         
-        # Preparar dados para JavaScript
+        # Preparar dados para JavaScript: o resumo de hoje vai no HTML,
+        # o histórico completo vira um arquivo colunar em public/data buscado sob demanda
         dados_json = dados.to_json(orient='records', date_format='iso')
-        dados_historicos_completos = self.df_completo.copy()
-        dados_historicos_completos['Timestamp'] = dados_historicos_completos['Timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-        dados_historicos_json = dados_historicos_completos.to_json(orient='records')
-        dados_raw_json = self.df_completo.to_json(orient='records', date_format='iso')
+        versao_dados = self.df_completo['Timestamp'].max().strftime('%Y%m%d%H%M%S')
+        historico_publicado = self._oferta_como_texto(self.df_completo)
+        self.arquivos_dados = {'historico.json': livelo_colunar.codificar_json(historico_publicado)}
+        self.arquivos_dados.update(self._gerar_arquivos_parceiros(dados, historico_publicado, versao_dados))
         
         # Preparar alertas dinâmicos
         alertas_html = self._gerar_alertas_dinamicos(mudancas, metricas, dados)
@@ -3642,19 +3852,99 @@ class LiveloAnalytics:
 
             // ========== VARIÁVEIS GLOBAIS ==========
             const todosOsDados = {dados_json};
-            const dadosHistoricosCompletos = {dados_historicos_json};
-            const dadosRawCompletos = {dados_raw_json};
+            const VERSAO_DADOS = '{versao_dados}';
+            // Preenchido pelo livelo_publicacao.py com os nomes com hash de conteúdo
+            const ARQUIVOS_PUBLICADOS = {{}};
+            const arquivosDados = {{}};
             let parceiroSelecionado = null;
             let carteiraManager = null;
             let notificationSystem = null;
             
             // Expor dados globalmente
             window.todosOsDados = todosOsDados;
-            window.dadosHistoricosCompletos = dadosHistoricosCompletos;
-            window.dadosRawCompletos = dadosRawCompletos;
             window.db = db;
             window.messaging = messaging;
             
+            // ========== DADOS SOB DEMANDA (public/data) ==========
+            // Formato colunar (livelo_colunar.py): tabela de strings + códigos por linha,
+            // timestamps como (dia desde a base, segundos do dia), colunas derivadas recalculadas
+            function decodificarColunar(pacote) {{
+                if (!pacote || pacote.formato !== 'colunar-v1') return pacote;
+                
+                const {{ linhas, strings, colunas }} = pacote;
+                const nomes = Object.keys(colunas);
+                const valores = {{}};
+                
+                nomes.forEach(nome => {{
+                    const coluna = colunas[nome];
+                    if (coluna.tipo === 'texto') {{
+                        valores[nome] = coluna.codigos.map(c => c === null ? null : strings[c]);
+                    }} else if (coluna.tipo === 'numero') {{
+                        valores[nome] = coluna.valores;
+                    }} else if (coluna.tipo === 'tempo') {{
+                        const [ano, mes, dia] = coluna.base.split('-').map(Number);
+                        const base = Date.UTC(ano, mes - 1, dia);
+                        const tempos = coluna.tabela.map(([dias, segundos]) =>
+                            new Date(base + dias * 86400000 + segundos * 1000).toISOString().slice(0, 19).replace('T', ' ')
+                        );
+                        valores[nome] = coluna.codigos.map(c => c === null ? null : tempos[c]);
+                    }}
+                }});
+                
+                nomes.forEach(nome => {{
+                    const coluna = colunas[nome];
+                    if (coluna.tipo === 'razao') {{
+                        const numerador = valores[coluna.numerador];
+                        const denominador = valores[coluna.denominador];
+                        valores[nome] = numerador.map((n, i) => denominador[i] > 0 ? n / denominador[i] : 0);
+                    }}
+                }});
+                
+                const registros = new Array(linhas);
+                for (let i = 0; i < linhas; i++) {{
+                    const registro = {{}};
+                    for (const nome of nomes) registro[nome] = valores[nome][i];
+                    registros[i] = registro;
+                }}
+                return registros;
+            }}
+            
+            function carregarArquivoDados(nome) {{
+                if (!arquivosDados[nome]) {{
+                    // Publicado: nome com hash (cache imutável); senão, versão na query string
+                    const publicado = Object.keys(ARQUIVOS_PUBLICADOS).length > 0;
+                    const url = publicado
+                        ? `data/${{ARQUIVOS_PUBLICADOS[nome] || nome}}`
+                        : `data/${{nome}}?v=${{VERSAO_DADOS}}`;
+                    arquivosDados[nome] = fetch(url)
+                        .then(resposta => {{
+                            if (!resposta.ok) throw new Error(`HTTP ${{resposta.status}}`);
+                            return resposta.json();
+                        }})
+                        .then(decodificarColunar)
+                        .catch(erro => {{
+                            delete arquivosDados[nome];
+                            console.error(`[Dados] Erro ao carregar ${{nome}}:`, erro);
+                            throw erro;
+                        }});
+                }}
+                return arquivosDados[nome];
+            }}
+            
+            function carregarHistoricoParceiro(parceiro, moeda) {{
+                return carregarArquivoDados('partners/manifest.json').then(manifesto => {{
+                    const entrada = manifesto.parceiros[`${{parceiro}}|${{moeda}}`];
+                    return entrada ? carregarArquivoDados(`partners/${{entrada.arquivo}}`) : [];
+                }});
+            }}
+            
+            function carregarHistoricoCompleto() {{
+                return carregarArquivoDados('historico.json').then(historico => {{
+                    window.dadosHistoricosCompletos = historico;
+                    return historico;
+                }});
+            }}
+            
             // ========== SISTEMA DE NOTIFICAÇÕES COM FIRESTORE ==========
             class FirebaseNotificationSystem {{
                 constructor() {{
@@ -4914,7 +5204,7 @@ class LiveloAnalytics:
             }}
 
             // ========== ANÁLISE INDIVIDUAL ==========
-            function carregarAnaliseIndividual() {{
+            async function carregarAnaliseIndividual() {{
                 const chaveUnica = document.getElementById('parceiroSelect')?.value;
                 if (!chaveUnica) {{
                     document.getElementById('estatisticasParceiro').style.display = 'none';
@@ -4926,9 +5216,19 @@ class LiveloAnalytics:
                 const [parceiro, moeda] = chaveUnica.split('|');
                 parceiroSelecionado = `${{parceiro}} (${{moeda}})`;
                 
-                const historicoCompleto = dadosHistoricosCompletos.filter(item => 
-                    item.Parceiro === parceiro && item.Moeda === moeda
-                );
+                let historicoCompleto;
+                try {{
+                    historicoCompleto = await carregarHistoricoParceiro(parceiro, moeda);
+                }} catch (erro) {{
+                    const container = document.getElementById('tabelaIndividual');
+                    if (container) {{
+                        container.innerHTML = '<div class="p-3 text-center text-muted">Não foi possível carregar o histórico. Tente novamente.</div>';
+                    }}
+                    return;
+                }}
+                
+                // Outro parceiro pode ter sido escolhido enquanto o histórico carregava
+                if (document.getElementById('parceiroSelect')?.value !== chaveUnica) return;
                 
                 const dadosResumo = todosOsDados.filter(item => 
                     item.Parceiro === parceiro && item.Moeda === moeda
@@ -5163,7 +5463,7 @@ class LiveloAnalytics:
                 cardContainer.style.display = 'block';
             }}
             
-            function downloadAnaliseIndividual() {{
+            async function downloadAnaliseIndividual() {{
                 const chaveUnica = document.getElementById('parceiroSelect')?.value;
                 if (!chaveUnica) {{
                     alert('Selecione um parceiro primeiro');
@@ -5171,10 +5471,7 @@ class LiveloAnalytics:
                 }}
                 
                 const [parceiro, moeda] = chaveUnica.split('|');
-                
-                const historicoCompleto = dadosHistoricosCompletos.filter(item => 
-                    item.Parceiro === parceiro && item.Moeda === moeda
-                );
+                const historicoCompleto = await carregarHistoricoParceiro(parceiro, moeda);
                 const dadosResumo = todosOsDados.filter(item => 
                     item.Parceiro === parceiro && item.Moeda === moeda
                 );
@@ -5195,7 +5492,8 @@ class LiveloAnalytics:
                 XLSX.writeFile(wb, nomeArquivo);
             }}
             
-            function downloadDadosRaw() {{
+            async function downloadDadosRaw() {{
+                const dadosRawCompletos = await carregarHistoricoCompleto();
                 const wb = XLSX.utils.book_new();
                 const ws = XLSX.utils.json_to_sheet(dadosRawCompletos);
                 XLSX.utils.book_append_sheet(wb, ws, "Dados Raw Livelo");
@@ -5284,6 +5582,8 @@ class LiveloAnalytics:
                         const selectParceiroTab = document.querySelector('[data-bs-target="#individual"]');
                         if (selectParceiroTab) {{
                             selectParceiroTab.addEventListener('click', function() {{
+                                // Começa a baixar o manifesto assim que a aba é aberta
+                                carregarArquivoDados('partners/manifest.json').catch(() => {{}});
                                 setTimeout(() => {{
                                     const select = document.getElementById('parceiroSelect');
                                     if (select && select.selectedIndex === 0 && select.options.length > 1) {{
@@ -5310,23 +5610,57 @@ class LiveloAnalytics:
         
         return html
     
+    def salvar_arquivos_dados(self, pasta_relatorios="public"):
+        """Grava os arquivos de dados buscados pela página (public/data)"""
+        pasta_dados = os.path.join(pasta_relatorios, "data")
+        
+        # Parceiros que saíram do site não deixam arquivos órfãos
+        pasta_parceiros = os.path.join(pasta_dados, "partners")
+        if os.path.isdir(pasta_parceiros):
+            for nome in os.listdir(pasta_parceiros):
+                if f"partners/{nome}" not in self.arquivos_dados:
+                    os.remove(os.path.join(pasta_parceiros, nome))
+        
+        for nome, conteudo in self.arquivos_dados.items():
+            arquivo = os.path.join(pasta_dados, nome)
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            temporario = arquivo + ".tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                f.write(conteudo)
+            os.replace(temporario, arquivo)
+        
+        total_bytes = sum(os.path.getsize(os.path.join(pasta_dados, nome)) for nome in self.arquivos_dados)
+        print(f"✅ Dados salvos: {len(self.arquivos_dados)} arquivos em {pasta_dados} ({total_bytes:,} bytes)")
+    
     def executar_analise_completa(self):
         """Executa toda a análise"""
         print("🚀 Iniciando Livelo Analytics Pro...")
         
-        if not self.carregar_dados():
-            return False
+        with etapa('carregar_dados') as registro:
+            if not self.carregar_dados():
+                return False
+            registro['linhas'] = len(self.df_completo)
         
         # Detectar mudanças entre ontem e hoje
-        self.analytics['mudancas_ofertas'] = self.detectar_mudancas_ofertas()
+        with etapa('detectar_mudancas_ofertas', len(self.df_hoje)):
+            self.analytics['mudancas_ofertas'] = self.detectar_mudancas_ofertas()
         
-        # Análise histórica completa
-        self.analisar_historico_ofertas()
-        self.calcular_metricas_dashboard()
-        self.gerar_graficos_aprimorados()
+        # Análise histórica completa (estado incremental por Parceiro+Moeda)
+        with etapa('atualizar_estado_parceiros', len(self.df_completo)):
+            self.atualizar_estado_parceiros()
+        with etapa('atualizar_eventos_ofertas', len(self.df_hoje)):
+            self.atualizar_eventos_ofertas()
+        with etapa('analisar_historico_ofertas') as registro:
+            self.analisar_historico_ofertas()
+            registro['linhas'] = len(self.analytics['dados_completos'])
+        with etapa('calcular_metricas_dashboard'):
+            self.calcular_metricas_dashboard()
+        with etapa('gerar_graficos_aprimorados'):
+            self.gerar_graficos_aprimorados()
         
         print("📄 Gerando relatório HTML...")
-        html = self.gerar_html_completo()
+        with etapa('gerar_html_completo'):
+            html = self.gerar_html_completo()
         
         # Salvar
         pasta_relatorios = "public"
@@ -5335,8 +5669,10 @@ class LiveloAnalytics:
         arquivo_saida = os.path.join(pasta_relatorios, "index.html")
         
         try:
-            with open(arquivo_saida, 'w', encoding='utf-8') as f:
-                f.write(html)
+            with etapa('salvar_relatorio', len(self.arquivos_dados) + 1):
+                with open(arquivo_saida, 'w', encoding='utf-8') as f:
+                    f.write(html)
+                self.salvar_arquivos_dados(pasta_relatorios)
             
             print(f"✅ Relatório salvo: {arquivo_saida}")
             print(f"✅ Firebase Hosting: public/index.html")
@@ -5356,9 +5692,14 @@ def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
 
-    arquivo_entrada = sys.argv[1] if len(sys.argv) > 1 else "livelo_parceiros.xlsx"
+    parser = argparse.ArgumentParser(description='Livelo Analytics Pro')
+    parser.add_argument('arquivo_entrada', nargs='?', default='livelo_parceiros.xlsx',
+                       help='Excel de entrada (quando não há histórico Parquet)')
+    parser.add_argument('--reconstruir-estado', action='store_true',
+                       help='Recalcula o estado por Parceiro+Moeda a partir do histórico completo')
+    args = parser.parse_args()
     
-    analytics = LiveloAnalytics(arquivo_entrada)
+    analytics = LiveloAnalytics(args.arquivo_entrada, reconstruir_estado=args.reconstruir_estado)
     sucesso = analytics.executar_analise_completa()
     
     if sucesso:
@@ -10,12 +10,133 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.action_chains import ActionChains
 import re
 import os
+import json
+import gzip
+import base64
+import argparse
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from livelo_snapshot import ParserSnapshot, salvar_snapshot_html
+from livelo_historico import HistoricoSQLite, abrir_historico
+from livelo_metricas import etapa
+
+URL_PARCEIROS = "https://www.livelo.com.br/juntar-pontos/todos-os-parceiros"
+
+# Campos aceitos nas respostas JSON da API de parceiros (a primeira chave encontrada vence)
+CAMPOS_API_PARCEIROS = {
+    'nome': ['partnerName', 'name', 'nome', 'displayName', 'title'],
+    'promocao': ['isPromotion', 'hasPromotion', 'inPromotion', 'promotion', 'promocao'],
+    'pontos': ['parity', 'points', 'pontos', 'accrualParity', 'currentParity'],
+    'valor': ['value', 'valor', 'amount', 'currencyValue'],
+    'moeda': ['currency', 'moeda', 'currencySymbol', 'currencyCode'],
+}
+
+MOEDAS_API = {
+    'R$': 'R$', 'BRL': 'R$', 'REAL': 'R$', 'REAIS': 'R$',
+    'U$': 'U$', 'US$': 'U$', 'USD': 'U$', 'DOLAR': 'U$', 'DÓLAR': 'U$',
+}
+
+# Coleta os dados brutos de todos os cards em uma única chamada ao navegador
+SCRIPT_EXTRACAO_CARDS = """
+const cards = document.querySelectorAll('div[data-testid="div_PartnerCard"]');
+const textoPrimeiraTipografia = (card, seletor) => {
+    const section = card.querySelector(seletor);
+    if (!section) return null;
+    const tipografia = section.querySelector('div[data-testid="Text_Typography"]');
+    return tipografia ? tipografia.innerText : null;
+};
+return Array.from(cards).map(card => {
+    const imgPrincipal = card.querySelector('img[data-testid="img_PartnerCard_partnerImage"]');
+    const imgAlt = card.querySelector('img[alt]');
+    const promocao = card.querySelector('span[data-testid="span_PartnerCard_promotionTag"]');
+    return {
+        nome: imgPrincipal ? imgPrincipal.getAttribute('alt') : null,
+        nome_alternativo: imgAlt ? imgAlt.getAttribute('alt') : null,
+        tem_promocao: promocao !== null,
+        texto_promocao: promocao ? promocao.innerText : '',
+        paridade_promocao: textoPrimeiraTipografia(card, 'div[data-testid="Text_ParityText"].css-1oy391r'),
+        paridade_normal: textoPrimeiraTipografia(card, 'div[data-testid="Text_ParityText"].css-nrcx9i'),
+        texto: card.innerText || ''
+    };
+});
+"""
+
+# Rastreador de prontidão: conta os cards via MutationObserver e acompanha fetch/XHR em andamento
+SCRIPT_PRONTIDAO = """
+if (!window.__liveloProntidao) {
+    const estado = {cards: 0, ultimaMudanca: performance.now(), pendentes: 0, ultimaRede: performance.now()};
+    const contar = () => {
+        const n = document.querySelectorAll('div[data-testid="div_PartnerCard"]').length;
+        if (n !== estado.cards) {
+            estado.cards = n;
+            estado.ultimaMudanca = performance.now();
+        }
+    };
+    let agendado = false;
+    new MutationObserver(() => {
+        if (agendado) return;
+        agendado = true;
+        setTimeout(() => { agendado = false; contar(); }, 50);
+    }).observe(document.body, {childList: true, subtree: true});
+    
+    const registrarInicio = () => { estado.pendentes++; estado.ultimaRede = performance.now(); };
+    const registrarFim = () => { estado.pendentes = Math.max(0, estado.pendentes - 1); estado.ultimaRede = performance.now(); };
+    const fetchOriginal = window.fetch;
+    window.fetch = function() {
+        registrarInicio();
+        return fetchOriginal.apply(this, arguments).finally(registrarFim);
+    };
+    const sendOriginal = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        registrarInicio();
+        this.addEventListener('loadend', registrarFim);
+        return sendOriginal.apply(this, arguments);
+    };
+    
+    contar();
+    window.__liveloProntidao = estado;
+}
+"""
+
+SCRIPT_ESTADO_PRONTIDAO = """
+const estado = window.__liveloProntidao;
+window.scrollTo(0, document.body.scrollHeight);
+return {
+    cards: estado.cards,
+    ms_desde_mudanca: performance.now() - estado.ultimaMudanca,
+    pendentes: estado.pendentes,
+    ms_desde_rede: performance.now() - estado.ultimaRede
+};
+"""
 
 class LiveloScraper:
-    def __init__(self):
+    def __init__(self, modo_extracao="lote", modo_coleta="dom"):
         self.driver = None
         self.wait = None
+        # "lote": uma única execute_script para todos os cards
+        # "elementos": varredura card a card via WebDriver (modo legado)
+        self.modo_extracao = modo_extracao
+        # "dom": scroll + leitura dos cards
+        # "rede": captura das respostas JSON da página via logs do DevTools
+        self.modo_coleta = modo_coleta
+        # Prontidão da página (segundos)
+        self.prontidao = {
+            'prazo_primeiros_cards': 30,   # espera máxima pelos primeiros cards
+            'janela_silencio': 3.0,        # contagem de cards estável por este tempo
+            'janela_rede': 1.0,            # sem fetch/XHR em andamento por este tempo
+            'prazo_maximo': 90,            # limite rígido do carregamento completo
+            'intervalo_verificacao': 0.25,
+        }
+        self.tempos_fases = {}
+        # Snapshot do DOM: salvar após o carregamento / reprocessar offline
+        self.salvar_snapshot = False
+        self.arquivo_snapshot = None
+        # Histórico em partições Parquet (o Excel vira exportação)
+        self.historico = abrir_historico()
+        self.usar_historico = True
+        # Histórico completo após salvar (repassado em memória ao reporter pelo main.py)
+        self.df_historico = None
+        # False: grava só o dia; o Excel (histórico inteiro) fica para a publicação
+        self.exportar_excel = True
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
@@ -52,6 +173,10 @@ class LiveloScraper:
             }
             options.add_experimental_option("prefs", prefs)
             
+            # Logs de performance do DevTools para capturar as respostas de rede
+            if self.modo_coleta == "rede":
+                options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            
             self.driver = webdriver.Chrome(options=options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             self.driver.set_page_load_timeout(45)
@@ -77,63 +202,83 @@ class LiveloScraper:
         except:
             time.sleep(2)
     
+    def aguardar_primeiros_cards(self, minimo=10):
+        """Aguarda os primeiros cards aparecerem (até o prazo configurado)"""
+        seletor = 'div[data-testid="div_PartnerCard"]'
+        try:
+            WebDriverWait(self.driver, self.prontidao['prazo_primeiros_cards'],
+                          poll_frequency=self.prontidao['intervalo_verificacao']).until(
+                lambda d: len(d.find_elements(By.CSS_SELECTOR, seletor)) > minimo
+            )
+        except TimeoutException:
+            pass
+        return len(self.driver.find_elements(By.CSS_SELECTOR, seletor))
+    
     def carregar_pagina_completa(self):
-        """Carrega toda a página com scroll infinito"""
+        """Carrega toda a página até a contagem de cards estabilizar e a rede ficar ociosa"""
         print("Carregando página completa...")
         
-        # Aguarda carregamento inicial
-        time.sleep(5)
+        cfg = self.prontidao
+        inicio = time.time()
+        self.driver.execute_script(SCRIPT_PRONTIDAO)
         
-        # Scroll até o final
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
+        estado = {'cards': 0}
+        crescimentos = 0
+        ultimo_total = -1
         
-        # Verifica se há mais conteúdo
-        altura_anterior = 0
-        altura_atual = self.driver.execute_script("return document.body.scrollHeight")
-        tentativas = 0
-        max_tentativas = 10
-        
-        while tentativas < max_tentativas:
-            altura_anterior = altura_atual
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            altura_atual = self.driver.execute_script("return document.body.scrollHeight")
+        while True:
+            estado = self.driver.execute_script(SCRIPT_ESTADO_PRONTIDAO)
+            decorrido = time.time() - inicio
             
-            if altura_atual > altura_anterior:
-                tentativas = 0
-            else:
-                tentativas += 1
+            if estado['cards'] != ultimo_total:
+                if ultimo_total >= 0:
+                    crescimentos += 1
+                ultimo_total = estado['cards']
+            
+            cards_estaveis = estado['ms_desde_mudanca'] >= cfg['janela_silencio'] * 1000
+            rede_ociosa = estado['pendentes'] == 0 and estado['ms_desde_rede'] >= cfg['janela_rede'] * 1000
+            
+            if cards_estaveis and rede_ociosa:
+                break
+            
+            if decorrido >= cfg['prazo_maximo']:
+                print(f"⚠ Prazo máximo de {cfg['prazo_maximo']}s atingido "
+                      f"({estado['pendentes']} requisições pendentes)")
+                break
+            
+            time.sleep(cfg['intervalo_verificacao'])
         
-        # Scroll suave final
-        etapas = 20
-        altura_por_etapa = altura_atual // etapas
         self.driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
-        
-        for i in range(etapas):
-            posicao = (i + 1) * altura_por_etapa
-            self.driver.execute_script(f"window.scrollTo(0, {posicao});")
-            time.sleep(0.2)
         
-        self.driver.execute_script("window.scrollTo(0, 0);")
-        print("✓ Página carregada completamente")
+        self.tempos_fases['carregamento_completo'] = round(time.time() - inicio, 2)
+        self.tempos_fases['cards_carregados'] = estado['cards']
+        print(f"✓ Página carregada completamente - {estado['cards']} cards, "
+              f"{crescimentos} rodadas de crescimento em {self.tempos_fases['carregamento_completo']:.1f}s")
     
     def navegar_para_site(self):
         """Navega para o site da Livelo"""
         print("Acessando site da Livelo...")
         
-        url = "https://www.livelo.com.br/juntar-pontos/todos-os-parceiros"
-        
         try:
-            self.driver.get(url)
-            self.simular_comportamento_humano()
+            with etapa('navegacao') as registro:
+                inicio = time.time()
+                self.driver.get(URL_PARCEIROS)
+                self.tempos_fases['navegacao'] = round(time.time() - inicio, 2)
+                self.simular_comportamento_humano()
+                
+                # Verifica se carregou elementos
+                inicio = time.time()
+                total_elementos = self.aguardar_primeiros_cards()
+                self.tempos_fases['primeiros_cards'] = round(time.time() - inicio, 2)
+                registro['linhas'] = total_elementos
+            print(f"⏱ Navegação: {self.tempos_fases['navegacao']:.1f}s | "
+                  f"primeiros cards: {self.tempos_fases['primeiros_cards']:.1f}s")
             
-            # Verifica se carregou elementos
-            elementos = self.driver.find_elements(By.CSS_SELECTOR, 'div[data-testid="div_PartnerCard"]')
-            if len(elementos) > 10:
-                print(f"✓ Site carregado - {len(elementos)} elementos encontrados")
-                self.carregar_pagina_completa()
+            if total_elementos > 10:
+                print(f"✓ Site carregado - {total_elementos} elementos encontrados")
+                with etapa('rolagem') as registro:
+                    self.carregar_pagina_completa()
+                    registro['linhas'] = self.tempos_fases.get('cards_carregados')
                 return True
             else:
                 print("✗ Elementos não encontrados")
@@ -143,6 +288,241 @@ class LiveloScraper:
             print(f"✗ Erro ao acessar site: {e}")
             return False
     
+    def _ler_corpo_resposta(self, request_id, resposta):
+        """Corpo JSON de uma resposta já concluída (exceção se indisponível ou inválido)"""
+        corpo = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        texto = corpo.get('body', '')
+        if corpo.get('base64Encoded'):
+            texto = base64.b64decode(texto).decode('utf-8', errors='replace')
+        return {
+            'url': resposta.get('url'),
+            'status': resposta.get('status'),
+            'dados': json.loads(texto)
+        }
+    
+    def capturar_respostas_rede(self, timeout=60, janela_silencio=5, tentativas=3):
+        """Coleta os corpos das respostas JSON (XHR/fetch) registradas nos logs do DevTools"""
+        respostas = []
+        # requestId -> resposta: o corpo só é lido depois do Network.loadingFinished
+        pendentes = {}
+        falhas = {}
+        total_parceiros = 0
+        inicio = time.time()
+        ultima_resposta = inicio
+        
+        def _ler(request_id):
+            nonlocal total_parceiros, ultima_resposta
+            try:
+                capturada = self._ler_corpo_resposta(request_id, pendentes[request_id])
+            except Exception:
+                # Corpo ainda indisponível: tenta de novo nos próximos eventos
+                falhas[request_id] = falhas.get(request_id, 0) + 1
+                if falhas[request_id] >= tentativas:
+                    pendentes.pop(request_id, None)
+                return
+            pendentes.pop(request_id, None)
+            respostas.append(capturada)
+            total_parceiros += sum(len(lista) for lista in self._buscar_listas_parceiros(capturada['dados']))
+            ultima_resposta = time.time()
+        
+        while time.time() - inicio < timeout:
+            for entrada in self.driver.get_log("performance"):
+                try:
+                    mensagem = json.loads(entrada['message'])['message']
+                except Exception:
+                    continue
+                metodo = mensagem.get('method')
+                params = mensagem.get('params', {})
+                
+                if metodo == 'Network.responseReceived':
+                    resposta = params.get('response', {})
+                    if 'json' in (resposta.get('mimeType') or '').lower():
+                        pendentes[params['requestId']] = resposta
+                elif metodo == 'Network.loadingFinished' and params.get('requestId') in pendentes:
+                    _ler(params['requestId'])
+                elif metodo == 'Network.loadingFailed':
+                    pendentes.pop(params.get('requestId'), None)
+            
+            # Releitura das que falharam depois de concluídas
+            for request_id in [r for r in falhas if r in pendentes]:
+                _ler(request_id)
+            
+            # Encerra quando já há parceiros e a rede ficou quieta
+            if total_parceiros and time.time() - ultima_resposta >= janela_silencio:
+                break
+            time.sleep(0.5)
+        
+        # Respostas cujo loadingFinished não chegou a tempo: última tentativa
+        for request_id in list(pendentes):
+            falhas[request_id] = tentativas - 1
+            _ler(request_id)
+        
+        print(f"✓ {len(respostas)} respostas JSON capturadas em {time.time() - inicio:.1f}s "
+              f"({total_parceiros} itens de parceiros)")
+        return respostas
+    
+    def _valor_campo(self, item, campo):
+        """Retorna o primeiro valor presente entre as chaves aceitas para o campo"""
+        for chave in CAMPOS_API_PARCEIROS[campo]:
+            if chave in item and item[chave] not in (None, ''):
+                return item[chave]
+        return None
+    
+    def _normalizar_moeda(self, moeda):
+        """Converte a moeda da API para R$ ou U$"""
+        if moeda is None:
+            return "R$"
+        return MOEDAS_API.get(str(moeda).strip().upper(), "R$")
+    
+    def _parece_parceiro(self, item):
+        """Indica se um objeto JSON tem cara de registro de parceiro"""
+        return (isinstance(item, dict) and
+                self._valor_campo(item, 'nome') is not None and
+                self._valor_campo(item, 'pontos') is not None)
+    
+    def _buscar_listas_parceiros(self, dados):
+        """Percorre o JSON e devolve as listas cujos itens parecem parceiros"""
+        listas = []
+        pilha = [dados]
+        while pilha:
+            atual = pilha.pop()
+            if isinstance(atual, list):
+                dicts = [item for item in atual if isinstance(item, dict)]
+                if dicts and sum(self._parece_parceiro(item) for item in dicts) >= len(dicts) / 2:
+                    listas.append(dicts)
+                    continue
+                pilha.extend(atual)
+            elif isinstance(atual, dict):
+                pilha.extend(atual.values())
+        return listas
+    
+    def _linha_de_item_json(self, item, timestamp):
+        """Monta uma linha Parceiro/Oferta/Moeda/Valor/Pontos a partir de um item da API"""
+        pontos = self._valor_campo(item, 'pontos')
+        valor = self._valor_campo(item, 'valor')
+        moeda = self._valor_campo(item, 'moeda')
+        
+        # Paridade aninhada, ex.: {"parity": {"points": 8, "value": 1, "currency": "BRL"}}
+        if isinstance(pontos, dict):
+            interno = pontos
+            pontos = self._valor_campo(interno, 'pontos')
+            valor = valor if valor is not None else self._valor_campo(interno, 'valor')
+            moeda = moeda if moeda is not None else self._valor_campo(interno, 'moeda')
+        
+        promocao = self._valor_campo(item, 'promocao')
+        if isinstance(promocao, str):
+            promocao = promocao.strip().lower() in ('true', 'sim', 's', '1', 'yes')
+        
+        return {
+            'Timestamp': timestamp,
+            'Parceiro': str(self._valor_campo(item, 'nome')).replace("Logo ", "").strip(),
+            'Oferta': "Sim" if promocao else "Não",
+            'Moeda': self._normalizar_moeda(moeda),
+            'Valor': self.formatar_valor(str(valor if valor is not None else 1)),
+            'Pontos': self.formatar_pontos(str(pontos)) if pontos is not None else "N/A"
+        }
+    
+    def extrair_parceiros_json(self, respostas, timestamp=None, verbose=True):
+        """Constrói as linhas de parceiros diretamente das respostas JSON capturadas"""
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        resultados = []
+        
+        for resposta in respostas:
+            for lista in self._buscar_listas_parceiros(resposta.get('dados')):
+                for item in lista:
+                    if self._parece_parceiro(item):
+                        resultados.append(self._linha_de_item_json(item, timestamp))
+        
+        if verbose:
+            print(f"✓ {len(resultados)} parceiros extraídos das respostas JSON")
+        return resultados
+    
+    def salvar_captura(self, respostas):
+        """Salva as respostas capturadas (gzip) para replay e depuração"""
+        try:
+            pasta = os.path.join("output", "capturas")
+            os.makedirs(pasta, exist_ok=True)
+            arquivo = os.path.join(pasta, f"rede_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json.gz")
+            with gzip.open(arquivo, 'wt', encoding='utf-8') as f:
+                json.dump({
+                    'url': URL_PARCEIROS,
+                    'capturado_em': datetime.now().isoformat(),
+                    'respostas': respostas
+                }, f, ensure_ascii=False)
+            print(f"✓ Captura salva: {arquivo}")
+            return arquivo
+        except Exception as e:
+            print(f"⚠ Erro ao salvar captura: {e}")
+            return None
+    
+    def carregar_captura(self, arquivo):
+        """Carrega uma captura de rede salva (respostas e timestamp da coleta)"""
+        with gzip.open(arquivo, 'rt', encoding='utf-8') as f:
+            captura = json.load(f)
+        timestamp = datetime.fromisoformat(captura['capturado_em']).strftime("%Y-%m-%d %H:%M:%S")
+        return captura['respostas'], timestamp
+    
+    def coletar_via_rede(self):
+        """Abre a página e monta os dados a partir das respostas JSON, sem scroll do DOM"""
+        print("Capturando respostas de rede da Livelo...")
+        
+        try:
+            self.driver.get(URL_PARCEIROS)
+            respostas = self.capturar_respostas_rede()
+            if not respostas:
+                print("✗ Nenhuma resposta JSON capturada")
+                return []
+            
+            self.salvar_captura(respostas)
+            return self.extrair_parceiros_json(respostas)
+        except Exception as e:
+            print(f"✗ Erro na captura de rede: {e}")
+            return []
+    
+    def executar_replay_captura(self, arquivo, nome_arquivo="livelo_parceiros.xlsx"):
+        """Reprocessa uma captura de rede salva e grava os dados"""
+        print(f"=== LIVELO SCRAPER (replay: {arquivo}) ===")
+        
+        try:
+            respostas, timestamp = self.carregar_captura(arquivo)
+            dados = self.extrair_parceiros_json(respostas, timestamp)
+            return self.salvar_dados_excel(dados, nome_arquivo)
+        except Exception as e:
+            print(f"✗ Erro no replay: {e}")
+            return False
+    
+    def salvar_snapshot_pagina(self):
+        """Salva o DOM completo da página carregada (gzip) para replay offline"""
+        try:
+            html = self.driver.execute_script("return document.documentElement.outerHTML;")
+            arquivo = salvar_snapshot_html(html)
+            print(f"✓ Snapshot salvo: {arquivo} ({os.path.getsize(arquivo):,} bytes)")
+            return arquivo
+        except Exception as e:
+            print(f"⚠ Erro ao salvar snapshot: {e}")
+            return None
+    
+    def extrair_dados_snapshot(self, arquivo):
+        """Extrai os dados de um snapshot salvo com o parser lxml (sem navegador)"""
+        parser = ParserSnapshot(arquivo)
+        payload = parser.extrair_payload_cards()
+        return self.processar_payload_cards(payload, parser.obter_timestamp())
+    
+    def executar_replay_snapshot(self, arquivo, nome_arquivo="livelo_parceiros.xlsx"):
+        """Reexecuta extração, limpeza e gravação a partir de um snapshot salvo"""
+        print(f"=== LIVELO SCRAPER (snapshot: {arquivo}) ===")
+        
+        try:
+            self.arquivo_snapshot = arquivo
+            dados = self.extrair_dados_parceiros()
+            if not dados:
+                print("✗ Falha na extração do snapshot")
+                return False
+            return self.salvar_dados_excel(dados, nome_arquivo)
+        except Exception as e:
+            print(f"✗ Erro no replay do snapshot: {e}")
+            return False
+    
     def extrair_nome_parceiro(self, card, indice):
         """Extrai o nome do parceiro"""
         try:
@@ -222,30 +602,74 @@ class LiveloScraper:
                 pass
             
             # Fallback - busca por padrões regex
-            patterns = [
-                r'([RU]\$)\s*(\d+)\s*até\s*(\d+)',
-                r'(\d+)\s*pontos?\s*por\s*([RU]\$)\s*(\d+)',
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, texto_completo)
-                if match:
-                    groups = match.groups()
-                    if len(groups) >= 3:
-                        if groups[0] in ['R$', 'U$']:
-                            moeda = groups[0]
-                            valor = groups[1]
-                            pontos = groups[2]
-                        else:
-                            pontos = groups[0]
-                            moeda = groups[1] if groups[1] in ['R$', 'U$'] else moeda
-                            valor = groups[2]
-                    return valor, pontos, moeda
+            return self._extrair_valores_por_regex(texto_completo, valor, pontos, moeda)
         except:
             pass
         
         return valor, pontos, moeda
     
+    def _extrair_valores_por_regex(self, texto_completo, valor, pontos, moeda):
+        """Busca valor, pontos e moeda por padrões regex no texto do card"""
+        patterns = [
+            r'([RU]\$)\s*(\d+)\s*até\s*(\d+)',
+            r'(\d+)\s*pontos?\s*por\s*([RU]\$)\s*(\d+)',
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, texto_completo)
+            if match:
+                groups = match.groups()
+                if len(groups) >= 3:
+                    if groups[0] in ['R$', 'U$']:
+                        moeda = groups[0]
+                        valor = groups[1]
+                        pontos = groups[2]
+                    else:
+                        pontos = groups[0]
+                        moeda = groups[1] if groups[1] in ['R$', 'U$'] else moeda
+                        valor = groups[2]
+                return valor, pontos, moeda
+        
+        return valor, pontos, moeda
+    
+    def interpretar_card(self, info, indice):
+        """Aplica as regras de extração ao payload de um card (nome, promoção, paridade, texto)"""
+        texto_completo = info.get('texto') or ''
+        
+        # Nome - mesma prioridade do modo por elementos
+        parceiro = f"Parceiro {indice}"
+        nome = info.get('nome')
+        nome_alternativo = info.get('nome_alternativo')
+        if nome and nome.strip():
+            parceiro = nome.replace("Logo ", "").strip()
+        elif nome_alternativo and nome_alternativo.strip():
+            parceiro = nome_alternativo
+        
+        # Oferta
+        oferta = "Não"
+        if info.get('tem_promocao') and "promoção" in (info.get('texto_promocao') or '').lower():
+            oferta = "Sim"
+        elif any(palavra in texto_completo.lower() for palavra in ["oferta", "promoção", "promocao"]):
+            oferta = "Sim"
+        
+        # Valores e pontos
+        valor = "N/A"
+        pontos = "N/A"
+        moeda = "R$"
+        
+        if "U$" in texto_completo:
+            moeda = "U$"
+        
+        chave_paridade = 'paridade_promocao' if info.get('tem_promocao') else 'paridade_normal'
+        pontos_texto = (info.get(chave_paridade) or '').strip()
+        if pontos_texto.isdigit():
+            pontos = pontos_texto
+            valor = "1"
+        else:
+            valor, pontos, moeda = self._extrair_valores_por_regex(texto_completo, valor, pontos, moeda)
+        
+        return parceiro, oferta, valor, pontos, moeda
+    
     def formatar_valor(self, valor_texto):
         """Formata valor como número"""
         try:
@@ -270,6 +694,15 @@ class LiveloScraper:
         """Extrai todos os dados dos parceiros"""
         print("Extraindo dados dos parceiros...")
         
+        if self.arquivo_snapshot:
+            return self.extrair_dados_snapshot(self.arquivo_snapshot)
+        
+        if self.modo_extracao == "lote":
+            resultados = self.extrair_dados_parceiros_lote()
+            if resultados:
+                return resultados
+            print("⚠ Extração em lote sem resultados - usando modo por elementos")
+        
         try:
             resultados = []
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -324,6 +757,59 @@ class LiveloScraper:
             print(f"✗ Erro na extração: {e}")
             return []
     
+    def extrair_dados_parceiros_lote(self):
+        """Extrai todos os cards com uma única chamada execute_script"""
+        try:
+            inicio = time.time()
+            payload = self.driver.execute_script(SCRIPT_EXTRACAO_CARDS) or []
+            print(f"✓ {len(payload)} cards coletados em {time.time() - inicio:.2f}s (execute_script único)")
+            return self.processar_payload_cards(payload)
+        except Exception as e:
+            print(f"✗ Erro na extração em lote: {e}")
+            return []
+    
+    def processar_payload_cards(self, payload, timestamp=None):
+        """Converte o payload bruto dos cards nas linhas finais"""
+        if not payload:
+            return []
+        
+        resultados = []
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        total_elementos = len(payload)
+        
+        print(f"Processando {total_elementos} elementos...")
+        
+        for i, info in enumerate(payload, 1):
+            try:
+                parceiro, oferta, valor, pontos, moeda = self.interpretar_card(info, i)
+                
+                resultados.append({
+                    'Timestamp': timestamp,
+                    'Parceiro': parceiro,
+                    'Oferta': oferta,
+                    'Moeda': moeda,
+                    'Valor': self.formatar_valor(valor),
+                    'Pontos': self.formatar_pontos(pontos)
+                })
+                
+                if i <= 15 or i % 50 == 0 or i == total_elementos:
+                    status = "✓" if pontos != "N/A" else "○"
+                    print(f"{status} {i}/{total_elementos}: {parceiro}")
+                
+            except Exception:
+                resultados.append({
+                    'Timestamp': timestamp,
+                    'Parceiro': f"Parceiro {i}",
+                    'Oferta': "Não",
+                    'Moeda': "R$",
+                    'Valor': "N/A",
+                    'Pontos': "N/A"
+                })
+        
+        print(f"✓ Extração bruta concluída: {total_elementos} elementos processados")
+        
+        return resultados
+    
     def limpar_e_validar_dados(self, dados):
         """Limpa dados inválidos e remove duplicatas"""
         if not dados:
@@ -382,14 +868,15 @@ class LiveloScraper:
         
         return dados_final
     
-    def salvar_dados_excel(self, dados):
+    def salvar_dados_excel(self, dados, nome_arquivo="livelo_parceiros.xlsx"):
         """Salva os dados em Excel"""
         if not dados:
             print("✗ Nenhum dado para salvar")
             return False
         
         # Aplica limpeza e validação
-        dados_limpos = self.limpar_e_validar_dados(dados)
+        with etapa('limpeza', len(dados)):
+            dados_limpos = self.limpar_e_validar_dados(dados)
         
         if not dados_limpos:
             print("✗ Nenhum dado válido após limpeza")
@@ -397,11 +884,14 @@ class LiveloScraper:
         
         try:
             novo_df = pd.DataFrame(dados_limpos)
+            
+            if self.usar_historico and self.historico.disponivel():
+                with etapa('gravacao', len(novo_df)):
+                    return self.salvar_historico_parquet(novo_df, nome_arquivo)
+            
             novo_df['Data'] = pd.to_datetime(novo_df['Timestamp']).dt.date
             data_atual = novo_df['Data'].iloc[0]
             
-            nome_arquivo = "livelo_parceiros.xlsx"
-            
             # Verifica se arquivo existe e atualiza
             if os.path.exists(nome_arquivo):
                 try:
@@ -425,17 +915,58 @@ class LiveloScraper:
             # Salva arquivo
             df_final.to_excel(nome_arquivo, index=False)
             print(f"✓ Dados salvos: {nome_arquivo}")
+            self.df_historico = df_final
             
             # Cópia na pasta output
             os.makedirs("output", exist_ok=True)
-            df_final.to_excel(os.path.join("output", nome_arquivo), index=False)
-            print(f"✓ Cópia salva: output/{nome_arquivo}")
+            df_final.to_excel(os.path.join("output", os.path.basename(nome_arquivo)), index=False)
+            print(f"✓ Cópia salva: output/{os.path.basename(nome_arquivo)}")
+            
+            if self.usar_historico:
+                self.atualizar_banco(novo_df)
             
             return True
         except Exception as e:
             print(f"✗ Erro ao salvar: {e}")
             return False
     
+    def salvar_historico_parquet(self, novo_df, nome_arquivo="livelo_parceiros.xlsx"):
+        """Grava apenas o dia (partição ou intervalos) e, se pedido, exporta o Excel a partir do histórico"""
+        # Primeira execução: traz o histórico existente do Excel
+        self.historico.garantir_migracao(nome_arquivo)
+        
+        datas_existentes = set(self.historico.datas())
+        datas = self.historico.salvar_dia(novo_df)
+        for data in datas:
+            acao = "substituído" if data in datas_existentes else "criado"
+            print(f"✓ Dia {data} {acao}: {', '.join(self.historico.arquivos_do_dia(data))} ({len(novo_df)} registros)")
+        
+        # Histórico inteiro para quem roda no mesmo processo (o reporter pelo main.py)
+        self.df_historico = self.historico.carregar()
+        
+        # O Excel também exige o histórico inteiro: pelo main.py ele é exportado só na publicação
+        if self.exportar_excel:
+            total = self.historico.exportar_excel(nome_arquivo, self.df_historico)
+            print(f"✓ Excel exportado: {nome_arquivo} ({total} registros)")
+        
+        self.atualizar_banco(novo_df)
+        return True
+    
+    def atualizar_banco(self, novo_df):
+        """Mantém o banco SQLite de consultas em dia com o histórico"""
+        try:
+            banco = HistoricoSQLite()
+            banco.carregar_dimensoes()
+            sincronizadas = banco.sincronizar(self.historico) if self.historico.disponivel() else []
+            # O dia novo já está no Parquet: só grava de novo se a sincronização não o trouxe
+            datas_novas = pd.to_datetime(novo_df['Timestamp']).dt.strftime('%Y-%m-%d').unique()
+            if not set(datas_novas) <= set(sincronizadas):
+                banco.salvar_dia(novo_df)
+            print(f"✓ Banco SQLite atualizado: {banco.arquivo} ({len(banco.datas())} dias)")
+            banco.fechar()
+        except Exception as e:
+            print(f"⚠ Erro ao atualizar banco SQLite: {e}")
+    
     def encerrar_navegador(self):
         """Encerra o navegador"""
         try:
@@ -452,14 +983,29 @@ class LiveloScraper:
         print("=== LIVELO SCRAPER ===")
         
         try:
-            if not self.iniciar_navegador():
-                return False
+            with etapa('navegador'):
+                if not self.iniciar_navegador():
+                    return False
             
-            if not self.navegar_para_site():
-                self.encerrar_navegador()
-                return False
+            dados = []
+            if self.modo_coleta == "rede":
+                with etapa('coleta_rede') as registro:
+                    dados = self.coletar_via_rede()
+                    registro['linhas'] = len(dados)
+                if not dados:
+                    print("⚠ Captura de rede sem parceiros - usando coleta pelo DOM")
             
-            dados = self.extrair_dados_parceiros()
+            if not dados:
+                if not self.navegar_para_site():
+                    self.encerrar_navegador()
+                    return False
+                
+                if self.salvar_snapshot:
+                    self.salvar_snapshot_pagina()
+                
+                with etapa('extracao') as registro:
+                    dados = self.extrair_dados_parceiros()
+                    registro['linhas'] = len(dados)
             
             if not dados:
                 print("✗ Falha na extração")
@@ -485,5 +1031,31 @@ class LiveloScraper:
 
 # Execução
 if __name__ == "__main__":
-    scraper = LiveloScraper()
-    scraper.executar_scraping()
+    parser = argparse.ArgumentParser(description='Livelo Scraper')
+    parser.add_argument('--modo-coleta', choices=['dom', 'rede'], default='dom',
+                       help='dom: scroll e leitura dos cards | rede: captura das respostas JSON')
+    parser.add_argument('--modo-extracao', choices=['lote', 'elementos'], default='lote',
+                       help='lote: execute_script único | elementos: card a card (legado)')
+    parser.add_argument('--replay-captura', metavar='ARQUIVO',
+                       help='Reprocessa uma captura de rede salva (sem navegador)')
+    parser.add_argument('--salvar-snapshot', action='store_true',
+                       help='Salva o DOM completo (gzip) após o carregamento da página')
+    parser.add_argument('--replay-snapshot', metavar='ARQUIVO',
+                       help='Reprocessa um snapshot salvo com o parser lxml (sem navegador)')
+    parser.add_argument('--arquivo-saida', default='livelo_parceiros.xlsx',
+                       help='Excel de saída dos modos de replay')
+    parser.add_argument('--sem-excel', action='store_true',
+                       help='Grava só o histórico Parquet; o Excel fica para a publicação')
+    args = parser.parse_args()
+    
+    scraper = LiveloScraper(modo_extracao=args.modo_extracao, modo_coleta=args.modo_coleta)
+    scraper.salvar_snapshot = args.salvar_snapshot
+    scraper.exportar_excel = not args.sem_excel
+    # Replays com saída alternativa não tocam no histórico oficial
+    scraper.usar_historico = args.arquivo_saida == 'livelo_parceiros.xlsx'
+    if args.replay_captura:
+        scraper.executar_replay_captura(args.replay_captura, args.arquivo_saida)
+    elif args.replay_snapshot:
+        scraper.executar_replay_snapshot(args.replay_snapshot, args.arquivo_saida)
+    else:
+        scraper.executar_scraping()
@@ -0,0 +1,97 @@
+"""
+Snapshots da página de parceiros da Livelo
+Salva o DOM completo (gzip) e reprocessa offline com parser rápido (lxml)
+O payload gerado é o mesmo do SCRIPT_EXTRACAO_CARDS do livelo_scraper.py
+"""
+
+import os
+import re
+import gzip
+import time
+from datetime import datetime
+
+PASTA_SNAPSHOTS = os.path.join("output", "snapshots")
+
+# XPaths equivalentes aos seletores CSS usados no navegador
+XPATH_CARDS = '//div[@data-testid="div_PartnerCard"]'
+XPATH_IMG_PRINCIPAL = './/img[@data-testid="img_PartnerCard_partnerImage"]'
+XPATH_IMG_ALT = './/img[@alt]'
+XPATH_PROMOCAO = './/span[@data-testid="span_PartnerCard_promotionTag"]'
+XPATH_PARIDADE = ('.//div[@data-testid="Text_ParityText" and '
+                  'contains(concat(" ", normalize-space(@class), " "), " {classe} ")]')
+XPATH_TIPOGRAFIA = './/div[@data-testid="Text_Typography"]'
+
+
+def salvar_snapshot_html(html, pasta=PASTA_SNAPSHOTS):
+    """Salva o HTML da página carregada em gzip e retorna o caminho"""
+    os.makedirs(pasta, exist_ok=True)
+    arquivo = os.path.join(pasta, f"pagina_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html.gz")
+    with gzip.open(arquivo, 'wt', encoding='utf-8') as f:
+        f.write(html)
+    return arquivo
+
+
+class ParserSnapshot:
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.tempo_parse = None
+
+    def carregar_html(self):
+        """Lê o snapshot (gzip ou HTML puro)"""
+        if self.arquivo.endswith('.gz'):
+            with gzip.open(self.arquivo, 'rt', encoding='utf-8') as f:
+                return f.read()
+        with open(self.arquivo, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def obter_timestamp(self):
+        """Timestamp da coleta a partir do nome do arquivo (ou data de modificação)"""
+        match = re.search(r'(\d{8}_\d{6})', os.path.basename(self.arquivo))
+        if match:
+            data = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+        else:
+            data = datetime.fromtimestamp(os.path.getmtime(self.arquivo))
+        return data.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _texto(self, elemento):
+        """Aproxima o innerText: nós de texto não vazios separados por quebra de linha"""
+        return '\n'.join(t.strip() for t in elemento.itertext() if t.strip())
+
+    def _texto_paridade(self, card, classe):
+        secoes = card.xpath(XPATH_PARIDADE.format(classe=classe))
+        if not secoes:
+            return None
+        tipografias = secoes[0].xpath(XPATH_TIPOGRAFIA)
+        return self._texto(tipografias[0]) if tipografias else None
+
+    def extrair_payload_cards(self):
+        """Extrai nome, promoção, paridade e texto de todos os cards do snapshot"""
+        try:
+            from lxml import html as lxml_html
+        except ImportError:
+            print("✗ lxml não instalado - necessário para o replay de snapshots")
+            print("Para instalar: pip install lxml")
+            return []
+
+        inicio = time.time()
+        arvore = lxml_html.fromstring(self.carregar_html())
+
+        payload = []
+        for card in arvore.xpath(XPATH_CARDS):
+            img_principal = card.xpath(XPATH_IMG_PRINCIPAL)
+            img_alt = card.xpath(XPATH_IMG_ALT)
+            promocao = card.xpath(XPATH_PROMOCAO)
+
+            payload.append({
+                'nome': img_principal[0].get('alt') if img_principal else None,
+                'nome_alternativo': img_alt[0].get('alt') if img_alt else None,
+                'tem_promocao': bool(promocao),
+                'texto_promocao': self._texto(promocao[0]) if promocao else '',
+                'paridade_promocao': self._texto_paridade(card, 'css-1oy391r'),
+                'paridade_normal': self._texto_paridade(card, 'css-nrcx9i'),
+                'texto': self._texto(card)
+            })
+
+        self.tempo_parse = time.time() - inicio
+        print(f"✓ {len(payload)} cards lidos do snapshot em {self.tempo_parse * 1000:.0f}ms")
+        return payload
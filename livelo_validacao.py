@@ -0,0 +1,182 @@
+"""
+Resumo dos dados coletados para as validações do main.py
+O histórico é lido e resumido uma única vez (registros, cobertura de datas,
+proporção de nulos, parceiros por dia) e o resumo é reaproveitado pelas etapas.
+A fonte é a mesma do reporter: o histórico Parquet (partições ou intervalos) e,
+só sem ele, livelo_parceiros.xlsx. O resumo é recalculado quando os arquivos
+dessa fonte mudam (datas, mtime/tamanho e, se estes mudarem, hash do conteúdo)
+Também traz a varredura em blocos do HTML e dos arquivos de dados publicados
+"""
+
+import hashlib
+import os
+import re
+import pandas as pd
+from livelo_cache import hash_arquivo
+
+ARQUIVO_EXCEL = "livelo_parceiros.xlsx"
+
+
+def resumir(df):
+    """Resumo usado pelas validações: contagens, cobertura, nulos e parceiros por dia"""
+    resumo = {
+        'registros': len(df),
+        'colunas': df.columns.tolist(),
+        'linhas_vazias': int(df.isnull().all(axis=1).sum()),
+        'proporcao_nulos': float(df.isnull().to_numpy().mean()) if df.size else 0.0,
+        'parceiros_por_dia': {},
+        'data_inicio': None,
+        'data_fim': None,
+        'registros_ultimo_dia': len(df),
+        'parceiros_ultimo_dia': 0
+    }
+
+    coluna_parceiro = df['Parceiro'] if 'Parceiro' in df.columns else (df.iloc[:, 0] if len(df.columns) else None)
+    if coluna_parceiro is not None:
+        resumo['parceiros_ultimo_dia'] = int(coluna_parceiro.nunique())
+
+    if 'Timestamp' in df.columns and len(df):
+        datas = pd.to_datetime(df['Timestamp'], errors='coerce').dt.strftime('%Y-%m-%d')
+        por_dia = coluna_parceiro.groupby(datas).nunique().sort_index()
+        if len(por_dia):
+            ultimo_dia = por_dia.index[-1]
+            resumo['parceiros_por_dia'] = {dia: int(n) for dia, n in por_dia.items()}
+            resumo['data_inicio'] = por_dia.index[0]
+            resumo['data_fim'] = ultimo_dia
+            resumo['registros_ultimo_dia'] = int((datas == ultimo_dia).sum())
+            resumo['parceiros_ultimo_dia'] = int(por_dia.iloc[-1])
+
+    return resumo
+
+
+class ResumoDados:
+    def __init__(self, arquivo=ARQUIVO_EXCEL):
+        self.arquivo = arquivo
+        self.resumo = None
+        self.assinatura = None
+        self.hash = None
+        self.leituras = 0
+        self.reaproveitamentos = 0
+
+    def _historico(self):
+        """Histórico Parquet em uso (partições ou intervalos), se tiver dados"""
+        try:
+            from livelo_historico import abrir_historico
+            historico = abrir_historico()
+            if historico.disponivel() and not historico.vazio():
+                return historico
+        except Exception:
+            pass
+        return None
+
+    def _fonte(self):
+        """(histórico ou None para o Excel, datas, arquivos que guardam os dados) - None sem dados"""
+        historico = self._historico()
+        if historico is not None:
+            datas = historico.datas()
+            arquivos = sorted(set(a for data in datas for a in historico.arquivos_do_dia(data)))
+            return historico, datas, arquivos
+        if os.path.exists(self.arquivo):
+            return None, [], [self.arquivo]
+        return None
+
+    def _assinatura(self, datas, arquivos):
+        estados = [(a, os.stat(a)) for a in arquivos]
+        return tuple(datas), tuple((a, e.st_mtime_ns, e.st_size) for a, e in estados)
+
+    def _hash(self, arquivos):
+        sha = hashlib.sha256()
+        for arquivo in arquivos:
+            sha.update(hash_arquivo(arquivo).encode())
+        return sha.hexdigest()
+
+    def _carregar(self, historico):
+        """Mesma fonte do reporter: histórico Parquet se existir, senão o Excel"""
+        if historico is not None:
+            try:
+                return historico.carregar(), 'parquet'
+            except Exception:
+                if not os.path.exists(self.arquivo):
+                    raise
+        return pd.read_excel(self.arquivo), 'excel'
+
+    def definir(self, df):
+        """Resume um histórico já em memória que corresponde aos dados gravados (sem reler)"""
+        self.resumo = resumir(df)
+        self.resumo['fonte'] = 'memoria'
+        fonte = self._fonte()
+        if fonte is None:
+            self.assinatura = self.hash = None
+        else:
+            _, datas, arquivos = fonte
+            self.assinatura = self._assinatura(datas, arquivos)
+            self.hash = self._hash(arquivos)
+        return self.resumo
+
+    def obter(self):
+        """Resumo dos dados atuais; None se não houver histórico nem Excel"""
+        fonte = self._fonte()
+        if fonte is None:
+            return None
+        historico, datas, arquivos = fonte
+
+        assinatura = self._assinatura(datas, arquivos)
+        if self.resumo is not None and assinatura == self.assinatura:
+            self.reaproveitamentos += 1
+            return self.resumo
+
+        # mtime/tamanho mudaram (ex.: checkout ou cópia) mas o conteúdo pode ser o mesmo
+        hash_atual = self._hash(arquivos)
+        if self.resumo is not None and hash_atual == self.hash:
+            self.assinatura = assinatura
+            self.reaproveitamentos += 1
+            return self.resumo
+
+        df, origem = self._carregar(historico)
+        self.resumo = resumir(df)
+        self.resumo['fonte'] = origem
+        self.assinatura = assinatura
+        self.hash = hash_atual
+        self.leituras += 1
+        return self.resumo
+
+
+class VerificadorStreaming:
+    """Procura vários padrões numa única passada, lendo o arquivo em blocos (memória limitada)"""
+
+    def __init__(self, padroes, ignorar_caixa=(), tamanho_bloco=1 << 16):
+        # padroes respeitam maiúsculas/minúsculas; ignorar_caixa não
+        self.sensiveis = set(padroes)
+        self.padroes = list(dict.fromkeys(list(padroes) + list(ignorar_caixa)))
+        self.tamanho_bloco = tamanho_bloco
+        self.sobreposicao = max(len(p) for p in self.padroes) - 1
+
+        # Lookahead: casa em toda posição, então padrões sobrepostos não se escondem;
+        # padrões que são prefixo de outro são conferidos a partir do mais longo
+        alternativas = sorted(self.padroes, key=len, reverse=True)
+        self.regex = re.compile('(?=(' + '|'.join(re.escape(p) for p in alternativas) + '))', re.IGNORECASE)
+        self.prefixos = {
+            p: [q for q in self.padroes if q != p and p.lower().startswith(q.lower())]
+            for p in self.padroes
+        }
+        self.por_texto = {p.lower(): p for p in self.padroes}
+
+    def _registrar(self, trecho, encontrados):
+        for candidato in [self.por_texto[trecho.lower()]] + self.prefixos[self.por_texto[trecho.lower()]]:
+            if candidato in self.sensiveis and trecho[:len(candidato)] != candidato:
+                continue
+            encontrados.add(candidato)
+
+    def varrer(self, caminho):
+        """Retorna (padrões encontrados, total de caracteres do arquivo)"""
+        encontrados = set()
+        caracteres = 0
+        resto = ''
+        with open(caminho, 'r', encoding='utf-8', errors='replace') as f:
+            for bloco in iter(lambda: f.read(self.tamanho_bloco), ''):
+                caracteres += len(bloco)
+                texto = resto + bloco
+                for m in self.regex.finditer(texto):
+                    self._registrar(texto[m.start():m.start() + len(m.group(1))], encontrados)
+                resto = texto[-self.sobreposicao:] if self.sobreposicao else ''
+        return encontrados, caracteres
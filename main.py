@@ -13,6 +13,9 @@ import argparse
 from datetime import datetime
 import logging
 import traceback
+from livelo_cache import CacheEtapas
+from livelo_validacao import ResumoDados, VerificadorStreaming
+from livelo_metricas import MEDIDOR, ARQUIVO_EXECUCAO, HistoricoExecucoes
 
 # Configurar logging
 logging.basicConfig(
@@ -36,6 +39,24 @@ class LiveloOrchestrator:
         }
         # Firebase é completamente separado
         self.firebase_opcional = False
+        self.relatorio_publicacao = None
+        
+        # Etapas rodam no mesmo processo (dados passam em memória); --isolado volta aos subprocessos
+        self.modo_isolado = False
+        # --profile: perfil do reporter (pyinstrument se instalado, senão cProfile)
+        self.perfil = False
+        # Alerta de regressão: variação sobre a mediana dos últimos dias
+        self.limite_tendencia = 0.3
+        self.dias_base_tendencia = 14
+        self.df_historico = None
+        self.analytics = None
+        
+        # Cache de etapas: entradas inalteradas reaproveitam as saídas anteriores
+        self.cache = CacheEtapas()
+        self.chave_analise = None
+        # Resumo do histórico compartilhado pelas validações (relido só se o Excel mudar)
+        self.resumo_dados = ResumoDados()
+        self.SAIDAS_ANALISE = ['public/index.html', 'public/data']
         
         # CONFIGURAÇÕES CRÍTICAS DE VALIDAÇÃO
         self.MIN_PARCEIROS = 50  # Número mínimo de parceiros esperados
@@ -64,7 +85,7 @@ class LiveloOrchestrator:
         return True
     
     def validar_dados_excel(self):
-        """Validação RIGOROSA dos dados coletados no Excel"""
+        """Validação RIGOROSA dos dados coletados (resumo lido uma vez e reaproveitado)"""
         logger.info("🔍 Validando dados coletados (RIGOROSO)...")
         
         if not os.path.exists('livelo_parceiros.xlsx'):
@@ -72,13 +93,19 @@ class LiveloOrchestrator:
             return False
         
         try:
-            import pandas as pd
+            leituras = self.resumo_dados.leituras
+            resumo = self.resumo_dados.obter()
+            if self.resumo_dados.leituras == leituras:
+                logger.info("♻️ Resumo dos dados reaproveitado (histórico inalterado)")
             
-            # Ler o Excel
-            df = pd.read_excel('livelo_parceiros.xlsx')
-            num_registros = len(df)
+            # Contagens da coleta mais recente (o histórico acumula todos os dias)
+            num_registros = resumo['registros_ultimo_dia']
             
-            logger.info(f"📊 Registros encontrados: {num_registros}")
+            logger.info(f"📊 Registros encontrados: {num_registros} (histórico: {resumo['registros']})")
+            if resumo['data_inicio']:
+                logger.info(f"📅 Cobertura: {len(resumo['parceiros_por_dia'])} dias "
+                           f"({resumo['data_inicio']} → {resumo['data_fim']}) | "
+                           f"nulos: {resumo['proporcao_nulos']:.1%}")
             
             # VALIDAÇÃO 1: Número mínimo de registros
             if num_registros < self.MIN_PARCEIROS:
@@ -94,7 +121,7 @@ class LiveloOrchestrator:
             
             # VALIDAÇÃO 2: Verificar se há colunas essenciais
             colunas_essenciais = ['nome', 'categoria']  # Ajustar conforme sua estrutura
-            colunas_encontradas = df.columns.tolist()
+            colunas_encontradas = resumo['colunas']
             
             for coluna in colunas_essenciais:
                 # Busca flexível por colunas (case insensitive)
@@ -103,17 +130,23 @@ class LiveloOrchestrator:
                     logger.warning(f"⚠️ Coluna esperada não encontrada: {coluna}")
             
             # VALIDAÇÃO 3: Verificar se dados não estão vazios
-            dados_vazios = df.isnull().all(axis=1).sum()
-            if dados_vazios > (num_registros * 0.5):  # Mais de 50% vazios
-                logger.error(f"❌ FALHA CRÍTICA: Muitos registros vazios ({dados_vazios}/{num_registros})")
+            dados_vazios = resumo['linhas_vazias']
+            if dados_vazios > (resumo['registros'] * 0.5):  # Mais de 50% vazios
+                logger.error(f"❌ FALHA CRÍTICA: Muitos registros vazios ({dados_vazios}/{resumo['registros']})")
                 return False
             
             # VALIDAÇÃO 4: Verificar diversidade de dados (não todos iguais)
-            if len(df.columns) > 0:
-                primeira_coluna = df.iloc[:, 0]
-                valores_unicos = primeira_coluna.nunique()
-                if valores_unicos < 3:  # Menos de 3 valores únicos é suspeito
-                    logger.warning(f"⚠️ Pouca diversidade nos dados: {valores_unicos} valores únicos")
+            valores_unicos = resumo['parceiros_ultimo_dia']
+            if valores_unicos < 3:  # Menos de 3 valores únicos é suspeito
+                logger.warning(f"⚠️ Pouca diversidade nos dados: {valores_unicos} valores únicos")
+            
+            # VALIDAÇÃO 5: Queda brusca de parceiros em relação aos dias anteriores
+            contagens = list(resumo['parceiros_por_dia'].values())
+            if len(contagens) > 1:
+                anteriores = sorted(contagens[-8:-1])
+                mediana = anteriores[len(anteriores) // 2]
+                if contagens[-1] < mediana * 0.5:
+                    logger.warning(f"⚠️ Queda de parceiros: {contagens[-1]} hoje vs mediana {mediana} nos dias anteriores")
             
             logger.info(f"✅ Dados validados: {num_registros} parceiros coletados")
             logger.info(f"✅ Colunas encontradas: {len(colunas_encontradas)}")
@@ -155,52 +188,94 @@ class LiveloOrchestrator:
             logger.error("❌ FALHA CRÍTICA: Validação de dados falhou")
             return False
         
-        # VALIDAÇÃO 3: Conteúdo HTML específico (RIGOROSA)
+        # VALIDAÇÃO 3: Conteúdo HTML específico (RIGOROSA) - varredura em blocos, uma passada
         try:
-            with open('public/index.html', 'r', encoding='utf-8') as f:
-                conteudo = f.read()
-                
-                # Verificações obrigatórias
-                verificacoes_criticas = [
-                    ('</html>', 'HTML bem formado'),
-                    ('Livelo', 'conteúdo relacionado ao Livelo'),
-                    ('table', 'tabelas de dados'),
-                ]
-                
-                for busca, desc in verificacoes_criticas:
-                    if busca not in conteudo:
-                        logger.error(f"❌ FALHA CRÍTICA: HTML não contém {desc}")
-                        return False
-                
-                # Verificar se não é uma página de erro
-                indicadores_erro = [
-                    'erro 404', '404 not found', 'página não encontrada',
-                    'access denied', 'blocked', 'captcha',
-                    'erro 500', 'internal server error'
-                ]
-                
-                conteudo_lower = conteudo.lower()
-                for indicador in indicadores_erro:
-                    if indicador in conteudo_lower:
-                        logger.error(f"❌ FALHA CRÍTICA: HTML indica erro: '{indicador}'")
-                        return False
-                
-                # Verificar tamanho mínimo do conteúdo
-                if len(conteudo) < self.MIN_HTML_SIZE:
-                    logger.error(f"❌ FALHA CRÍTICA: HTML muito pequeno!")
-                    logger.error(f"   Tamanho: {len(conteudo):,} caracteres")
-                    logger.error(f"   Mínimo: {self.MIN_HTML_SIZE:,} caracteres")
+            # Verificações obrigatórias
+            verificacoes_criticas = [
+                ('</html>', 'HTML bem formado'),
+                ('Livelo', 'conteúdo relacionado ao Livelo'),
+                ('table', 'tabelas de dados'),
+            ]
+            
+            # Indicadores de página de erro (sem diferenciar maiúsculas)
+            indicadores_erro = [
+                'erro 404', '404 not found', 'página não encontrada',
+                'access denied', 'blocked', 'captcha',
+                'erro 500', 'internal server error'
+            ]
+            
+            verificador = VerificadorStreaming([busca for busca, _ in verificacoes_criticas], indicadores_erro)
+            encontrados, caracteres = verificador.varrer('public/index.html')
+            
+            for busca, desc in verificacoes_criticas:
+                if busca not in encontrados:
+                    logger.error(f"❌ FALHA CRÍTICA: HTML não contém {desc}")
                     return False
-                
-                logger.info(f"✅ HTML validado: {len(conteudo):,} caracteres")
+            
+            for indicador in indicadores_erro:
+                if indicador in encontrados:
+                    logger.error(f"❌ FALHA CRÍTICA: HTML indica erro: '{indicador}'")
+                    return False
+            
+            # Verificar tamanho mínimo do conteúdo
+            if caracteres < self.MIN_HTML_SIZE:
+                logger.error(f"❌ FALHA CRÍTICA: HTML muito pequeno!")
+                logger.error(f"   Tamanho: {caracteres:,} caracteres")
+                logger.error(f"   Mínimo: {self.MIN_HTML_SIZE:,} caracteres")
+                return False
+            
+            logger.info(f"✅ HTML validado: {caracteres:,} caracteres")
                 
         except Exception as e:
             logger.error(f"❌ FALHA CRÍTICA: Erro ao validar HTML: {e}")
             return False
+        
+        # VALIDAÇÃO 4: Arquivos de dados carregados pela página (public/data)
+        if not self.validar_arquivos_dados():
+            return False
             
         self.sucesso_etapas['validacao'] = True
         return True
         
+    def validar_arquivos_dados(self, pasta='public/data'):
+        """Varre os JSON de public/data (nomes com ou sem hash) atrás de conteúdo inválido"""
+        if not os.path.isdir(pasta):
+            logger.error(f"❌ FALHA CRÍTICA: {pasta} não encontrado (histórico do dashboard)")
+            return False
+        
+        # Dados colunares precisam do cabeçalho; página HTML no lugar de JSON indica erro
+        verificador_colunar = VerificadorStreaming(['"formato":"colunar-v1"'], ['<html', '<!doctype'])
+        verificador_manifesto = VerificadorStreaming(['"parceiros"'], ['<html', '<!doctype'])
+        
+        arquivos = 0
+        historico = False
+        try:
+            for raiz, _, nomes in os.walk(pasta):
+                for nome in nomes:
+                    if not nome.endswith('.json'):
+                        continue
+                    caminho = os.path.join(raiz, nome)
+                    manifesto = nome.startswith('manifest.')
+                    verificador = verificador_manifesto if manifesto else verificador_colunar
+                    encontrados, caracteres = verificador.varrer(caminho)
+                    
+                    obrigatorio = verificador.padroes[0]
+                    if caracteres == 0 or obrigatorio not in encontrados or len(encontrados) > 1:
+                        logger.error(f"❌ FALHA CRÍTICA: Arquivo de dados inválido: {caminho}")
+                        return False
+                    arquivos += 1
+                    historico = historico or (raiz == pasta and nome.startswith('historico.'))
+        except Exception as e:
+            logger.error(f"❌ FALHA CRÍTICA: Erro ao validar arquivos de dados: {e}")
+            return False
+        
+        if not historico:
+            logger.error(f"❌ FALHA CRÍTICA: historico.json ausente em {pasta}")
+            return False
+        
+        logger.info(f"✅ Arquivos de dados validados: {arquivos}")
+        return True
+    
     def executar_scraping(self):
         """Executa o scraping do site Livelo"""
         logger.info("🕷️ Iniciando scraping...")
@@ -224,13 +299,13 @@ class LiveloOrchestrator:
                     logger.error("❌ Scraper ausente e sem dados")
                     return False
             
-            # Executar scraper com timeout mais longo
             logger.info("📊 Executando scraper...")
-            resultado = subprocess.run([
-                sys.executable, 'livelo_scraper.py'
-            ], capture_output=True, text=True, timeout=1800)  # 30 min
+            if self.modo_isolado:
+                executou = self.executar_scraper_subprocesso()
+            else:
+                executou = self.executar_scraper_em_processo()
             
-            if resultado.returncode == 0:
+            if executou:
                 logger.info("✅ Scraper executado sem erros")
                 
                 # VALIDAÇÃO IMEDIATA: Verificar se arquivo foi gerado E é válido
@@ -250,11 +325,7 @@ class LiveloOrchestrator:
                     logger.error("❌ FALHA CRÍTICA: Scraper executou mas não gerou arquivo")
                     return False
             else:
-                logger.error(f"❌ FALHA CRÍTICA: Scraper falhou (código {resultado.returncode})")
-                if resultado.stderr:
-                    logger.error(f"Erro: {resultado.stderr[:500]}")
-                if resultado.stdout:
-                    logger.info(f"Output: {resultado.stdout[-500:]}")
+                logger.error("❌ FALHA CRÍTICA: Scraper falhou")
                 return False
                 
         except subprocess.TimeoutExpired:
@@ -265,6 +336,71 @@ class LiveloOrchestrator:
             logger.error(f"Trace: {traceback.format_exc()}")
             return False
     
+    def executar_scraper_em_processo(self):
+        """Roda o LiveloScraper neste processo e guarda o histórico para o reporter"""
+        try:
+            from livelo_scraper import LiveloScraper
+        except ImportError as e:
+            logger.warning(f"⚠️ Scraper não importável ({e}) - usando subprocesso")
+            return self.executar_scraper_subprocesso()
+        
+        scraper = LiveloScraper()
+        scraper.exportar_excel = False  # exportado na preparação do deploy
+        if not scraper.executar_scraping():
+            return False
+        self.df_historico = scraper.df_historico
+        if self.df_historico is None:
+            logger.warning("⚠️ Scraper não repassou o histórico - o reporter vai lê-lo do disco")
+        else:
+            self.resumo_dados.definir(self.df_historico)
+        return True
+    
+    def executar_scraper_subprocesso(self):
+        """Roda livelo_scraper.py como processo separado (modo --isolado)"""
+        with MEDIDOR.processo_filho() as ambiente:
+            resultado = subprocess.run([
+                sys.executable, 'livelo_scraper.py', '--sem-excel'
+            ], capture_output=True, text=True, timeout=1800, env=ambiente)  # 30 min
+        
+        if resultado.returncode != 0:
+            logger.error(f"❌ Scraper terminou com código {resultado.returncode}")
+            if resultado.stderr:
+                logger.error(f"Erro: {resultado.stderr[:500]}")
+            if resultado.stdout:
+                logger.info(f"Output: {resultado.stdout[-500:]}")
+            return False
+        return True
+    
+    def entradas_analise(self):
+        """Entradas que definem o resultado do reporter: coleta do dia, dimensões e versão do código"""
+        entradas = ['dimensoes.json', 'aliases_parceiros.json', 'livelo_reporter.py', 'livelo_historico.py', 'livelo_colunar.py',
+                    'livelo_publicacao.py', 'livelo_metricas.py']
+        
+        datas = []
+        try:
+            from livelo_historico import abrir_historico
+            historico = abrir_historico()
+            datas = historico.datas() if historico.disponivel() else []
+        except Exception as e:
+            logger.warning(f"⚠️ Histórico Parquet indisponível para o cache: {e}")
+        
+        if datas:
+            # Arquivos do dia + lista de dias (dias anteriores só mudam por migração/reprocessamento)
+            entradas += historico.arquivos_do_dia(datas[-1])
+            entradas.append(','.join(datas))
+        else:
+            entradas.append('livelo_parceiros.xlsx')
+        return entradas
+    
+    def registrar_cache_analise(self):
+        """Registra as saídas da análise (já publicadas) para a próxima execução"""
+        if not self.chave_analise or not self.cache.habilitado:
+            return
+        try:
+            self.cache.registrar('analise', self.chave_analise, self.SAIDAS_ANALISE)
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível registrar o cache da análise: {e}")
+    
     def executar_analise(self):
         """Executa a análise e geração do relatório"""
         logger.info("📊 Iniciando análise...")
@@ -285,12 +421,20 @@ class LiveloOrchestrator:
                 logger.error("❌ FALHA CRÍTICA: livelo_reporter.py não encontrado")
                 return False
             
+            self.chave_analise = self.cache.calcular_chave('analise', self.entradas_analise())
+            if self.cache.consultar('analise', self.chave_analise):
+                logger.info("♻️ Cache: entradas da análise inalteradas - reaproveitando public/ da execução anterior")
+                self.sucesso_etapas['analise'] = True
+                return self.validar_arquivos_gerados()
+            logger.info(f"📈 Cache da análise: {self.cache.status['analise']}")
+            
             logger.info("📈 Executando análise com reporter...")
-            resultado = subprocess.run([
-                sys.executable, 'livelo_reporter.py', 'livelo_parceiros.xlsx'
-            ], capture_output=True, text=True, timeout=600)  # 10 min
+            if self.modo_isolado:
+                executou = self.executar_reporter_subprocesso()
+            else:
+                executou = self.executar_reporter_em_processo()
             
-            if resultado.returncode == 0:
+            if executou:
                 logger.info("✅ Reporter executado sem erros")
                 
                 # ✅ VERIFICAR APENAS public/index.html (onde deve estar)
@@ -313,11 +457,7 @@ class LiveloOrchestrator:
                     return False
                 
             else:
-                logger.error(f"❌ FALHA CRÍTICA: Reporter falhou (código {resultado.returncode})")
-                if resultado.stderr:
-                    logger.error(f"Erro: {resultado.stderr[:500]}")
-                if resultado.stdout:
-                    logger.info(f"Output: {resultado.stdout[-500:]}")
+                logger.error("❌ FALHA CRÍTICA: Reporter falhou")
                 return False
                 
         except subprocess.TimeoutExpired:
@@ -328,6 +468,87 @@ class LiveloOrchestrator:
             logger.error(f"Trace: {traceback.format_exc()}")
             return False
     
+    def executar_reporter_em_processo(self):
+        """Roda o LiveloAnalytics neste processo reaproveitando o histórico do scraper"""
+        try:
+            from livelo_reporter import LiveloAnalytics
+        except ImportError as e:
+            logger.warning(f"⚠️ Reporter não importável ({e}) - usando subprocesso")
+            return self.executar_reporter_subprocesso()
+        
+        if self.df_historico is not None:
+            logger.info(f"♻️ Histórico em memória repassado ao reporter ({len(self.df_historico)} registros)")
+        self.analytics = LiveloAnalytics('livelo_parceiros.xlsx', df_entrada=self.df_historico)
+        if self.perfil:
+            return bool(self.executar_com_perfil(self.analytics.executar_analise_completa, 'perfil_reporter'))
+        return bool(self.analytics.executar_analise_completa())
+    
+    def executar_com_perfil(self, funcao, prefixo):
+        """Executa a função sob pyinstrument (HTML) ou cProfile (.prof + resumo .txt)"""
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+        
+        if Profiler is not None:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                return funcao()
+            finally:
+                profiler.stop()
+                with open(f"{prefixo}.html", 'w', encoding='utf-8') as f:
+                    f.write(profiler.output_html())
+                logger.info(f"🔬 Perfil salvo (pyinstrument): {prefixo}.html")
+        
+        import cProfile
+        import pstats
+        import io
+        perfil = cProfile.Profile()
+        try:
+            return perfil.runcall(funcao)
+        finally:
+            perfil.dump_stats(f"{prefixo}.prof")
+            texto = io.StringIO()
+            pstats.Stats(perfil, stream=texto).sort_stats('cumulative').print_stats(40)
+            with open(f"{prefixo}.txt", 'w', encoding='utf-8') as f:
+                f.write(texto.getvalue())
+            logger.info(f"🔬 Perfil salvo (cProfile): {prefixo}.prof / {prefixo}.txt")
+    
+    def executar_reporter_subprocesso(self):
+        """Roda livelo_reporter.py como processo separado (modo --isolado)"""
+        comando = [sys.executable, 'livelo_reporter.py', 'livelo_parceiros.xlsx']
+        if self.perfil:
+            comando[1:1] = ['-m', 'cProfile', '-o', 'perfil_reporter.prof']
+        with MEDIDOR.processo_filho() as ambiente:
+            resultado = subprocess.run(comando, capture_output=True, text=True, timeout=600, env=ambiente)  # 10 min
+        
+        if resultado.returncode != 0:
+            logger.error(f"❌ Reporter terminou com código {resultado.returncode}")
+            if resultado.stderr:
+                logger.error(f"Erro: {resultado.stderr[:500]}")
+            if resultado.stdout:
+                logger.info(f"Output: {resultado.stdout[-500:]}")
+            return False
+        return True
+    
+    def exportar_excel_historico(self):
+        """Exporta o livelo_parceiros.xlsx do histórico Parquet quando ele está desatualizado"""
+        try:
+            from livelo_historico import abrir_historico
+            historico = abrir_historico()
+            if not historico.disponivel() or historico.vazio():
+                return True
+            if historico.excel_atualizado():
+                logger.info("♻️ livelo_parceiros.xlsx já reflete o histórico")
+                return True
+            total = historico.exportar_excel('livelo_parceiros.xlsx')
+            logger.info(f"📄 livelo_parceiros.xlsx exportado do histórico ({total:,} registros)")
+            return True
+        except Exception as e:
+            logger.error(f"❌ FALHA CRÍTICA: Não foi possível exportar o Excel: {e}")
+            return False
+    
     def preparar_deploy_github(self):
         """Prepara arquivos para GitHub Pages - HTML já está no local correto"""
         logger.info("🚀 Verificando arquivos para GitHub Pages...")
@@ -345,6 +566,9 @@ class LiveloOrchestrator:
                 logger.error("   O livelo_reporter.py deve gerar direto em public/index.html")
                 return False
             
+            if not self.exportar_excel_historico():
+                return False
+            
             # Copiar APENAS o Excel para o public/
             if os.path.exists('livelo_parceiros.xlsx'):
                 import shutil
@@ -354,6 +578,14 @@ class LiveloOrchestrator:
                 logger.error("❌ FALHA CRÍTICA: livelo_parceiros.xlsx não encontrado para deploy")
                 return False
             
+            # Hash de conteúdo nos dados + variantes .gz/.br (falha aqui não bloqueia o deploy)
+            try:
+                from livelo_publicacao import publicar
+                self.relatorio_publicacao = publicar('public')
+                logger.info("📦 Arquivos estáticos publicados (hash + pré-compressão)")
+            except Exception as e:
+                logger.warning(f"⚠️ Publicação otimizada falhou, seguindo com os arquivos originais: {e}")
+            
             # ✅ VERIFICAÇÃO FINAL - TUDO NO PUBLIC/
             arquivos_verificar = [
                 ('public/index.html', self.MIN_HTML_SIZE),
@@ -419,11 +651,12 @@ class LiveloOrchestrator:
             # Tentar executar notificações
             if os.path.exists('notification_sender.py'):
                 logger.info("📱 Executando notificações Firebase...")
-                resultado = subprocess.run([
-                    sys.executable, 'notification_sender.py'
-                ], capture_output=True, text=True, timeout=180)  # 3 min
+                if self.modo_isolado:
+                    executou = self.executar_notificacoes_subprocesso()
+                else:
+                    executou = self.executar_notificacoes_em_processo()
                 
-                if resultado.returncode == 0:
+                if executou:
                     logger.info("✅ Notificações Firebase funcionando")
                     self.firebase_opcional = True
                     return True
@@ -441,6 +674,121 @@ class LiveloOrchestrator:
             logger.warning(f"⚠️ Firebase com problemas (não crítico): {e}")
             return False
     
+    def executar_notificacoes_em_processo(self):
+        """Roda o notifier neste processo com as mudanças já calculadas pela análise"""
+        try:
+            from notification_sender import LiveloFirebaseNotifier
+        except ImportError as e:
+            logger.warning(f"⚠️ Notifier não importável ({e}) - usando subprocesso")
+            return self.executar_notificacoes_subprocesso()
+        
+        notifier = LiveloFirebaseNotifier()
+        mudancas = None
+        # Com cache da análise o reporter não rodou: o notifier lê os snapshots por conta própria
+        if self.analytics is not None and self.analytics.df_hoje is not None:
+            mudancas = notifier.mudancas_de_analise(self.analytics.df_hoje, self.analytics.df_ontem)
+        return bool(notifier.executar(mudancas))
+    
+    def executar_notificacoes_subprocesso(self):
+        """Roda notification_sender.py como processo separado (modo --isolado)"""
+        resultado = subprocess.run([
+            sys.executable, 'notification_sender.py'
+        ], capture_output=True, text=True, timeout=180)  # 3 min
+        return resultado.returncode == 0
+    
+    def salvar_registro_execucao(self, sucesso):
+        """Grava o registro de tempos/recursos da execução ao lado do main_livelo.log"""
+        try:
+            registro = MEDIDOR.salvar(
+                ARQUIVO_EXECUCAO,
+                timestamp=self.timestamp,
+                sucesso=bool(sucesso),
+                modo='isolado' if self.modo_isolado else 'processo_unico',
+                sucesso_etapas=self.sucesso_etapas,
+                cache=self.cache.status
+            )
+            logger.info(f"⏱️ Registro da execução salvo: {ARQUIVO_EXECUCAO}")
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível salvar o registro da execução: {e}")
+            return
+        
+        self.registrar_metricas_execucao(registro)
+    
+    def metricas_execucao(self, registro):
+        """Cards coletados, linhas e tamanhos publicados desta execução"""
+        etapas = {}
+        pendentes = list(registro['etapas'])
+        while pendentes:
+            atual = pendentes.pop()
+            etapas[atual['etapa']] = atual
+            pendentes += atual.get('subetapas', [])
+        
+        cards = None
+        for nome in ('rolagem', 'extracao', 'coleta_rede'):
+            if etapas.get(nome, {}).get('linhas') is not None:
+                cards = etapas[nome]['linhas']
+                break
+        
+        resumo = self.resumo_dados.resumo or {}
+        tamanho_dados = None
+        if os.path.isdir('public/data'):
+            tamanho_dados = sum(
+                os.path.getsize(os.path.join(raiz, nome))
+                for raiz, _, nomes in os.walk('public/data') for nome in nomes
+                if nome.endswith('.json')
+            )
+        return {
+            'cards': cards,
+            'registros_dia': resumo.get('registros_ultimo_dia'),
+            'registros_historico': resumo.get('registros'),
+            'tamanho_html': os.path.getsize('public/index.html') if os.path.exists('public/index.html') else None,
+            'tamanho_dados': tamanho_dados
+        }
+    
+    def registrar_metricas_execucao(self, registro):
+        """Acrescenta a execução ao histórico de métricas e alerta regressões"""
+        try:
+            historico = HistoricoExecucoes()
+            historico.registrar(registro, **self.metricas_execucao(registro))
+            if registro['sucesso']:
+                tendencias = historico.tendencias(self.dias_base_tendencia, self.limite_tendencia)
+                for linha in tendencias[tendencias['alerta']].itertuples() if not tendencias.empty else []:
+                    logger.warning(f"⚠️ Regressão: {linha.serie} = {linha.atual:,.2f} "
+                                   f"(+{linha.variacao:.0%} sobre a mediana de {self.dias_base_tendencia} dias: "
+                                   f"{linha.mediana_base:,.2f})")
+            historico.fechar()
+            logger.info(f"📈 Métricas da execução registradas: {historico.arquivo}")
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível registrar as métricas da execução: {e}")
+    
+    def mostrar_tendencias(self):
+        """Tabela de tendências (main.py --trend)"""
+        import pandas as pd
+        historico = HistoricoExecucoes()
+        tendencias = historico.tendencias(self.dias_base_tendencia, self.limite_tendencia)
+        historico.fechar()
+        
+        if tendencias.empty:
+            print("ℹ️ Nenhuma execução bem-sucedida registrada ainda")
+            return False
+        
+        print("\n" + "="*92)
+        print(f"📈 TENDÊNCIAS DA ÚLTIMA EXECUÇÃO (base: {self.dias_base_tendencia} dias, "
+              f"alerta acima de +{self.limite_tendencia:.0%})")
+        print("="*92)
+        print(f"   {'série':<44} {'atual':>12} {'mediana 7':>12} {'mediana base':>13} {'variação':>9}")
+        for linha in tendencias.itertuples():
+            mediana_base = f"{linha.mediana_base:,.2f}" if pd.notna(linha.mediana_base) else 'sem base'
+            variacao = f"{linha.variacao:+.0%}" if pd.notna(linha.variacao) else '-'
+            icone = '⚠️' if linha.alerta else '  '
+            print(f"{icone} {linha.serie:<44} {linha.atual:>12,.2f} {linha.mediana_movel:>12,.2f} "
+                  f"{mediana_base:>13} {variacao:>9}")
+        
+        alertas = int(tendencias['alerta'].sum())
+        print("")
+        print(f"{'⚠️' if alertas else '✅'} {alertas} série(s) acima do limite")
+        return True
+    
     def gerar_relatorio_execucao(self):
         """Gera relatório final da execução"""
         logger.info("📋 Gerando relatório de execução...")
@@ -488,6 +836,39 @@ class LiveloOrchestrator:
             else:
                 print(f"   ❌ {arquivo}: NÃO ENCONTRADO")
         
+        if self.cache.status:
+            print("")
+            print("♻️ CACHE DE ETAPAS:")
+            for etapa, status in self.cache.status.items():
+                icone = '✅' if status == 'hit' else '🔄'
+                print(f"   {icone} {etapa.replace('_', ' ').title()}: {status}")
+        
+        tempos = MEDIDOR.linhas_resumo()
+        if tempos:
+            print("")
+            print("⏱️ TEMPOS POR ETAPA:")
+            for linha in tempos:
+                print(f"   {linha}")
+        
+        if self.resumo_dados.resumo:
+            resumo = self.resumo_dados.resumo
+            print("")
+            print("📑 RESUMO DOS DADOS:")
+            print(f"   📊 {resumo['registros']:,} registros | {len(resumo['parceiros_por_dia'])} dias "
+                  f"({resumo['data_inicio']} → {resumo['data_fim']})")
+            print(f"   📖 Leituras: {self.resumo_dados.leituras} ({resumo['fonte']}) | "
+                  f"reaproveitamentos: {self.resumo_dados.reaproveitamentos}")
+        
+        if self.relatorio_publicacao:
+            tamanhos = self.relatorio_publicacao
+            print("")
+            print("📦 PUBLICAÇÃO (HTML + DADOS):")
+            print(f"   📄 Original: {tamanhos['original']:,} bytes em {tamanhos['arquivos']} arquivos")
+            print(f"   🗜️ Gzip: {tamanhos['gzip']:,} bytes ({tamanhos['gzip'] / max(tamanhos['original'], 1):.1%})")
+            if tamanhos['brotli'] is not None:
+                print(f"   🗜️ Brotli: {tamanhos['brotli']:,} bytes ({tamanhos['brotli'] / max(tamanhos['original'], 1):.1%})")
+            print(f"   🔑 Arquivos com hash de conteúdo: {tamanhos['arquivos_com_hash']}")
+        
         # Status final baseado APENAS em etapas críticas
         print("")
         if criticas_sucesso >= total_criticas:
@@ -549,16 +930,20 @@ class LiveloOrchestrator:
         try:
             # 0. VALIDAR AMBIENTE
             logger.info("🔍 Etapa 1/4: Validando ambiente...")
-            if not self.validar_ambiente():
-                logger.error("❌ FALHA CRÍTICA: Ambiente não está preparado")
-                return False
+            with MEDIDOR.etapa('ambiente'):
+                if not self.validar_ambiente():
+                    logger.error("❌ FALHA CRÍTICA: Ambiente não está preparado")
+                    return False
             
             # 1. SCRAPING
             if not pular_scraping and not apenas_analise:
                 logger.info("🕷️ Etapa 2/4: Executando scraping...")
-                if not self.executar_scraping():
-                    logger.error("❌ FALHA CRÍTICA: Scraping falhou")
-                    return False
+                with MEDIDOR.etapa('scraping') as registro:
+                    if not self.executar_scraping():
+                        logger.error("❌ FALHA CRÍTICA: Scraping falhou")
+                        return False
+                    if self.resumo_dados.resumo:
+                        registro['linhas'] = self.resumo_dados.resumo['registros_ultimo_dia']
             else:
                 logger.info("⏭️ Etapa 2/4: Pulando scraping...")
                 if os.path.exists('livelo_parceiros.xlsx'):
@@ -574,20 +959,26 @@ class LiveloOrchestrator:
             
             # 2. ANÁLISE + VALIDAÇÃO
             logger.info("📊 Etapa 3/4: Executando análise...")
-            if not self.executar_analise():
-                logger.error("❌ FALHA CRÍTICA: Análise falhou")
-                return False
+            with MEDIDOR.etapa('analise') as registro:
+                if not self.executar_analise():
+                    logger.error("❌ FALHA CRÍTICA: Análise falhou")
+                    return False
+                if self.resumo_dados.resumo:
+                    registro['linhas'] = self.resumo_dados.resumo['registros']
             
             # 3. PREPARAR DEPLOY
             if not apenas_analise:
                 logger.info("🚀 Etapa 4/4: Preparando deploy...")
-                if not self.preparar_deploy_github():
-                    logger.error("❌ FALHA CRÍTICA: Preparação do deploy falhou")
-                    return False
+                with MEDIDOR.etapa('deploy'):
+                    if not self.preparar_deploy_github():
+                        logger.error("❌ FALHA CRÍTICA: Preparação do deploy falhou")
+                        return False
             else:
                 logger.info("⏭️ Etapa 4/4: Pulando preparação deploy...")
                 self.sucesso_etapas['deploy_preparacao'] = True
             
+            self.registrar_cache_analise()
+            
             # PIPELINE PRINCIPAL CONCLUÍDO COM SUCESSO
             logger.info("🎉 Pipeline principal concluído com 100% de sucesso!")
             
@@ -595,7 +986,8 @@ class LiveloOrchestrator:
             if not apenas_analise:
                 logger.info("🔥 Extra: Tentando Firebase (opcional)...")
                 try:
-                    self.tentar_firebase_opcional()
+                    with MEDIDOR.etapa('notificacoes'):
+                        self.tentar_firebase_opcional()
                     logger.info("✅ Verificação Firebase concluída")
                 except Exception as e:
                     logger.warning(f"⚠️ Firebase com problemas (ignorado): {e}")
@@ -621,6 +1013,18 @@ def main():
                        help='Ativar modo debug com mais logs')
     parser.add_argument('--min-parceiros', type=int, default=50,
                        help='Número mínimo de parceiros para considerar sucesso')
+    parser.add_argument('--sem-cache', action='store_true',
+                       help='Ignora o cache de etapas e executa tudo novamente')
+    parser.add_argument('--isolado', action='store_true',
+                       help='Executa scraper, reporter e notificações em subprocessos separados')
+    parser.add_argument('--profile', action='store_true',
+                       help='Salva o perfil de execução do reporter (pyinstrument ou cProfile)')
+    parser.add_argument('--trend', action='store_true',
+                       help='Mostra a tendência das métricas das execuções e sai')
+    parser.add_argument('--limite-tendencia', type=float, default=0.3,
+                       help='Variação sobre a mediana da base que gera alerta (0.3 = +30%%)')
+    parser.add_argument('--dias-base', type=int, default=14,
+                       help='Dias de execuções anteriores usados como base da tendência')
     
     args = parser.parse_args()
     
@@ -630,6 +1034,15 @@ def main():
         logger.info("🐛 Modo debug ativado")
     
     orchestrator = LiveloOrchestrator()
+    orchestrator.cache.habilitado = not args.sem_cache
+    orchestrator.modo_isolado = args.isolado
+    orchestrator.perfil = args.profile
+    orchestrator.limite_tendencia = args.limite_tendencia
+    orchestrator.dias_base_tendencia = args.dias_base
+    
+    if args.trend:
+        orchestrator.mostrar_tendencias()
+        sys.exit(0)
     
     # Aplicar configuração personalizada
     if args.min_parceiros:
@@ -642,6 +1055,7 @@ def main():
         pular_scraping=args.pular_scraping,
         apenas_analise=args.apenas_analise
     )
+    orchestrator.salvar_registro_execucao(sucesso)
     
     # Resultado final
     if sucesso:
@@ -272,11 +272,91 @@ class LiveloFirebaseNotifier:
         
         return usuarios_final
     
+    def detectar_mudancas_snapshots(self, hoje, ontem, categoria_parceiro):
+        """Ofertas novas e mudanças de pontos entre dois snapshots (Parceiro + Moeda)"""
+        from livelo_historico import comparar_snapshots
+        tabelas = comparar_snapshots(hoje, ontem)
+        
+        novos = tabelas['novos_parceiros']
+        ganharam = pd.concat([tabelas['ganharam_oferta'], novos[novos['Oferta_Hoje'].astype(bool)]])
+        pontos = tabelas['mudancas_pontos'].drop(index=ganharam.index, errors='ignore')
+        eventos = pd.concat([ganharam.assign(tipo='nova_oferta'), pontos.assign(tipo='mudanca_pontos')]).sort_index()
+        # Pontos anteriores pela posição (no concat a coluna viraria float por causa dos novos)
+        anteriores = dict(zip(pontos.index, pontos['Pontos_Ontem'].tolist()))
+        
+        mudancas = []
+        for row in eventos.itertuples():
+            mudanca = {
+                'tipo': row.tipo,
+                'parceiro': row.Parceiro,
+                'moeda': row.Moeda,
+                'pontos': row.Pontos_Hoje,
+                'categoria': categoria_parceiro(row.Parceiro) or 'Geral',
+                'timestamp': datetime.now().isoformat()
+            }
+            if row.tipo == 'mudanca_pontos':
+                mudanca['pontos_anterior'] = anteriores[row.Index]
+            mudancas.append(mudanca)
+        
+        return mudancas
+    
+    def mudancas_de_analise(self, df_hoje, df_ontem):
+        """Mudanças a partir dos snapshots já carregados pelo LiveloAnalytics (pipeline em processo)"""
+        categorias = {}
+        if 'Categoria_Dimensao' in df_hoje.columns:
+            categorias = {
+                parceiro: categoria for parceiro, categoria in zip(df_hoje['Parceiro'], df_hoje['Categoria_Dimensao'])
+                if categoria and categoria != 'Não mapeado'
+            }
+        return self.detectar_mudancas_snapshots(df_hoje, df_ontem, categorias.get)
+    
+    def analisar_mudancas_banco(self, data_hoje=None, data_ontem=None):
+        """Compara dois snapshots do banco SQLite - por padrão os dois últimos (None se indisponível)"""
+        arquivo_banco = os.path.join(self.script_dir, 'livelo_historico.db')
+        if not os.path.exists(arquivo_banco):
+            return None
+        
+        try:
+            from livelo_historico import HistoricoSQLite
+            banco = HistoricoSQLite(arquivo_banco)
+            hoje = banco.snapshot(data_hoje) if data_hoje else banco.snapshot_mais_recente()
+            ontem = banco.snapshot(data_ontem) if data_ontem else banco.snapshot_anterior()
+            dimensoes = {}
+            mudancas = []
+            
+            if hoje.empty:
+                banco.fechar()
+                return None
+            
+            logger.info(f"Snapshots carregados do banco: {len(hoje)} hoje, {len(ontem)} anterior")
+            
+            def categoria_parceiro(parceiro):
+                if parceiro not in dimensoes:
+                    dimensoes[parceiro] = banco.dimensao_parceiro(parceiro) or {}
+                return dimensoes[parceiro].get('categoria')
+            
+            mudancas = self.detectar_mudancas_snapshots(hoje, ontem, categoria_parceiro)
+            banco.fechar()
+            return mudancas
+            
+        except Exception as e:
+            logger.warning(f"Erro ao consultar banco SQLite: {e}")
+            return None
+    
     def analisar_mudancas_ofertas(self):
         """Analisa mudanças nas ofertas baseado nos dados do scraper com caminhos corretos"""
         logger.info("Analisando mudanças nas ofertas...")
         
         try:
+            # Preferir o banco SQLite: apenas os dois últimos snapshots
+            mudancas = self.analisar_mudancas_banco()
+            if mudancas is not None:
+                if not mudancas:
+                    mudancas = self._gerar_mudancas_demo()
+                self.stats['mudancas_detectadas'] = len(mudancas)
+                logger.info(f"{len(mudancas)} mudanças detectadas")
+                return mudancas
+            
             # Arquivo Excel com caminho absoluto
             arquivo_excel = os.path.join(self.script_dir, 'livelo_parceiros.xlsx')
             
@@ -293,22 +373,16 @@ class LiveloFirebaseNotifier:
             if 'Timestamp' in df.columns:
                 df['Timestamp'] = pd.to_datetime(df['Timestamp'])
             
-            # Analisar mudanças reais
+            # Analisar mudanças reais: os dois últimos dias da planilha
             mudancas = []
             
-            # Exemplo: detectar ofertas baseado em dados
-            if 'Oferta' in df.columns:
-                ofertas = df[df['Oferta'] == 'Sim']
-                
-                for _, row in ofertas.iterrows():
-                    mudancas.append({
-                        'tipo': 'nova_oferta',
-                        'parceiro': row.get('Parceiro', 'Parceiro Desconhecido'),
-                        'moeda': row.get('Moeda', 'R$'),
-                        'pontos': row.get('Pontos', 0),
-                        'categoria': row.get('Categoria', 'Geral'),
-                        'timestamp': datetime.now().isoformat()
-                    })
+            if 'Oferta' in df.columns and 'Timestamp' in df.columns and not df.empty:
+                datas = df['Timestamp'].dt.date
+                dias = sorted(datas.unique())
+                hoje = df[datas == dias[-1]]
+                ontem = df[datas == dias[-2]] if len(dias) > 1 else df.iloc[0:0]
+                categorias = dict(zip(df['Parceiro'], df['Categoria'])) if 'Categoria' in df.columns else {}
+                mudancas = self.detectar_mudancas_snapshots(hoje, ontem, categorias.get)
             
             # Se não há mudanças reais, usar demo
             if not mudancas:
@@ -454,8 +528,8 @@ class LiveloFirebaseNotifier:
             self.stats['notificacoes_falharam'] += 1
             return False
     
-    def processar_notificacoes(self):
-        """Processa todas as notificações"""
+    def processar_notificacoes(self, mudancas=None):
+        """Processa todas as notificações (mudanças já calculadas podem vir do main.py)"""
         logger.info("Processando notificações...")
         
         # 1. Verificar Firebase
@@ -474,7 +548,13 @@ class LiveloFirebaseNotifier:
             return True
         
         # 3. Analisar mudanças
-        mudancas = self.analisar_mudancas_ofertas()
+        if mudancas is None:
+            mudancas = self.analisar_mudancas_ofertas()
+        else:
+            if not mudancas:
+                mudancas = self._gerar_mudancas_demo()
+            self.stats['mudancas_detectadas'] = len(mudancas)
+            logger.info(f"{len(mudancas)} mudanças recebidas da análise")
         
         if not mudancas:
             logger.info("Nenhuma mudança detectada")
@@ -552,12 +632,12 @@ class LiveloFirebaseNotifier:
         print("🌐 Web Interface: https://livel-analytics.web.app/")
         print("="*70)
     
-    def executar(self):
+    def executar(self, mudancas=None):
         """Executa sistema completo - NUNCA falha o pipeline principal"""
         try:
             logger.info("🚀 Iniciando sistema de notificações Firebase + Firestore...")
             
-            sucesso = self.processar_notificacoes()
+            sucesso = self.processar_notificacoes(mudancas)
             
             self.gerar_relatorio()
             
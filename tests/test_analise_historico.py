@@ -0,0 +1,215 @@
+"""
+Paridade de LiveloAnalytics.analisar_historico_ofertas (estado por Parceiro+Moeda,
+agregações vetorizadas) com a versão original por grupo, que filtrava o histórico
+de cada combinação e voltava registro a registro até a última mudança
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import livelo_reporter
+
+INICIO = pd.Timestamp('2025-07-01 10:15:00')
+DIAS = 45
+
+
+def _linhas(parceiro, moeda, dias, oferta=lambda d: False, pontos=lambda d: 3, valor=lambda d: 1):
+    return [{
+        'Timestamp': INICIO + pd.Timedelta(days=d),
+        'Parceiro': parceiro,
+        'Oferta': 'Sim' if oferta(d) else 'Não',
+        'Moeda': moeda,
+        'Valor': valor(d),
+        'Pontos': pontos(d)
+    } for d in dias]
+
+
+def historico_fixture():
+    """Histórico fixo de 45 dias: casos escritos à mão + parceiros pseudoaleatórios (semente fixa)"""
+    todos = range(DIAS)
+    linhas = []
+    linhas += _linhas('Amazon', 'R$', todos, pontos=lambda d: 5)
+    linhas += _linhas('Netshoes', 'R$', todos, oferta=lambda d: 10 <= d <= 20 or d >= 35,
+                      pontos=lambda d: 8 if 10 <= d <= 20 or d >= 35 else 3)
+    linhas += _linhas('Apple', 'U$', todos, pontos=lambda d: 2 if d < 15 else (4 if d < 30 else 3))
+    linhas += _linhas('Booking', 'R$', todos, valor=lambda d: 1 if d < 25 else 2)
+    linhas += _linhas('Centauro', 'R$', range(30, DIAS), oferta=lambda d: d >= 40)
+    # Some por alguns dias e volta com outra pontuação
+    linhas += _linhas('Dell', 'U$', [d for d in todos if not 20 <= d <= 25], pontos=lambda d: 6 if d < 20 else 9)
+    # Some e volta igual; teve uma oferta antes
+    linhas += _linhas('Shopee', 'R$', [d for d in todos if not 10 <= d <= 15], oferta=lambda d: d == 5)
+    linhas += _linhas('Magalu', 'R$', [DIAS - 1], oferta=lambda d: True, pontos=lambda d: 12)
+    linhas += _linhas('Zero Pontos', 'R$', todos, pontos=lambda d: 0 if d < 44 else 3)
+    linhas += _linhas('Casas Bahia', 'R$', todos, oferta=lambda d: True, pontos=lambda d: 4)
+    linhas += _linhas('Saiu Antes', 'R$', range(40))
+    # Mesmo parceiro em duas moedas
+    linhas += _linhas('Dual', 'R$', todos, pontos=lambda d: 2)
+    linhas += _linhas('Dual', 'U$', todos, oferta=lambda d: d % 7 == 0, pontos=lambda d: 5 if d % 7 == 0 else 3)
+
+    aleatorio = np.random.RandomState(20250825)
+    for i in range(25):
+        moeda = 'U$' if i % 5 == 0 else 'R$'
+        presentes = [d for d in todos if aleatorio.rand() > 0.05] or [DIAS - 1]
+        ofertas = set(d for d in presentes if aleatorio.rand() < 0.25)
+        base = int(aleatorio.randint(1, 6))
+        pontos = {d: base + (int(aleatorio.randint(2, 8)) if d in ofertas else 0) for d in presentes}
+        linhas += _linhas(f'Parceiro Fixture {i:02d}', moeda, presentes,
+                          oferta=lambda d, o=ofertas: d in o, pontos=lambda d, p=pontos: p[d])
+
+    return pd.DataFrame(linhas).sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+
+def analise_por_grupo(analytics):
+    """Versão original (loop por Parceiro+Moeda), aplicada ao mesmo histórico já preparado"""
+    df_completo = analytics._oferta_como_texto(analytics._sem_categorias(analytics.df_completo))
+    df_hoje = analytics._oferta_como_texto(analytics._sem_categorias(analytics.df_hoje))
+
+    resultados = []
+    linhas_hoje = df_hoje[['Parceiro', 'Moeda']].drop_duplicates()
+    for _, linha_atual in linhas_hoje.iterrows():
+        parceiro = linha_atual['Parceiro']
+        moeda = linha_atual['Moeda']
+        dados_atual = df_hoje[(df_hoje['Parceiro'] == parceiro) & (df_hoje['Moeda'] == moeda)].iloc[0]
+        historico = df_completo[
+            (df_completo['Parceiro'] == parceiro) & (df_completo['Moeda'] == moeda)
+        ].sort_values('Timestamp')
+
+        nome = pd.Series([parceiro])
+        resultado = {
+            'Parceiro': parceiro,
+            'Pontos_Atual': dados_atual['Pontos'],
+            'Valor_Atual': dados_atual['Valor'],
+            'Moeda': dados_atual['Moeda'],
+            'Tem_Oferta_Hoje': dados_atual['Oferta'] == 'Sim',
+            'Pontos_por_Moeda_Atual': dados_atual['Pontos_por_Moeda'],
+            'Data_Atual': dados_atual['Timestamp'].date(),
+            'Categoria_Dimensao': dados_atual['Categoria_Dimensao'],
+            'Tier': dados_atual['Tier'],
+            'URL_Parceiro': analytics.atributo_dimensao(nome, 'URL_Parceiro').iloc[0],
+            'Logo_Link': analytics.atributo_dimensao(nome, 'Logo_Link').iloc[0],
+            'Codigo_Parceiro': dados_atual['Codigo_Parceiro']
+        }
+
+        primeiro_registro = historico.iloc[0]['Timestamp']
+        dias_casa = (dados_atual['Timestamp'] - primeiro_registro).days + 1
+        status_casa, cor_casa = analytics._calcular_tempo_casa(dias_casa)
+        resultado['Dias_Casa'] = dias_casa
+        resultado['Status_Casa'] = status_casa
+        resultado['Cor_Status'] = cor_casa
+
+        if len(historico) > 1:
+            ultimo_diferente = None
+            for idx in range(len(historico) - 2, -1, -1):
+                registro = historico.iloc[idx]
+                if (registro['Pontos'] != dados_atual['Pontos'] or
+                        registro['Valor'] != dados_atual['Valor'] or
+                        registro['Oferta'] != dados_atual['Oferta']):
+                    ultimo_diferente = registro
+                    break
+
+            if ultimo_diferente is not None:
+                resultado['Pontos_Anterior'] = ultimo_diferente['Pontos']
+                resultado['Valor_Anterior'] = ultimo_diferente['Valor']
+                resultado['Data_Anterior'] = ultimo_diferente['Timestamp'].date()
+                resultado['Dias_Desde_Mudanca'] = (dados_atual['Timestamp'] - ultimo_diferente['Timestamp']).days
+                if ultimo_diferente['Pontos'] > 0:
+                    resultado['Variacao_Pontos'] = ((dados_atual['Pontos'] - ultimo_diferente['Pontos']) /
+                                                    ultimo_diferente['Pontos']) * 100
+                else:
+                    resultado['Variacao_Pontos'] = 0
+
+                if dados_atual['Oferta'] == 'Sim' and ultimo_diferente['Oferta'] != 'Sim':
+                    resultado['Tipo_Mudanca'] = 'Ganhou Oferta'
+                elif dados_atual['Oferta'] != 'Sim' and ultimo_diferente['Oferta'] == 'Sim':
+                    resultado['Tipo_Mudanca'] = 'Perdeu Oferta'
+                elif dados_atual['Pontos'] != ultimo_diferente['Pontos']:
+                    if dados_atual['Pontos'] > ultimo_diferente['Pontos']:
+                        resultado['Tipo_Mudanca'] = 'Aumentou Pontos'
+                    else:
+                        resultado['Tipo_Mudanca'] = 'Diminuiu Pontos'
+                elif dados_atual['Valor'] != ultimo_diferente['Valor']:
+                    resultado['Tipo_Mudanca'] = 'Mudou Valor'
+                else:
+                    resultado['Tipo_Mudanca'] = 'Sem Mudança'
+            else:
+                resultado.update({
+                    'Pontos_Anterior': dados_atual['Pontos'],
+                    'Valor_Anterior': dados_atual['Valor'],
+                    'Data_Anterior': primeiro_registro.date(),
+                    'Dias_Desde_Mudanca': dias_casa,
+                    'Variacao_Pontos': 0,
+                    'Tipo_Mudanca': 'Sempre Igual'
+                })
+        else:
+            resultado.update({
+                'Pontos_Anterior': 0,
+                'Valor_Anterior': 0,
+                'Data_Anterior': None,
+                'Dias_Desde_Mudanca': 0,
+                'Variacao_Pontos': 0,
+                'Tipo_Mudanca': 'Primeiro Registro'
+            })
+
+        ofertas_historicas = historico[historico['Oferta'] == 'Sim']
+        total_ofertas = len(ofertas_historicas)
+        freq_ofertas = (total_ofertas / dias_casa * 100) if dias_casa > 0 else 0
+
+        if total_ofertas > 0:
+            ultima_oferta = ofertas_historicas.iloc[-1]
+            resultado['Data_Ultima_Oferta'] = ultima_oferta['Timestamp'].date()
+            resultado['Pontos_Ultima_Oferta'] = ultima_oferta['Pontos']
+            resultado['Dias_Desde_Ultima_Oferta'] = (dados_atual['Timestamp'] - ultima_oferta['Timestamp']).days
+            media_pontos_ofertas = ofertas_historicas['Pontos'].mean()
+        else:
+            resultado['Data_Ultima_Oferta'] = None
+            resultado['Pontos_Ultima_Oferta'] = 0
+            resultado['Dias_Desde_Ultima_Oferta'] = dias_casa
+            media_pontos_ofertas = 0
+
+        resultado['Frequencia_Ofertas'] = freq_ofertas
+        resultado['Total_Ofertas_Historicas'] = total_ofertas
+        resultado['Media_Pontos_Ofertas'] = media_pontos_ofertas
+        resultado['Sazonalidade'] = analytics._calcular_sazonalidade(freq_ofertas, media_pontos_ofertas)
+
+        if freq_ofertas >= 80:
+            resultado['Categoria_Estrategica'] = 'Sempre em oferta'
+        elif freq_ofertas <= 20 and dados_atual['Pontos'] >= 5:
+            resultado['Categoria_Estrategica'] = 'Oportunidade rara'
+        elif dados_atual['Oferta'] == 'Sim' and freq_ofertas <= 50:
+            resultado['Categoria_Estrategica'] = 'Compre agora!'
+        else:
+            resultado['Categoria_Estrategica'] = 'Normal'
+
+        simbolo = 'R$' if resultado['Moeda'] == 'R$' else '$'
+        resultado['Gasto_Formatado'] = f"{simbolo} {resultado['Valor_Atual']:.2f}".replace('.', ',')
+        resultados.append(resultado)
+
+    return pd.DataFrame(resultados)
+
+
+def _analytics(df):
+    analytics = livelo_reporter.LiveloAnalytics('livelo_parceiros.xlsx', usar_historico=False, df_entrada=df)
+    assert analytics.carregar_dados()
+    return analytics
+
+
+@pytest.mark.parametrize('dias', [1, 2, DIAS])
+def test_vetorizado_igual_ao_loop_por_grupo(dias):
+    df = historico_fixture()
+    df = df[df['Timestamp'] < INICIO + pd.Timedelta(days=dias)]
+    analytics = _analytics(df)
+
+    esperado = analise_por_grupo(analytics)
+    obtido = analytics.analisar_historico_ofertas()
+
+    assert list(obtido.columns) == list(esperado.columns)
+    # Tipos numéricos seguem o layout compacto (int32/float32); os valores devem ser os mesmos
+    pd.testing.assert_frame_equal(obtido.reset_index(drop=True), esperado, check_dtype=False)
+
+
+def test_fixture_cobre_todos_os_tipos_de_mudanca():
+    analytics = _analytics(historico_fixture())
+    tipos = set(analytics.analisar_historico_ofertas()['Tipo_Mudanca'])
+    assert {'Primeiro Registro', 'Sempre Igual', 'Ganhou Oferta', 'Perdeu Oferta',
+            'Aumentou Pontos', 'Diminuiu Pontos', 'Mudou Valor'} <= tipos
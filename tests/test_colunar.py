@@ -0,0 +1,35 @@
+"""
+Ida e volta pelo formato colunar de public/data, incluindo valores ausentes
+"""
+
+import json
+
+import pandas as pd
+
+import livelo_colunar
+
+
+def test_ida_e_volta_com_ausentes():
+    df = pd.DataFrame({
+        'Timestamp': pd.to_datetime(['2025-08-24 10:15:00', None, '2025-08-25 09:00:30', '2025-08-24 10:15:00']),
+        'Parceiro': ['Amazon', None, 'Dell', 'Amazon'],
+        'Valor': [1.0, 2.0, None, 1.0],
+        'Pontos': [5, 3, 0, 5],
+    })
+    df['Pontos_por_Moeda'] = (df['Pontos'] / df['Valor']).fillna(0)
+
+    pacote = json.loads(livelo_colunar.codificar_json(df))
+    assert pacote['colunas']['Timestamp']['codigos'] == [0, None, 1, 0]
+
+    decodificado = livelo_colunar.decodificar(pacote)
+    pd.testing.assert_series_equal(decodificado['Timestamp'], df['Timestamp'], check_dtype=False)
+    assert pacote['colunas']['Parceiro']['codigos'] == [0, None, 1, 0]
+    assert decodificado['Parceiro'].isna().tolist() == [False, True, False, False]
+    assert decodificado['Pontos'].tolist() == [5, 3, 0, 5]
+
+
+def test_coluna_de_tempo_toda_ausente():
+    df = pd.DataFrame({'Timestamp': pd.to_datetime([None, None])})
+    pacote = livelo_colunar.codificar(df)
+    assert pacote['colunas']['Timestamp']['codigos'] == [None, None]
+    assert livelo_colunar.decodificar(pacote)['Timestamp'].isna().all()
@@ -0,0 +1,48 @@
+"""
+O estado incremental (incorporar_dia) deve sair idêntico à reconstrução (construir)
+a partir do histórico completo - mesmos tipos e a mesma regra para coletas repetidas no dia
+"""
+
+import pandas as pd
+import pytest
+
+from livelo_historico import EstadoParceiros
+from test_analise_historico import DIAS, INICIO, historico_fixture
+
+
+def _com_repetidas(df):
+    """Segunda coleta no mesmo dia para alguns parceiros, com outros valores"""
+    repetidas = df[df['Parceiro'].isin(['Amazon', 'Netshoes', 'Dual'])].copy()
+    repetidas['Timestamp'] += pd.Timedelta(hours=6)
+    repetidas['Pontos'] += 1
+    repetidas['Oferta'] = 'Sim'
+    return pd.concat([repetidas, df]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('repetidas', [False, True])
+def test_incremental_igual_a_reconstrucao(tmp_path, repetidas):
+    df = historico_fixture()
+    if repetidas:
+        df = _com_repetidas(df)
+    ultimo_dia = INICIO.normalize() + pd.Timedelta(days=DIAS - 1)
+    anteriores = df[df['Timestamp'] < ultimo_dia]
+    dia = df[df['Timestamp'] >= ultimo_dia]
+
+    estado = EstadoParceiros(str(tmp_path / 'estado.parquet'))
+    estado.salvar(estado.construir(anteriores))
+    incremental = estado.incorporar_dia(estado.carregar(), dia)
+    reconstruido = estado.construir(df)
+
+    pd.testing.assert_frame_equal(incremental, reconstruido)
+
+    # Também depois de gravar: --reconstruir e a execução diária geram o mesmo arquivo
+    estado.salvar(incremental)
+    pd.testing.assert_frame_equal(estado.carregar(), reconstruido)
+
+
+def test_coleta_repetida_no_dia_conta_uma_vez():
+    estado = EstadoParceiros().construir(_com_repetidas(historico_fixture()))
+    amazon = estado[(estado['Parceiro'] == 'Amazon') & (estado['Moeda'] == 'R$')].iloc[0]
+    assert amazon['Total_Registros'] == DIAS
+    # A primeira coleta do dia (a das 10:15) é a que vale
+    assert (amazon['Oferta'], amazon['Pontos'], amazon['Total_Ofertas']) == ('Não', 5, 0)
@@ -0,0 +1,63 @@
+"""
+Log de eventos de ofertas: estendido dia a dia deve sair igual ao reconstruído, e a
+análise do reporter (que lê a última mudança e a última oferta do log) não depende do caminho
+"""
+
+import pandas as pd
+
+import livelo_reporter
+from livelo_historico import EventosOfertas
+from test_analise_historico import DIAS, INICIO, historico_fixture
+
+
+def _dia(df, d):
+    inicio = INICIO.normalize() + pd.Timedelta(days=d)
+    return df[(df['Timestamp'] >= inicio) & (df['Timestamp'] < inicio + pd.Timedelta(days=1))]
+
+
+def test_incremental_igual_a_reconstrucao():
+    df = historico_fixture()
+    eventos_ofertas = EventosOfertas()
+
+    # Começa antes dos intervalos de Shopee (dias 10-15) e Dell (dias 20-25)
+    eventos = eventos_ofertas.construir(df[df['Timestamp'] < INICIO.normalize() + pd.Timedelta(days=8)])
+    for d in range(8, DIAS):
+        eventos = eventos_ofertas.incorporar_dia(eventos, _dia(df, d - 1), _dia(df, d))
+
+    pd.testing.assert_frame_equal(eventos, eventos_ofertas.construir(df))
+
+
+def test_volta_apos_intervalo_guarda_o_estado_anterior():
+    eventos = EventosOfertas().construir(historico_fixture())
+    dell = eventos[(eventos['Parceiro'] == 'Dell') & (eventos['Evento'] == 'apareceu')]
+    assert len(dell) == 2
+    primeira, volta = dell.iloc[0], dell.iloc[1]
+    assert pd.isna(primeira['Timestamp_Anterior'])
+    assert (volta['Pontos_Anterior'], volta['Pontos']) == (6, 9)
+    assert volta['Timestamp_Anterior'] == INICIO + pd.Timedelta(days=19)
+
+    mudancas = EventosOfertas().ultimas_mudancas(eventos)
+    # Dell voltou diferente (conta como mudança); Shopee voltou igual (a mudança é o fim da oferta do dia 5)
+    assert mudancas.loc[('Dell', 'U$'), 'Evento'] == 'apareceu'
+    assert mudancas.loc[('Shopee', 'R$'), 'Evento'] == 'perdeu_oferta'
+
+
+def test_analise_com_log_persistido(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = historico_fixture()
+    ontem = df[df['Timestamp'] < INICIO.normalize() + pd.Timedelta(days=DIAS - 1)]
+
+    referencia = livelo_reporter.LiveloAnalytics('livelo_parceiros.xlsx', usar_historico=False, df_entrada=df)
+    assert referencia.carregar_dados()
+    esperado = referencia.analisar_historico_ofertas()
+
+    eventos_ofertas = EventosOfertas()
+    eventos_ofertas.salvar(eventos_ofertas.construir(ontem), ontem['Timestamp'].max().strftime('%Y-%m-%d'))
+
+    analytics = livelo_reporter.LiveloAnalytics('livelo_parceiros.xlsx', df_entrada=df)
+    assert analytics.carregar_dados()
+    analytics.atualizar_estado_parceiros()
+    analytics.atualizar_eventos_ofertas()
+    assert eventos_ofertas.carregar()[1] == df['Timestamp'].max().strftime('%Y-%m-%d')
+
+    pd.testing.assert_frame_equal(analytics.analisar_historico_ofertas(), esperado)
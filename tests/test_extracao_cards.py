@@ -0,0 +1,117 @@
+"""
+Paridade da extração dos cards: o modo por elementos (WebDriver card a card) e o
+modo em lote (payload único, aqui vindo do replay do snapshot) devem gerar as
+mesmas linhas para a mesma página
+"""
+
+import os
+import shutil
+
+import pytest
+from lxml import html as lxml_html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from livelo_scraper import LiveloScraper
+import livelo_snapshot as snapshot
+
+PAGINA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures",
+                      "pagina_parceiros_20250825_101500.html")
+
+# Seletores CSS do modo por elementos → XPaths equivalentes do parser de snapshots
+SELETORES = {
+    'div[data-testid="div_PartnerCard"]': snapshot.XPATH_CARDS,
+    'img[data-testid="img_PartnerCard_partnerImage"]': snapshot.XPATH_IMG_PRINCIPAL,
+    'span[data-testid="span_PartnerCard_promotionTag"]': snapshot.XPATH_PROMOCAO,
+    'div[data-testid="Text_ParityText"].css-1oy391r': snapshot.XPATH_PARIDADE.format(classe='css-1oy391r'),
+    'div[data-testid="Text_ParityText"].css-nrcx9i': snapshot.XPATH_PARIDADE.format(classe='css-nrcx9i'),
+    'div[data-testid="Text_Typography"]': snapshot.XPATH_TIPOGRAFIA,
+}
+
+
+class ElementoLxml:
+    """Imita o WebElement do Selenium sobre um nó lxml (find_element, get_attribute, text)"""
+
+    def __init__(self, no):
+        self.no = no
+
+    def _xpath(self, by, seletor):
+        if by == By.XPATH:
+            return seletor
+        return SELETORES[seletor]
+
+    def find_elements(self, by, seletor):
+        return [ElementoLxml(no) for no in self.no.xpath(self._xpath(by, seletor))]
+
+    def find_element(self, by, seletor):
+        encontrados = self.find_elements(by, seletor)
+        if not encontrados:
+            raise NoSuchElementException(seletor)
+        return encontrados[0]
+
+    def get_attribute(self, nome):
+        return self.no.get(nome)
+
+    @property
+    def text(self):
+        return '\n'.join(t.strip() for t in self.no.itertext() if t.strip())
+
+
+def _sem_timestamp(linhas):
+    return [{k: v for k, v in linha.items() if k != 'Timestamp'} for linha in linhas]
+
+
+def _linhas_por_elementos(driver):
+    scraper = LiveloScraper(modo_extracao="elementos")
+    scraper.driver = driver
+    return scraper.extrair_dados_parceiros()
+
+
+def test_lote_igual_ao_modo_por_elementos():
+    with open(PAGINA, encoding='utf-8') as f:
+        driver = ElementoLxml(lxml_html.fromstring(f.read()))
+
+    por_elementos = _linhas_por_elementos(driver)
+    em_lote = LiveloScraper().extrair_dados_snapshot(PAGINA)
+
+    assert len(por_elementos) == 11
+    assert _sem_timestamp(em_lote) == _sem_timestamp(por_elementos)
+
+
+def test_regras_de_interpretacao_da_pagina():
+    linhas = {(l['Parceiro']): l for l in LiveloScraper().extrair_dados_snapshot(PAGINA)}
+
+    assert linhas['Amazon'] == {'Timestamp': '2025-08-25 10:15:00', 'Parceiro': 'Amazon', 'Oferta': 'Sim',
+                                'Moeda': 'R$', 'Valor': 1.0, 'Pontos': 10}
+    assert (linhas['Apple']['Moeda'], linhas['Apple']['Pontos']) == ('U$', 2)
+    # "Até 8" não é número: cai no padrão "R$ 1 até 8"
+    assert (linhas['Booking']['Valor'], linhas['Booking']['Pontos']) == (1.0, 8)
+    # Sem seção de paridade da promoção: "12 pontos por U$ 1"
+    assert (linhas['Expedia']['Oferta'], linhas['Expedia']['Moeda'], linhas['Expedia']['Pontos']) == ('Sim', 'U$', 12)
+    # "Até 15 pts" sem moeda não casa com nenhum padrão
+    assert (linhas['Centauro']['Valor'], linhas['Centauro']['Pontos']) == ('N/A', 'N/A')
+    assert linhas['Casas Bahia']['Pontos'] == 4
+    assert linhas['Magalu']['Oferta'] == 'Sim'
+    assert linhas['Dell']['Oferta'] == 'Não'
+    assert 'Parceiro 8' in linhas and 'Parceiro 11' in linhas
+
+
+@pytest.mark.skipif(not (shutil.which('chromedriver') or shutil.which('google-chrome') or shutil.which('chromium')),
+                    reason="Chrome não disponível")
+def test_lote_igual_ao_modo_por_elementos_no_navegador():
+    from selenium import webdriver
+
+    opcoes = webdriver.ChromeOptions()
+    opcoes.add_argument('--headless=new')
+    opcoes.add_argument('--no-sandbox')
+    driver = webdriver.Chrome(options=opcoes)
+    try:
+        driver.get('file://' + PAGINA)
+        scraper = LiveloScraper()
+        scraper.driver = driver
+        em_lote = scraper.extrair_dados_parceiros_lote()
+        por_elementos = _linhas_por_elementos(driver)
+    finally:
+        driver.quit()
+
+    assert em_lote and _sem_timestamp(em_lote) == _sem_timestamp(por_elementos)
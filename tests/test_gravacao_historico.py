@@ -0,0 +1,29 @@
+"""
+Gravação do dia pelo scraper: mesmo sem exportar o Excel (como no main.py),
+o histórico completo fica em df_historico para ser repassado ao reporter
+"""
+
+import pandas as pd
+
+from livelo_scraper import LiveloScraper
+
+
+def _dia(timestamp, pontos):
+    return [
+        {'Timestamp': timestamp, 'Parceiro': 'Amazon', 'Oferta': 'Não', 'Moeda': 'R$', 'Valor': 1.0, 'Pontos': pontos},
+        {'Timestamp': timestamp, 'Parceiro': 'Apple', 'Oferta': 'Sim', 'Moeda': 'U$', 'Valor': 1.0, 'Pontos': 4},
+    ]
+
+
+def test_historico_repassado_sem_exportar_excel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    for timestamp, pontos in [('2025-08-24 10:15:00', 3), ('2025-08-25 10:15:00', 5)]:
+        scraper = LiveloScraper()
+        scraper.exportar_excel = False
+        assert scraper.salvar_dados_excel(_dia(timestamp, pontos))
+
+    assert scraper.df_historico is not None
+    assert len(scraper.df_historico) == 4
+    assert pd.to_datetime(scraper.df_historico['Timestamp']).dt.strftime('%Y-%m-%d').nunique() == 2
+    assert not (tmp_path / 'livelo_parceiros.xlsx').exists()
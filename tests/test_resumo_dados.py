@@ -0,0 +1,59 @@
+"""
+ResumoDados acompanha a mesma fonte que ele lê: o histórico Parquet (e o Excel só sem ele)
+"""
+
+import os
+
+import pandas as pd
+
+from livelo_historico import HistoricoParquet
+from livelo_validacao import ResumoDados
+
+
+def _dia(timestamp, pontos):
+    return pd.DataFrame([
+        {'Timestamp': timestamp, 'Parceiro': 'Amazon', 'Oferta': 'Não', 'Moeda': 'R$', 'Valor': 1.0, 'Pontos': pontos},
+        {'Timestamp': timestamp, 'Parceiro': 'Apple', 'Oferta': 'Sim', 'Moeda': 'U$', 'Valor': 1.0, 'Pontos': 4},
+    ])
+
+
+def test_resumo_do_historico_sem_excel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    historico = HistoricoParquet()
+    historico.salvar_dia(_dia('2025-08-24 10:15:00', 3))
+
+    resumo_dados = ResumoDados()
+    assert ResumoDados().obter() is not None
+    resumo = resumo_dados.obter()
+    assert (resumo['fonte'], resumo['registros'], resumo_dados.leituras) == ('parquet', 2, 1)
+
+    # Nada mudou: reaproveita
+    resumo_dados.obter()
+    assert (resumo_dados.leituras, resumo_dados.reaproveitamentos) == (1, 1)
+
+    # Só o mtime mudou (checkout/cópia): o hash do conteúdo confirma e reaproveita
+    arquivo = historico.arquivos_do_dia('2025-08-24')[0]
+    os.utime(arquivo, (0, 0))
+    resumo_dados.obter()
+    assert (resumo_dados.leituras, resumo_dados.reaproveitamentos) == (1, 2)
+
+    # Dia novo no histórico (o Excel nem existe): relê
+    historico.salvar_dia(_dia('2025-08-25 10:15:00', 5))
+    resumo = resumo_dados.obter()
+    assert (resumo['registros'], resumo['data_fim'], resumo_dados.leituras) == (4, '2025-08-25', 2)
+
+
+def test_definir_usa_a_assinatura_do_historico(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    historico = HistoricoParquet()
+    historico.salvar_dia(_dia('2025-08-24 10:15:00', 3))
+
+    resumo_dados = ResumoDados()
+    resumo_dados.definir(historico.carregar())
+    assert resumo_dados.obter()['fonte'] == 'memoria'
+    assert resumo_dados.leituras == 0
+
+
+def test_sem_dados(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert ResumoDados().obter() is None